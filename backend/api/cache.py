@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from api.database import analytics_engine
+
+# Seconds a cached response stays valid (0 disables the cache)
+RESPONSE_CACHE_TTL = float(os.getenv("VENMITO_RESPONSE_CACHE_TTL", "300"))
+
+# Total size of the cached response bodies before least recently used entries are evicted
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("VENMITO_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Thread-safe LRU cache of serialized responses with a TTL and a memory budget
+class ResponseCache:
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    # Return the entry stored under key for this generation, or None
+    def get(self, key, generation):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry["generation"] != generation or entry["expires_at"] <= time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    # Store an entry, evicting the least recently used ones to stay within max_bytes
+    def set(self, key, generation, body, mimetype, etag):
+        size = len(body) + len(key)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = {
+                "generation": generation,
+                "expires_at": time.monotonic() + self.ttl,
+                "body": body,
+                "mimetype": mimetype,
+                "etag": etag,
+                "size": size,
+            }
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    # Drop every entry
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry["size"]
+
+# Cache shared by every blueprint
+response_cache = ResponseCache()
+
+# Read the generation stamped by the last database load (see storage/database_generation.py)
+def current_generation():
+    """
+    Read from the engine the cached /stats endpoints query. On DuckDB that is
+    the generation the columnar copy was exported from, so a response computed
+    before the copy catches up with venmito.db is never stored under the new
+    generation.
+    """
+    try:
+        with analytics_engine.connect() as connection:
+            return connection.execute(text("SELECT generation FROM DatabaseGeneration")).scalar() or 0
+    except DBAPIError:
+        # Database built before generations were recorded
+        return 0
+
+# Build the cache key from the route and its query args, ignoring their order
+def cache_key():
+    args = sorted(
+        (name, tuple(sorted(value.strip() for value in request.args.getlist(name))))
+        for name in request.args
+    )
+    return f"{request.path}?{args}"
+
+# Cache a GET endpoint's JSON response until the TTL expires or the database is reloaded
+def cached_response(view):
+    """
+    Successful responses are stored per route + normalized query args and
+    served from memory until RESPONSE_CACHE_TTL passes or the database
+    generation changes. Every response carries an ETag; a request whose
+    If-None-Match matches it gets an empty 304.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if RESPONSE_CACHE_TTL <= 0:
+            return view(*args, **kwargs)
+
+        generation = current_generation()
+        key = cache_key()
+        entry = response_cache.get(key, generation)
+
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = f"{generation}-{hashlib.sha1(body).hexdigest()}"
+            response_cache.set(key, generation, body, response.mimetype, etag)
+        else:
+            response = make_response(entry["body"])
+            response.mimetype = entry["mimetype"]
+            etag = entry["etag"]
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    return wrapper
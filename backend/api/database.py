@@ -0,0 +1,98 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+import os
+from storage.duckdb_store import STORAGE_BACKEND
+
+# Set up SQLAlchemy. VENMITO_DB_PATH / VENMITO_DUCKDB_PATH serve another
+# build of the databases (e.g. a generated one for load tests).
+DATABASE_PATH = os.path.abspath(os.getenv(
+    "VENMITO_DB_PATH", os.path.join(os.path.dirname(__file__), "../storage/venmito.db")
+))
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+DUCKDB_PATH = os.path.abspath(os.getenv(
+    "VENMITO_DUCKDB_PATH", os.path.join(os.path.dirname(__file__), "../storage/venmito.duckdb")
+))
+DUCKDB_URL = f"duckdb:///{DUCKDB_PATH}"
+
+# Pool sizing for the threaded server: connections kept open / extra ones allowed under bursts
+POOL_SIZE = int(os.getenv("VENMITO_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("VENMITO_DB_MAX_OVERFLOW", "20"))
+
+# Page cache of each pooled connection, in KB. Every connection has its own, so
+# it is kept small: reads of the memory-mapped file come from the OS page cache,
+# which all connections share.
+SQLITE_CACHE_KB = int(os.getenv("VENMITO_SQLITE_CACHE_KB", "4096"))
+
+# Pragmas applied to every new SQLite connection in the pool
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # Readers don't block each other or the loader
+    "synchronous": "NORMAL",    # Safe with WAL, avoids an fsync per commit
+    "cache_size": -SQLITE_CACHE_KB,  # Private page cache per connection (negative = KB)
+    "mmap_size": 268435456,     # Memory-map up to 256 MB of the database file
+    "temp_store": "MEMORY",     # Sorts/group-bys spill to memory, not temp files
+    "busy_timeout": 5000,       # Wait up to 5s for a lock instead of failing
+}
+
+# One engine shared by every blueprint. Pooled connections are handed to
+# whichever request thread checks them out, so SQLite's same-thread check is off.
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    connect_args={"check_same_thread": False},
+)
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+# Settings applied to every DuckDB connection. NULLs sort first ascending and
+# last descending, as in SQLite, so ordered results match on both backends.
+DUCKDB_CONFIG = {
+    "default_null_order": "nulls_first_on_asc_last_on_desc",
+}
+
+# Engine for the analytics (/stats and insight) queries on the configured storage backend
+def create_analytics_engine(backend=STORAGE_BACKEND):
+    """
+    "sqlite" shares the main engine. "duckdb" opens the read-only columnar
+    copy exported by storage/duckdb_store.py after each load (needs the
+    duckdb and duckdb_engine packages). The models map onto both.
+    """
+    if backend == "sqlite":
+        return engine
+    if backend == "duckdb":
+        return create_engine(
+            DUCKDB_URL,
+            poolclass=QueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            connect_args={"read_only": True, "config": DUCKDB_CONFIG},
+        )
+    raise ValueError(f"Unknown VENMITO_STORAGE_BACKEND: {backend}")
+
+analytics_engine = create_analytics_engine()
+
+# Thread-local session per request, removed when the app context tears down
+Session = sessionmaker(bind=engine)
+db_session = scoped_session(Session)
+
+# Same for the analytics queries (the main session when the backend is SQLite)
+if analytics_engine is engine:
+    AnalyticsSession = Session
+    analytics_session = db_session
+else:
+    AnalyticsSession = sessionmaker(bind=analytics_engine)
+    analytics_session = scoped_session(AnalyticsSession)
+
+# Register the session teardown on the Flask app
+def init_app(app):
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        db_session.remove()
+        analytics_session.remove()
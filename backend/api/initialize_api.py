@@ -1,62 +1,102 @@
-from openai import OpenAI
-import json
-from flask import Blueprint, request, jsonify
-import requests
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from api.database import AnalyticsSession
+from api.sql_functions import year_month
+from api.llm_client import generate_insights, data_fingerprint
+from api.prompt_payload import build_prompt_payload, query_stratified_sample
+from api.people_api import PEOPLE_FIELDS, query_people_stats
+from api.promotions_api import PROMOTION_FIELDS, query_promotion_stats, query_promotion_summary
+from api.transactions_api import TRANSACTION_FIELDS, query_customer_stats, query_store_stats, query_spending_by_country
+from api.transfers_api import TRANSFER_FIELDS, TRANSFER_SERIALIZERS, query_country_transfer_stats, query_monthly_totals
+from models.people import People
+from models.promotions import Promotions
+from models.transactions import Transactions
+from models.transfers import Transfers
 
-# Initialize the OpenAI API client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 initialize_blueprint = Blueprint('initialize', __name__)
 
+# Threads used to run an endpoint's data queries concurrently
+INSIGHT_QUERY_WORKERS = int(os.getenv("VENMITO_INSIGHT_QUERY_WORKERS", "4"))
+query_executor = ThreadPoolExecutor(max_workers=INSIGHT_QUERY_WORKERS)
+
+# Run query functions concurrently, each on its own database session
+def gather_data(queries):
+    """
+    Takes {name: function(session)} and returns {name: result}. Called in
+    process instead of making loopback HTTP requests to this same server.
+    """
+    def run(query):
+        session = AnalyticsSession()
+        try:
+            return query(session)
+        finally:
+            session.close()
+
+    futures = {name: query_executor.submit(run, query) for name, query in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+# Build the prompt shared by every insights endpoint from the serialized payload
+def build_prompt(subject, topics, payload):
+    return f"""
+        You are analyzing {subject} data for Venmito, a payment company. The data holds row counts,
+        aggregated statistics (lists sorted by importance, possibly truncated) and a small sample of
+        rows from each group. Based on the provided data, generate insights about:
+        
+        {topics}
+
+        Data:
+        {payload}
+
+        Output actionable insights in clear, concise sentences. Use this format:
+        - [Topic]: [Insight]
+        """
+
+# Fit the data into the token budget, then generate (or reuse) the insights for it
+def analyze(name, subject, topics, data):
+    payload, report = build_prompt_payload(data)
+    print(f"Insights payload for {name}: {report['tokens']} tokens ({report['tokenizer']}), "
+          f"{report['bytes']} bytes, lists capped at {report['max_list_items']} (samples at {report['max_sample_items']})")
+    insights = generate_insights(build_prompt(subject, topics, payload), data_fingerprint(name, payload))
+    return jsonify({"insights": insights, "payload": report}), 200
+
 # OpenAI API endpoint for generating insights on customer data from results in people and transaction pages
 @initialize_blueprint.route('/customers', methods=['POST'])  
 def analyze_customers():
     try:
-        # Fetch only customer-relevant data
-        people = requests.get("http://127.0.0.1:5000/api/people/filter").json()
-        people_stats = requests.get("http://127.0.0.1:5000/api/people/stats").json()
-        transactions_customers = requests.get("http://127.0.0.1:5000/api/transactions/stats/customers").json()
+        # Fetch only customer-relevant data: aggregates plus a few people per country
+        sources = gather_data({
+            "people_count": lambda session: session.query(func.count(People.id)).scalar(),
+            "people_sample": lambda session: query_stratified_sample(session, People.id, People.country, PEOPLE_FIELDS),
+            "people_stats": query_people_stats,
+            "transactions_customers": query_customer_stats,
+        })
         
-        # Prepare data for the GPT-4 model
+        # Prepare data for the LLM
         data = {
-            "people": people,
+            "row_counts": {"people": sources["people_count"]},
+            "samples": {"people_by_country": sources["people_sample"]},
             "stats": {
-                "people": people_stats,
-                "transactions_customers": transactions_customers
+                "people": sources["people_stats"],
+                "transactions_customers": sources["transactions_customers"]
             },
             "mappings": {
                 "People.id": "Primary identifier for customer analysis"
             }
         }
 
-        # Generate insights using the GPT-4 model
-        prompt = f"""
-        You are analyzing customer data for Venmito, a payment company. Based on the provided data, generate insights about:
-        
-        Customer trends by country, device usage, and identify growth opportunities. From the data, try and provide useful advice to further grow the company.
-
-        Data:
-        {json.dumps(data, indent=2)}
-
-        Output actionable insights in clear, concise sentences. Use this format:
-        - [Topic]: [Insight]
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
+        # Generate insights using the configured LLM client
+        return analyze(
+            "customers",
+            "customer",
+            "Customer trends by country, device usage, and identify growth opportunities. From the data, try and provide useful advice to further grow the company.",
+            data
         )
-        insights = response.choices[0].message.content
 
-        return jsonify({"insights": insights}), 200
-
-    except requests.exceptions.RequestException as e:
+    except SQLAlchemyError as e:
         return jsonify({"error": "Failed to fetch customer data", "details": str(e)}), 503
-    except json.JSONDecodeError as e:
-        return jsonify({"error": "Invalid JSON in customer data response", "details": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "Error analyzing customer data", "details": str(e)}), 500
 
@@ -64,45 +104,36 @@ def analyze_customers():
 @initialize_blueprint.route('/promotions', methods=['POST'])  # Changed from /analyze/promotions
 def analyze_promotions():
     try:
-        promotions = requests.get("http://127.0.0.1:5000/api/promotions/filter").json()
-        promotions_stats = requests.get("http://127.0.0.1:5000/api/promotions/stats").json()
-        promotions_stats_promotions = requests.get("http://127.0.0.1:5000/api/promotions/stats/promotions").json()
+        sources = gather_data({
+            "promotions_count": lambda session: session.query(func.count(Promotions.id)).scalar(),
+            "promotions_sample": lambda session: query_stratified_sample(
+                session, Promotions.id, Promotions.promotion, PROMOTION_FIELDS
+            ),
+            "promotions_stats": query_promotion_stats,
+            "promotions_stats_promotions": query_promotion_summary,
+        })
 
         data = {
-            "promotions": promotions,
+            "row_counts": {"promotions": sources["promotions_count"]},
+            "samples": {"promotions_by_item": sources["promotions_sample"]},
             "stats": {
-                "overall": promotions_stats,
-                "promotions": promotions_stats_promotions
+                "overall": sources["promotions_stats"],
+                "promotions": sources["promotions_stats_promotions"]
             },
             "mappings": {
                 "Promotions.recipient_id -> People.id": "Maps promotion recipients to people"
             }
         }
 
-        prompt = f"""
-        You are analyzing promotion data for Venmito, a payment company. Based on the provided data, generate insights about:
-        
-        Most successful promotions, underperforming promotions, country trends, and strategies to increase user acceptance. From the data, try and provide useful advice to further grow the company.
-
-        Data:
-        {json.dumps(data, indent=2)}
-
-        Output actionable insights in clear, concise sentences. Use this format:
-        - [Topic]: [Insight]
-        """
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
+        return analyze(
+            "promotions",
+            "promotion",
+            "Most successful promotions, underperforming promotions, country trends, and strategies to increase user acceptance. From the data, try and provide useful advice to further grow the company.",
+            data
         )
-        insights = response.choices[0].message.content
-
-        return jsonify({"insights": insights}), 200
 
-    except requests.exceptions.RequestException as e:
+    except SQLAlchemyError as e:
         return jsonify({"error": "Failed to fetch promotions data", "details": str(e)}), 503
-    except json.JSONDecodeError as e:
-        return jsonify({"error": "Invalid JSON in promotions data response", "details": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "Error analyzing promotions data", "details": str(e)}), 500
 
@@ -110,47 +141,38 @@ def analyze_promotions():
 @initialize_blueprint.route('/transactions', methods=['POST'])  # Changed from /analyze/transactions
 def analyze_transactions():
     try:
-        transactions = requests.get("http://127.0.0.1:5000/api/transactions/filter").json()
-        transactions_customers = requests.get("http://127.0.0.1:5000/api/transactions/stats/customers").json()
-        transactions_stores = requests.get("http://127.0.0.1:5000/api/transactions/stats/stores").json()
-        transactions_country = requests.get("http://127.0.0.1:5000/api/transactions/stats/spending_by_country").json()
+        sources = gather_data({
+            "transactions_count": lambda session: session.query(func.count(Transactions.id)).scalar(),
+            "transactions_sample": lambda session: query_stratified_sample(
+                session, Transactions.id, Transactions.store, TRANSACTION_FIELDS
+            ),
+            "transactions_customers": query_customer_stats,
+            "transactions_stores": query_store_stats,
+            "transactions_country": query_spending_by_country,
+        })
 
         data = {
-            "transactions": transactions,
+            "row_counts": {"transactions": sources["transactions_count"]},
+            "samples": {"transactions_by_store": sources["transactions_sample"]},
             "stats": {
-                "customers": transactions_customers,
-                "stores": transactions_stores,
-                "spending_by_country": transactions_country
+                "customers": sources["transactions_customers"],
+                "stores": sources["transactions_stores"],
+                "spending_by_country": sources["transactions_country"]
             },
             "mappings": {
                 "Transactions.customer_id -> People.id": "Maps customers to transactions"
             }
         }
 
-        prompt = f"""
-        You are analyzing transaction data for Venmito, a payment company. Based on the provided data, generate insights about:
-        
-        Most profitable stores, top customers, and revenue distribution by region. From the data, provide useful advice to further grow the company through items to promote, or stores to keep partnerships with.
-
-        Data:
-        {json.dumps(data, indent=2)}
-
-        Output actionable insights in clear, concise sentences. Use this format:
-        - [Topic]: [Insight]
-        """
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
+        return analyze(
+            "transactions",
+            "transaction",
+            "Most profitable stores, top customers, and revenue distribution by region. From the data, provide useful advice to further grow the company through items to promote, or stores to keep partnerships with.",
+            data
         )
-        insights = response.choices[0].message.content
 
-        return jsonify({"insights": insights}), 200
-
-    except requests.exceptions.RequestException as e:
+    except SQLAlchemyError as e:
         return jsonify({"error": "Failed to fetch transactions data", "details": str(e)}), 503
-    except json.JSONDecodeError as e:
-        return jsonify({"error": "Invalid JSON in transactions data response", "details": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "Error analyzing transactions data", "details": str(e)}), 500
 
@@ -158,15 +180,21 @@ def analyze_transactions():
 @initialize_blueprint.route('/transfers', methods=['POST'])  # Changed from /analyze/transfers
 def analyze_transfers():
     try:
-        transfers = requests.get("http://127.0.0.1:5000/api/transfers/filter").json()
-        transfers_country = requests.get("http://127.0.0.1:5000/api/transfers/stats/country_transfers").json()
-        transfers_monthly = requests.get("http://127.0.0.1:5000/api/transfers/stats/monthly_totals").json()
+        sources = gather_data({
+            "transfers_count": lambda session: session.query(func.count(Transfers.transfer_id)).scalar(),
+            "transfers_sample": lambda session: query_stratified_sample(
+                session, Transfers.transfer_id, year_month(Transfers.date), TRANSFER_FIELDS, serializers=TRANSFER_SERIALIZERS
+            ),
+            "transfers_country": query_country_transfer_stats,
+            "transfers_monthly": query_monthly_totals,
+        })
 
         data = {
-            "transfers": transfers,
+            "row_counts": {"transfers": sources["transfers_count"]},
+            "samples": {"transfers_by_month": sources["transfers_sample"]},
             "stats": {
-                "country_transfers": transfers_country,
-                "monthly_totals": transfers_monthly
+                "country_transfers": sources["transfers_country"],
+                "monthly_totals": sources["transfers_monthly"]
             },
             "mappings": {
                 "Transfers.sender_id -> People.id": "Maps senders to people",
@@ -174,44 +202,14 @@ def analyze_transfers():
             }
         }
 
-        prompt = f"""
-        You are analyzing transfer data for Venmito, a payment company. Based on the provided data, generate insights about:
-        
-        Countries with highest money movement, sending/receiving patterns, and flow imbalances. From the data, provide useful advice to further grow the company.
-
-        Data:
-        {json.dumps(data, indent=2)}
-
-        Output actionable insights in clear, concise sentences. Use this format:
-        - [Topic]: [Insight]
-        """
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
+        return analyze(
+            "transfers",
+            "transfer",
+            "Countries with highest money movement, sending/receiving patterns, and flow imbalances. From the data, provide useful advice to further grow the company.",
+            data
         )
-        insights = response.choices[0].message.content
-
-        return jsonify({"insights": insights}), 200
 
-    except requests.exceptions.RequestException as e:
+    except SQLAlchemyError as e:
         return jsonify({"error": "Failed to fetch transfers data", "details": str(e)}), 503
-    except json.JSONDecodeError as e:
-        return jsonify({"error": "Invalid JSON in transfers data response", "details": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "Error analyzing transfers data", "details": str(e)}), 500
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
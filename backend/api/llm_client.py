@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Which client generates insights: "openai" (default) or "stub" for local runs and tests
+LLM_CLIENT = os.getenv("VENMITO_LLM_CLIENT", "openai").strip().lower()
+
+# Model used by the OpenAI client
+LLM_MODEL = os.getenv("VENMITO_LLM_MODEL", "gpt-4o")
+
+# Number of generated insights kept in memory
+INSIGHT_CACHE_SIZE = int(os.getenv("VENMITO_INSIGHT_CACHE_SIZE", "64"))
+
+# Sends prompts to the OpenAI chat completions API
+class OpenAIClient:
+    def __init__(self, model=LLM_MODEL):
+        from openai import OpenAI
+        self.model = model
+        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    def complete(self, prompt):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+# Offline client that returns a canned answer without calling any API
+class StubLLMClient:
+    def __init__(self, response=None):
+        self.response = response
+        self.prompts = []
+
+    def complete(self, prompt):
+        self.prompts.append(prompt)
+        if self.response is not None:
+            return self.response
+        return f"- [Stub]: Received a {len(prompt)} character prompt."
+
+LLM_CLIENTS = {
+    "openai": OpenAIClient,
+    "stub": StubLLMClient,
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+# Get the configured client, creating it on first use
+def get_llm_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            if LLM_CLIENT not in LLM_CLIENTS:
+                raise ValueError(f"Unknown VENMITO_LLM_CLIENT: {LLM_CLIENT}")
+            _client = LLM_CLIENTS[LLM_CLIENT]()
+        return _client
+
+# Replace the client (e.g. with a StubLLMClient in tests)
+def set_llm_client(client):
+    global _client
+    with _client_lock:
+        _client = client
+
+# Insights already generated, keyed by a hash of the prompt data
+_insight_cache = OrderedDict()
+_insight_cache_lock = threading.Lock()
+
+# Hash the data an insight is generated from
+def data_fingerprint(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Generate insights for a prompt, reusing the previous answer for identical input data
+def generate_insights(prompt, cache_key):
+    """
+    cache_key should be data_fingerprint() of everything the prompt is built
+    from, so repeated requests on an unchanged database don't call the LLM.
+    """
+    with _insight_cache_lock:
+        if cache_key in _insight_cache:
+            _insight_cache.move_to_end(cache_key)
+            return _insight_cache[cache_key]
+
+    insights = get_llm_client().complete(prompt)
+
+    with _insight_cache_lock:
+        _insight_cache[cache_key] = insights
+        while len(_insight_cache) > INSIGHT_CACHE_SIZE:
+            _insight_cache.popitem(last=False)
+    return insights
@@ -0,0 +1,112 @@
+import os
+from flask import request, jsonify, current_app
+from api.streaming import requested_stream_format, streaming_response, rows_to_dicts
+
+# Largest page a client may request with ?limit=
+MAX_PAGE_LIMIT = 10000
+
+# Most rows counted for X-Total-Count; larger totals are reported as this many
+MAX_TOTAL_COUNT = int(os.getenv("VENMITO_MAX_TOTAL_COUNT", "10000"))
+
+# Response headers carrying the pagination state
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_CAPPED_HEADER = "X-Total-Count-Capped"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Parse ?limit=, ?after= and ?fields= for a /filter endpoint
+def parse_page_args(fields):
+    """
+    Returns (limit, after, selected_fields). limit and after are None when not
+    given; selected_fields defaults to every field. Raises ValueError on
+    invalid values or unknown field names.
+    """
+    limit = request.args.get('limit', '').strip()
+    after = request.args.get('after', '').strip()
+    requested_fields = request.args.get('fields', '').strip()
+
+    if limit:
+        limit = int(limit)
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    else:
+        limit = None
+
+    after = int(after) if after else None
+
+    if requested_fields:
+        selected_fields = [name.strip() for name in requested_fields.split(',') if name.strip()]
+        unknown = [name for name in selected_fields if name not in fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        selected_fields = list(fields)
+
+    return limit, after, selected_fields
+
+# Run a filtered query one keyset page at a time and serialize only the requested columns
+def paginated_response(query, key_column, fields, serializers=None):
+    """
+    Orders the query by key_column and returns the rows after ?after= (up to
+    ?limit=) as a JSON array of the ?fields= columns. Only the selected columns
+    are fetched and the statement is run through Core on the session's
+    connection, so no ORM objects or ORM result rows are built; the dicts go
+    straight to the app's JSON provider (orjson, see api/json_provider.py).
+
+    X-Next-Cursor is set when more rows follow; pass it back as ?after=.
+    X-Total-Count is only computed for the first page (skip it with
+    ?count=false); without ?limit= it is just the number of rows returned.
+    Counting stops at MAX_TOTAL_COUNT rows, so a broad filter doesn't read
+    every match; a total at the cap is flagged with X-Total-Count-Capped.
+
+    With ?format=ndjson or ?format=json-stream the rows are streamed instead
+    (see api/streaming.py) and neither header is sent.
+    """
+    serializers = serializers or {}
+    try:
+        limit, after, selected_fields = parse_page_args(fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filtered_query = query
+    if after is not None:
+        query = query.filter(key_column > after)
+    query = query.order_by(key_column).with_entities(*(fields[name] for name in selected_fields), key_column)
+
+    # ?format=ndjson / json-stream: stream the rows instead of building one array
+    stream_format = requested_stream_format()
+    if stream_format is not None:
+        if limit is not None:
+            query = query.limit(limit)
+        return streaming_response(query, selected_fields, stream_format, serializers), 200
+
+    total_count = None
+    total_capped = False
+    if limit is not None and after is None and request.args.get('count', 'true').lower() != 'false':
+        total_count = filtered_query.order_by(None).limit(MAX_TOTAL_COUNT + 1).count()
+        if total_count > MAX_TOTAL_COUNT:
+            total_count = MAX_TOTAL_COUNT
+            total_capped = True
+
+    if limit is not None:
+        # Fetch one extra row to know whether another page follows
+        query = query.limit(limit + 1)
+
+    rows = query.session.connection().execute(query.statement).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][-1]
+
+    results = rows_to_dicts(rows, selected_fields, serializers)
+
+    response = current_app.json.response(results)
+    if limit is None:
+        total_count = len(results)
+    if total_count is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total_count)
+    if total_capped:
+        response.headers[TOTAL_COUNT_CAPPED_HEADER] = "true"
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return response, 200
@@ -1,19 +1,29 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import create_engine, or_, and_, func, case
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import or_, and_
+from api.database import db_session, analytics_session
+from api.pagination import paginated_response
+from api.search import contains_filters
+from api.cache import cached_response
 from models.people import People
-import os
-
-# Set up SQLAlchemy
-DATABASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage/venmito.db"))
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+from models.summaries import CountryDeviceCounts
 
 # Define the blueprint
 people_blueprint = Blueprint('people', __name__)
 
+# Columns returned by /filter (and selectable with ?fields=), in response order
+PEOPLE_FIELDS = {
+    "id": People.id,
+    "email": People.email,
+    "phone": People.phone,
+    "firstName": People.firstName,
+    "surname": People.surname,
+    "city": People.city,
+    "country": People.country,
+    "Android": People.Android,
+    "iPhone": People.iPhone,
+    "Desktop": People.Desktop,
+}
+
 # Endpoint to display all people and perform filtering
 @people_blueprint.route('/filter', methods=['GET'])
 def filter_people():
@@ -26,20 +36,23 @@ def filter_people():
         devices = request.args.getlist('device')
 
         # Start building the query
-        query = session.query(People)
+        query = db_session.query(People)
 
         # Only apply filters if they are provided (not empty strings)
+        search_terms = []
         if first_name.strip():
-            query = query.filter(People.firstName.ilike(f"%{first_name}%"))
+            search_terms.append((People.firstName, first_name))
 
         if last_name.strip():
-            query = query.filter(People.surname.ilike(f"%{last_name}%"))
+            search_terms.append((People.surname, last_name))
 
         if city.strip():
-            query = query.filter(People.city.ilike(f"%{city}%"))
+            search_terms.append((People.city, city))
 
         if country.strip():
-            query = query.filter(People.country.ilike(f"%{country}%"))
+            search_terms.append((People.country, country))
+
+        query, key_column = contains_filters(query, People, search_terms)
 
         # Device filtering - only filter for selected devices
         if devices:
@@ -58,86 +71,68 @@ def filter_people():
                 # Use and_ to require all selected devices to be True
                 query = query.filter(and_(*device_conditions))
 
-        # Execute the query
-        results = query.all()
+        # Execute the query one keyset page at a time and serialize the results
+        return paginated_response(query, key_column, PEOPLE_FIELDS)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Serialize the results
-        people = [
+# Compute the country and device distribution of people
+def query_people_stats(session):
+    # Per-country counts, precomputed at load time (models/summaries.py)
+    country_stats = session.query(
+        CountryDeviceCounts.country,
+        CountryDeviceCounts.people_count.label('count'),
+        CountryDeviceCounts.android_count,
+        CountryDeviceCounts.iphone_count,
+        CountryDeviceCounts.desktop_count
+    ).order_by(CountryDeviceCounts.country).all()
+
+    # Get total count for percentages
+    total_people = sum(stat.count for stat in country_stats)
+
+    # Get device stats
+    android_count = sum(stat.android_count for stat in country_stats)
+    iphone_count = sum(stat.iphone_count for stat in country_stats)
+    desktop_count = sum(stat.desktop_count for stat in country_stats)
+    total_devices = android_count + iphone_count + desktop_count
+
+    stats = {
+        'country_stats': [
             {
-                "id": person.id,
-                "email": person.email,
-                "phone": person.phone,
-                "firstName": person.firstName,
-                "surname": person.surname,
-                "city": person.city,
-                "country": person.country,
-                "Android": person.Android,
-                "iPhone": person.iPhone,
-                "Desktop": person.Desktop
+                'country': stat.country or 'Unknown',
+                'count': stat.count,
+                'percentage': round((stat.count / total_people) * 100, 2)
             }
-            for person in results
-        ]
+            for stat in country_stats
+        ],
+        'device_stats': [
+            {
+                'device': 'Android',
+                'count': android_count,
+                'percentage': round((android_count / total_devices) * 100, 2) if total_devices > 0 else 0
+            },
+            {
+                'device': 'iPhone',
+                'count': iphone_count,
+                'percentage': round((iphone_count / total_devices) * 100, 2) if total_devices > 0 else 0
+            },
+            {
+                'device': 'Desktop',
+                'count': desktop_count,
+                'percentage': round((desktop_count / total_devices) * 100, 2) if total_devices > 0 else 0
+            }
+        ],
+        'total_people': total_people,
+        'total_devices': total_devices
+    }
 
-        return jsonify(people), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return stats
 
 # Query stats for people data based on country and device
 @people_blueprint.route('/stats', methods=['GET'])
+@cached_response
 def get_stats():
     try:
-        # Get total count for percentages
-        total_people = session.query(People).count()
-
-        # Get country stats
-        country_stats = session.query(
-            People.country,
-            func.count(People.id).label('count')
-        ).group_by(People.country).all()
-
-        # Get device stats
-        total_devices = session.query(
-            func.sum(
-                case((People.Android.is_(True), 1), else_=0) +
-                case((People.iPhone.is_(True), 1), else_=0) +
-                case((People.Desktop.is_(True), 1), else_=0)
-            )
-        ).scalar() or 0
-
-        android_count = session.query(func.count(People.id)).filter(People.Android.is_(True)).scalar()
-        iphone_count = session.query(func.count(People.id)).filter(People.iPhone.is_(True)).scalar()
-        desktop_count = session.query(func.count(People.id)).filter(People.Desktop.is_(True)).scalar()
-
-        stats = {
-            'country_stats': [
-                {
-                    'country': stat.country or 'Unknown',
-                    'count': stat.count,
-                    'percentage': round((stat.count / total_people) * 100, 2)
-                }
-                for stat in country_stats
-            ],
-            'device_stats': [
-                {
-                    'device': 'Android',
-                    'count': android_count,
-                    'percentage': round((android_count / total_devices) * 100, 2) if total_devices > 0 else 0
-                },
-                {
-                    'device': 'iPhone',
-                    'count': iphone_count,
-                    'percentage': round((iphone_count / total_devices) * 100, 2) if total_devices > 0 else 0
-                },
-                {
-                    'device': 'Desktop',
-                    'count': desktop_count,
-                    'percentage': round((desktop_count / total_devices) * 100, 2) if total_devices > 0 else 0
-                }
-            ],
-            'total_people': total_people,
-            'total_devices': total_devices
-        }
-
-        return jsonify(stats), 200
+        return jsonify(query_people_stats(analytics_session)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,20 +1,24 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import create_engine, or_, and_, func, case
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import or_, and_, func
+from api.database import db_session, analytics_session
+from api.pagination import paginated_response
+from api.search import contains_filters
+from api.cache import cached_response
 from models.promotions import Promotions
-from models.people import People
-import os
-
-# Set up SQLAlchemy
-DATABASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage/venmito.db"))
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+from models.summaries import PromotionResponseByCountry, PromotionResponseByItem
 
 # Define the blueprint
 promotions_blueprint = Blueprint('promotions', __name__)
 
+# Columns returned by /filter (and selectable with ?fields=), in response order
+PROMOTION_FIELDS = {
+    "id": Promotions.id,
+    "client_email": Promotions.client_email,
+    "phone": Promotions.phone,
+    "promotion": Promotions.promotion,
+    "responded": Promotions.responded,
+}
+
 # Endpoint to display all promotions and perform filtering
 @promotions_blueprint.route('/filter', methods=['GET'])
 def filter_promotions():
@@ -25,14 +29,17 @@ def filter_promotions():
         responded = request.args.getlist('responded')  # Will handle like devices
 
         # Start building the query
-        query = session.query(Promotions)
+        query = db_session.query(Promotions)
 
         # Only apply filters if they are provided (not empty strings)
+        search_terms = []
         if promotion.strip():
-            query = query.filter(Promotions.promotion.ilike(f"%{promotion}%"))
+            search_terms.append((Promotions.promotion, promotion))
 
         if email.strip():
-            query = query.filter(Promotions.client_email.ilike(f"%{email}%"))
+            search_terms.append((Promotions.client_email, email))
+
+        query, key_column = contains_filters(query, Promotions, search_terms)
 
         # Response filtering - matching database format of "Yes"/"No"
         if responded:
@@ -45,111 +52,92 @@ def filter_promotions():
             if response_conditions:
                 query = query.filter(and_(*response_conditions))
 
-        # Execute the query
-        results = query.all()
-
-        # Serialize the results
-        promotions = [
-            {
-                "id": promo.id,
-                "client_email": promo.client_email,
-                "phone": promo.phone,
-                "promotion": promo.promotion,
-                "responded": promo.responded
-            }
-            for promo in results
-        ]
-
-        return jsonify(promotions), 200
+        # Execute the query one keyset page at a time and serialize the results
+        return paginated_response(query, key_column, PROMOTION_FIELDS)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Compute promotion response rates by country and overall
+def query_promotion_stats(session):
+    # Get response rate by country, precomputed at load time (models/summaries.py)
+    country_response_rates = session.query(
+        PromotionResponseByCountry.country,
+        PromotionResponseByCountry.total_promotions,
+        PromotionResponseByCountry.accepted_promotions
+    ).order_by(PromotionResponseByCountry.country).all()
+
+    # Calculate percentages and format response
+    country_stats = []
+    for country, total, accepted in country_response_rates:
+        if total > 0:  # Avoid division by zero
+            response_rate = (accepted / total) * 100
+            country_stats.append({
+                'country': country or 'Unknown',
+                'total_promotions': total,
+                'accepted_promotions': accepted,
+                'response_rate': round(response_rate, 2)
+            })
+
+    # Overall promotion statistics, rolled up from the per-item summary
+    overall_stats = session.query(
+        func.coalesce(func.sum(PromotionResponseByItem.total_responses), 0).label('total_promotions'),
+        func.sum(PromotionResponseByItem.responded_yes).label('total_accepted'),
+        func.count(PromotionResponseByItem.promotion).label('unique_promotions')
+    ).first()
+
+    return {
+        'country_stats': country_stats,
+        'overall_stats': {
+            'total_promotions': overall_stats[0],
+            'total_accepted': overall_stats[1],
+            'unique_promotions': overall_stats[2],
+            'overall_response_rate': round(
+                (overall_stats[1] / overall_stats[0] * 100), 2
+            ) if overall_stats[0] > 0 else 0
+        }
+    }
+
 # Endpoint to get promotion acceptance statistics by country
 @promotions_blueprint.route('/stats', methods=['GET'])
+@cached_response
 def get_promotion_stats():
     try:
-        # Get response rate by country
-        country_response_rates = session.query(
-            People.country,
-            func.count(Promotions.id).label('total_promotions'),
-            func.sum(
-                case(
-                    (Promotions.responded == 'Yes', 1),
-                    else_=0
-                )
-            ).label('accepted_promotions')
-        ).join(
-            Promotions,
-            People.email == Promotions.client_email
-        ).group_by(
-            People.country
-        ).all()
-
-        # Calculate percentages and format response
-        country_stats = []
-        for country, total, accepted in country_response_rates:
-            if total > 0:  # Avoid division by zero
-                response_rate = (accepted / total) * 100
-                country_stats.append({
-                    'country': country or 'Unknown',
-                    'total_promotions': total,
-                    'accepted_promotions': accepted,
-                    'response_rate': round(response_rate, 2)
-                })
-
-        # Overall promotion statistics
-        overall_stats = session.query(
-            func.count(Promotions.id).label('total_promotions'),
-            func.sum(
-                case(
-                    (Promotions.responded == 'Yes', 1),
-                    else_=0
-                )
-            ).label('total_accepted'),
-            func.count(func.distinct(Promotions.promotion)).label('unique_promotions')
-        ).first()
-
-        return jsonify({
-            'country_stats': country_stats,
-            'overall_stats': {
-                'total_promotions': overall_stats[0],
-                'total_accepted': overall_stats[1],
-                'unique_promotions': overall_stats[2],
-                'overall_response_rate': round(
-                    (overall_stats[1] / overall_stats[0] * 100), 2
-                ) if overall_stats[0] > 0 else 0
-            }
-        }), 200
+        return jsonify(query_promotion_stats(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_promotion_stats: {str(e)}")  # For debugging
         return jsonify({"error": str(e)}), 500
 
+# Compute response rates per promotion item, highest first
+def query_promotion_summary(session):
+    # Read the per-item stats precomputed at load time (models/summaries.py)
+    promotion_stats = session.query(
+        PromotionResponseByItem.promotion,
+        PromotionResponseByItem.total_responses,
+        PromotionResponseByItem.responded_yes
+    ).order_by(
+        (PromotionResponseByItem.responded_yes / PromotionResponseByItem.total_responses).desc()
+    ).all()
+
+    # Format the results
+    summary = [
+        {
+            'promotion': promo[0],
+            'total_responses': promo[1],
+            'responded_yes': promo[2],
+            'response_yes_rate': round((promo[2] / promo[1]) * 100, 2) if promo[1] > 0 else 0
+        }
+        for promo in promotion_stats
+    ]
+
+    return summary
+
 # Endpoint to get promotion summary statistics by promotion item
 @promotions_blueprint.route('/stats/promotions', methods=['GET'])
+@cached_response
 def get_promotion_summary():
     try:
-        # Query promotions table to calculate stats
-        promotion_stats = session.query(
-            Promotions.promotion,
-            func.count(Promotions.id).label('total_responses'),
-            func.sum(case((Promotions.responded == 'Yes', 1), else_=0)).label('responded_yes'),
-        ).group_by(Promotions.promotion).order_by(
-            (func.sum(case((Promotions.responded == 'Yes', 1), else_=0)) / func.count(Promotions.id)).desc()
-        ).all()
-
-        # Format the results
-        summary = [
-            {
-                'promotion': promo[0],
-                'total_responses': promo[1],
-                'responded_yes': promo[2],
-                'response_yes_rate': round((promo[2] / promo[1]) * 100, 2) if promo[1] > 0 else 0
-            }
-            for promo in promotion_stats
-        ]
-
-        return jsonify(summary), 200
+        return jsonify(query_promotion_summary(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_promotion_summary: {str(e)}")  # Debugging
@@ -0,0 +1,105 @@
+import json
+import os
+from sqlalchemy import func
+
+# Largest prompt data payload, in (estimated) tokens
+PROMPT_TOKEN_BUDGET = int(os.getenv("VENMITO_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Sample rows taken from every group (country, store, month, ...) of a table
+SAMPLE_ROWS_PER_GROUP = int(os.getenv("VENMITO_PROMPT_SAMPLE_ROWS", "3"))
+
+# Longest list kept before the payload is shrunk to fit the budget
+MAX_LIST_ITEMS = 50
+
+# Key of the prompt data holding the stratified samples, which are capped separately from the stats
+SAMPLE_KEY = "samples"
+
+# tiktoken is optional; without it tokens are estimated at ~4 characters each
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+# Count (or estimate) the tokens in a piece of text
+def estimate_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+# Take up to per_group rows from every group of a table, in a fixed pseudo-random order
+def query_stratified_sample(session, key_column, group_column, fields, per_group=SAMPLE_ROWS_PER_GROUP, serializers=None):
+    """
+    Ranks each group's rows by a multiplicative hash of key_column with
+    ROW_NUMBER() and keeps the first per_group, so every group is represented
+    and the same database always yields the same sample (and insight cache key).
+    Rows come round-robin across the groups (every group's first row, then
+    every group's second, ...), so cutting the list short keeps it stratified.
+    """
+    serializers = serializers or {}
+    shuffle = (key_column * 2654435761) % 4294967296
+    ranked = session.query(
+        *(column.label(name) for name, column in fields.items()),
+        group_column.label('sample_group'),
+        func.row_number().over(partition_by=group_column, order_by=(shuffle, key_column)).label('sample_rank')
+    ).subquery()
+
+    rows = session.query(*(ranked.c[name] for name in fields)).filter(
+        ranked.c.sample_rank <= per_group
+    ).order_by(ranked.c.sample_rank, ranked.c.sample_group).all()
+
+    return [
+        {
+            name: serializers[name](value) if name in serializers else value
+            for name, value in zip(fields, row)
+        }
+        for row in rows
+    ]
+
+# Copy data with every list cut down to max_items, noting how many items were left out
+def cap_lists(data, max_items):
+    if isinstance(data, dict):
+        return {key: cap_lists(value, max_items) for key, value in data.items()}
+    if isinstance(data, list):
+        capped = [cap_lists(item, max_items) for item in data[:max_items]]
+        if len(data) > max_items:
+            capped.append(f"... {len(data) - max_items} more omitted")
+        return capped
+    return data
+
+# Serialize the prompt data, shrinking its lists until it fits the token budget
+def build_prompt_payload(data, token_budget=PROMPT_TOKEN_BUDGET):
+    """
+    data should hold aggregated stats and, under SAMPLE_KEY, samples from
+    query_stratified_sample, with lists ordered by importance (e.g. top
+    customers first). The stats and sample lists have caps of their own,
+    both starting at MAX_LIST_ITEMS: while the JSON is over token_budget,
+    the cap of whichever part takes more tokens is halved. Returns the JSON
+    text and a report of its size.
+    """
+    samples = data.get(SAMPLE_KEY, {})
+    rest = {key: value for key, value in data.items() if key != SAMPLE_KEY}
+    max_items = max_sample_items = MAX_LIST_ITEMS
+    while True:
+        capped_rest = cap_lists(rest, max_items)
+        capped_samples = cap_lists(samples, max_sample_items)
+        payload = dict(capped_rest, **{SAMPLE_KEY: capped_samples}) if SAMPLE_KEY in data else capped_rest
+        text = json.dumps(payload, separators=(",", ":"), default=str)
+        tokens = estimate_tokens(text)
+        if tokens <= token_budget or max_items == max_sample_items == 0:
+            break
+        sample_tokens = estimate_tokens(json.dumps(capped_samples, separators=(",", ":"), default=str))
+        if max_items == 0 or (max_sample_items > 0 and sample_tokens * 2 >= tokens):
+            max_sample_items //= 2
+        else:
+            max_items //= 2
+
+    report = {
+        "tokens": tokens,
+        "bytes": len(text.encode("utf-8")),
+        "token_budget": token_budget,
+        "max_list_items": max_items,
+        "max_sample_items": max_sample_items,
+        "tokenizer": "tiktoken" if _encoding is not None else "estimate",
+    }
+    return text, report
@@ -0,0 +1,88 @@
+import os
+from sqlalchemy import column, func, literal_column, select, table
+
+# Shortest term the trigram index can answer; shorter terms scan with ilike
+MIN_TRIGRAM_TERM = 3
+
+# Matches read from the index to tell whether a term is broad (see is_broad_term)
+SEARCH_PROBE_ROWS = int(os.getenv("VENMITO_SEARCH_PROBE_ROWS", "1000"))
+
+# Share of the table a term must match to be searched with ilike instead of the index
+SEARCH_BROAD_SHARE = float(os.getenv("VENMITO_SEARCH_BROAD_SHARE", "0.2"))
+
+# FTS5 trigram tables (storage/migrations/0003_trigram_search.sql) by the
+# table they index, with the columns each one covers
+SEARCH_TABLES = {
+    "People": table("PeopleSearch", column("rowid"), column("firstName"), column("surname"),
+                    column("city"), column("country")),
+    "Promotions": table("PromotionsSearch", column("rowid"), column("promotion"), column("client_email")),
+    "Transactions": table("TransactionsSearch", column("rowid"), column("store"), column("item_name")),
+}
+
+# Whether a term can be looked up in the trigram index with the same result as ilike
+def uses_trigram_index(term):
+    """
+    Terms shorter than one trigram can't be looked up. LIKE wildcards (% and
+    _) have no meaning in a MATCH phrase, and the tokenizer folds the case of
+    non-ASCII letters where SQLite's lower() doesn't, so those terms are left
+    to ilike as well.
+    """
+    return len(term) >= MIN_TRIGRAM_TERM and term.isascii() and "%" not in term and "_" not in term
+
+# FTS5 query matching a term as a phrase in one column of the search table
+def column_phrase(attribute, term):
+    return attribute.key + ' : "' + term.replace('"', '""') + '"'
+
+# MATCH condition on the whole search table (column filters pick the columns)
+def search_match(search, expression):
+    return literal_column(search.name).match(expression)
+
+# Whether a term matches so much of the table that scanning it with ilike is cheaper
+def is_broad_term(session, attribute, term):
+    """
+    Reads at most SEARCH_PROBE_ROWS matches from the index, in rowid order. A
+    term with fewer matches is selective. Otherwise its share of the table is
+    estimated from how far into the table those matches reach. At
+    SEARCH_BROAD_SHARE or more, a scan finds a page of matches within a few
+    hundred rows and counts them about as fast as the index, and other
+    indexed filters (e.g. customer_id) can drive the query.
+    """
+    model = attribute.class_
+    search = SEARCH_TABLES[model.__tablename__]
+    probe = select(search.c.rowid).where(
+        search_match(search, column_phrase(attribute, term))
+    ).order_by(search.c.rowid).limit(SEARCH_PROBE_ROWS).subquery()
+    matches, last_rowid = session.execute(select(func.count(), func.max(probe.c.rowid))).one()
+    if not matches or matches < SEARCH_PROBE_ROWS:
+        return False
+    first_rowid = session.execute(select(func.min(model.id))).scalar()
+    return matches / (last_rowid - first_rowid + 1) >= SEARCH_BROAD_SHARE
+
+# Case-insensitive "column contains term" filters for the /filter endpoints
+def contains_filters(query, model, terms, use_index=True):
+    """
+    terms is a list of (attribute, term) on model; each keeps the rows that
+    attribute.ilike('%term%') would. Terms the trigram index can answer (see
+    uses_trigram_index) and that aren't broad (see is_broad_term) are combined
+    into one MATCH on the table's search table, which is joined on rowid. Pages
+    are then read in the search table's rowid order, so a page reads only as
+    many index entries as it returns. The other terms are filtered with ilike,
+    as are all of them with use_index=False (for queries an indexed filter
+    already narrows to a few rows).
+
+    Returns (query, key_column). key_column is the search table's rowid when
+    it is joined and model.id otherwise; it has the same values either way,
+    and is what paginated_response should page and order by.
+    """
+    phrases = []
+    for attribute, term in terms:
+        if use_index and uses_trigram_index(term) and not is_broad_term(query.session, attribute, term):
+            phrases.append(column_phrase(attribute, term))
+        else:
+            query = query.filter(attribute.ilike(f"%{term}%"))
+
+    if not phrases:
+        return query, model.id
+    search = SEARCH_TABLES[model.__tablename__]
+    query = query.join(search, search.c.rowid == model.id).filter(search_match(search, " AND ".join(phrases)))
+    return query, search.c.rowid
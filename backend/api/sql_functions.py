@@ -0,0 +1,21 @@
+from sqlalchemy import func, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# SQL functions whose spelling differs between the storage backends (see api/database.py)
+
+# Calendar month ('YYYY-MM') of a date column
+class year_month(FunctionElement):
+    type = String()
+    name = "year_month"
+    inherit_cache = True
+
+# SQLite: strftime(format, value)
+@compiles(year_month)
+def compile_year_month(element, compiler, **kw):
+    return compiler.process(func.strftime('%Y-%m', *element.clauses), **kw)
+
+# DuckDB takes the arguments the other way round: strftime(value, format)
+@compiles(year_month, "duckdb")
+def compile_year_month_duckdb(element, compiler, **kw):
+    return compiler.process(func.strftime(*element.clauses, '%Y-%m'), **kw)
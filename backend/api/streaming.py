@@ -0,0 +1,74 @@
+from flask import Response, current_app, request, stream_with_context
+
+# Rows fetched from the cursor (and written to the response) per chunk
+STREAM_BATCH_SIZE = 1000
+
+# ?format= value -> response mimetype
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",       # One JSON object per line
+    "json-stream": "application/json",      # A regular JSON array, sent in chunks
+}
+
+# Work out whether the client asked for a streamed response
+def requested_stream_format():
+    """
+    Returns "ndjson" or "json-stream" when requested through ?format=, or
+    "ndjson" when the client prefers application/x-ndjson in its Accept
+    header; otherwise None.
+    """
+    stream_format = request.args.get('format', '').strip().lower()
+    if stream_format in STREAM_FORMATS:
+        return stream_format
+    best = request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"])
+    if best == "application/x-ndjson":
+        return "ndjson"
+    return None
+
+# Turn result rows into dicts of the selected fields, applying the per-field serializers
+def rows_to_dicts(rows, selected_fields, serializers=None):
+    """
+    Rows hold the selected fields in order (any trailing columns, such as the
+    pagination key, are ignored by zip). Fields without a serializer are
+    copied as-is by dict(zip()), the fastest way to build the dicts.
+    """
+    serializers = {name: serializers[name] for name in selected_fields if name in (serializers or {})}
+    if not serializers:
+        return [dict(zip(selected_fields, row)) for row in rows]
+    results = []
+    for row in rows:
+        item = dict(zip(selected_fields, row))
+        for name, serialize in serializers.items():
+            item[name] = serialize(item[name])
+        results.append(item)
+    return results
+
+# Stream the rows of a column query as NDJSON or a chunked JSON array
+def streaming_response(query, selected_fields, stream_format, serializers=None):
+    """
+    Runs the statement through Core with yield_per, so only STREAM_BATCH_SIZE
+    rows are held in memory at once and the first bytes go out before the
+    query finishes. The query must select selected_fields followed by a
+    trailing key column.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        chunk = []
+        first_row = True
+        if stream_format == "json-stream":
+            yield "["
+        connection = query.session.connection().execution_options(yield_per=STREAM_BATCH_SIZE)
+        for partition in connection.execute(query.statement).partitions():
+            for item in rows_to_dicts(partition, selected_fields, serializers):
+                encoded = dumps(item)
+                if stream_format == "ndjson":
+                    chunk.append(encoded + "\n")
+                else:
+                    chunk.append(encoded if first_row else "," + encoded)
+                first_row = False
+            yield "".join(chunk)
+            chunk = []
+        if stream_format == "json-stream":
+            yield "]"
+
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[stream_format])
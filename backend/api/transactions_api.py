@@ -1,20 +1,32 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import create_engine, or_, and_, func, case
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import or_, and_, func, case, literal, null, select, union_all
+from api.database import db_session, analytics_session
+from api.pagination import paginated_response
+from api.search import contains_filters
+from api.cache import cached_response
 from models.transactions import Transactions
 from models.people import People
-import os
-
-# Set up SQLAlchemy
-DATABASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage/venmito.db"))
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+from models.summaries import StoreRevenue
 
 # Define the blueprint
 transactions_blueprint = Blueprint('transactions', __name__)
 
+# Columns returned by /filter (and selectable with ?fields=), in response order
+TRANSACTION_FIELDS = {
+    "id": Transactions.id,
+    "transaction_id": Transactions.transaction_id,
+    "customer_id": Transactions.customer_id,
+    "phone": Transactions.phone,
+    "store": Transactions.store,
+    "item_name": Transactions.item_name,
+    "quantity": Transactions.quantity,
+    "price_per_item": Transactions.price_per_item,
+    "total_price": Transactions.total_price,
+}
+
+# Largest ?top_n= accepted by /stats/stores
+MAX_STORE_TOP_N = 100
+
 # Endpoint to display all transactions and perform filtering
 @transactions_blueprint.route('/filter', methods=['GET'])
 def filter_transactions():
@@ -26,13 +38,15 @@ def filter_transactions():
         item_name = request.args.get('item_name', '').lower()
 
         # Start building the query
-        query = session.query(Transactions)
+        query = db_session.query(Transactions)
+        narrowed = False
 
         # Filter by transaction_id if provided
         if transaction_id:
             try:
                 tid = int(transaction_id)
                 query = query.filter(Transactions.transaction_id == tid)
+                narrowed = True
             except ValueError:
                 pass
 
@@ -41,181 +55,219 @@ def filter_transactions():
             try:
                 cid = int(customer_id)
                 query = query.filter(Transactions.customer_id == cid)
+                narrowed = True
             except ValueError:
                 pass
 
         # Text filters
+        search_terms = []
         if store:
-            query = query.filter(Transactions.store.ilike(f"%{store}%"))
+            search_terms.append((Transactions.store, store))
 
         if item_name:
-            query = query.filter(Transactions.item_name.ilike(f"%{item_name}%"))
-
-        # Execute query and serialize results
-        results = query.all()
-        transactions = [
-            {
-                "id": trans.id,
-                "transaction_id": trans.transaction_id,
-                "customer_id": trans.customer_id,
-                "phone": trans.phone,
-                "store": trans.store,
-                "item_name": trans.item_name,
-                "quantity": trans.quantity,
-                "price_per_item": trans.price_per_item,
-                "total_price": trans.total_price
-            }
-            for trans in results
-        ]
+            search_terms.append((Transactions.item_name, item_name))
 
-        return jsonify(transactions), 200
+        # An id filter leaves a few rows, which ilike checks faster than the search index reads its matches
+        query, key_column = contains_filters(query, Transactions, search_terms, use_index=not narrowed)
+
+        # Execute query one keyset page at a time and serialize results
+        return paginated_response(query, key_column, TRANSACTION_FIELDS)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Per-customer total spend, favorite item (by quantity) and favorite store (by money spent)
+def query_customer_stats(session):
+    """
+    Computes every customer's stats in one query. ROW_NUMBER() picks the top
+    item and store per customer (ties broken alphabetically), and the three
+    per-customer results are stacked with UNION ALL and collapsed by a single
+    GROUP BY, so no joins or Python-side matching are needed. Rows are ordered
+    by total spend, highest first.
+    """
+    # Rank each customer's items by total quantity bought
+    item_ranks = session.query(
+        Transactions.customer_id,
+        Transactions.item_name,
+        func.row_number().over(
+            partition_by=Transactions.customer_id,
+            order_by=(func.sum(Transactions.quantity).desc(), Transactions.item_name)
+        ).label('rank')
+    ).group_by(Transactions.customer_id, Transactions.item_name).subquery()
+
+    # Rank each customer's stores by total money spent
+    store_ranks = session.query(
+        Transactions.customer_id,
+        Transactions.store,
+        func.row_number().over(
+            partition_by=Transactions.customer_id,
+            order_by=(func.sum(Transactions.total_price).desc(), Transactions.store)
+        ).label('rank')
+    ).group_by(Transactions.customer_id, Transactions.store).subquery()
+
+    # One row per customer for each part: total spending, top item, top store
+    parts = union_all(
+        select(
+            Transactions.customer_id,
+            func.sum(Transactions.total_price).label('total_spent'),
+            null().label('favorite_item'),
+            null().label('favorite_store')
+        ).group_by(Transactions.customer_id),
+        select(item_ranks.c.customer_id, null(), item_ranks.c.item_name, null())
+        .where(item_ranks.c.rank == 1),
+        select(store_ranks.c.customer_id, null(), null(), store_ranks.c.store)
+        .where(store_ranks.c.rank == 1)
+    ).subquery()
+
+    total_spent = func.max(parts.c.total_spent)
+    rows = session.query(
+        parts.c.customer_id,
+        total_spent,
+        func.max(parts.c.favorite_item),
+        func.max(parts.c.favorite_store)
+    ).group_by(parts.c.customer_id).order_by(
+        total_spent.desc(),
+        parts.c.customer_id
+    ).all()
+
+    return [
+        {
+            'customer_id': customer_id,
+            'total_spent': total_spent,
+            'favorite_item': favorite_item,
+            'favorite_store': favorite_store
+        }
+        for customer_id, total_spent, favorite_item, favorite_store in rows
+    ]
+
+# Compute each store's revenue plus its top-N customers and products in one pass
+def query_store_stats(session, top_n=1):
+    """
+    Ranks every store's customers (by money spent) and products (by quantity
+    sold) with ROW_NUMBER(), keeps the first top_n of each, and returns them
+    with the store totals from a single UNION ALL query. Ties go to the lower
+    customer_id / alphabetically first item. Stores are ordered by revenue,
+    highest first.
+    """
+    # Rank each store's customers by total money spent
+    customer_ranks = session.query(
+        Transactions.store,
+        Transactions.customer_id,
+        func.sum(Transactions.total_price).label('total_spent'),
+        func.row_number().over(
+            partition_by=Transactions.store,
+            order_by=(func.sum(Transactions.total_price).desc(), Transactions.customer_id)
+        ).label('rank')
+    ).group_by(Transactions.store, Transactions.customer_id).subquery()
+
+    # Rank each store's products by total quantity sold
+    product_ranks = session.query(
+        Transactions.store,
+        Transactions.item_name,
+        func.sum(Transactions.quantity).label('total_quantity'),
+        func.row_number().over(
+            partition_by=Transactions.store,
+            order_by=(func.sum(Transactions.quantity).desc(), Transactions.item_name)
+        ).label('rank')
+    ).group_by(Transactions.store, Transactions.item_name).subquery()
+
+    # One row per store total (precomputed in StoreRevenue), then one per top customer and top product, in rank order
+    rows = session.execute(union_all(
+        select(
+            StoreRevenue.store,
+            literal('store').label('kind'),
+            literal(0).label('rank'),
+            StoreRevenue.total_money_made.label('amount'),
+            null().label('customer_id'),
+            null().label('item_name')
+        ),
+        select(customer_ranks.c.store, literal('customer'), customer_ranks.c.rank, customer_ranks.c.total_spent,
+               customer_ranks.c.customer_id, null())
+        .where(customer_ranks.c.rank <= top_n),
+        select(product_ranks.c.store, literal('product'), product_ranks.c.rank, product_ranks.c.total_quantity,
+               null(), product_ranks.c.item_name)
+        .where(product_ranks.c.rank <= top_n)
+    ).order_by('store', 'rank')).all()
+
+    stores = {}
+    for store, kind, rank, amount, customer_id, item_name in rows:
+        if kind == 'store':
+            stores[store] = {
+                'store': store,
+                'best_customer': None,
+                'best_selling_product': None,
+                'total_money_made': amount,
+                'top_customers': [],
+                'top_products': []
+            }
+        elif kind == 'customer':
+            stores[store]['top_customers'].append({'customer_id': customer_id, 'total_spent': amount})
+        else:
+            stores[store]['top_products'].append({'item_name': item_name, 'total_quantity': int(amount)})
+
+    for stats in stores.values():
+        if stats['top_customers']:
+            stats['best_customer'] = stats['top_customers'][0]['customer_id']
+        if stats['top_products']:
+            stats['best_selling_product'] = stats['top_products'][0]['item_name']
+
+    return sorted(stores.values(), key=lambda x: (-x['total_money_made'], x['store'] or ''))
+
 # Endpoint to get transaction statistics by customer
 @transactions_blueprint.route('/stats/customers', methods=['GET'])
+@cached_response
 def get_customer_stats():
     try:
-        # Get the total spending for each customer
-        customer_spending = session.query(
-            Transactions.customer_id,
-            func.sum(Transactions.total_price).label('total_spent')
-        ).group_by(Transactions.customer_id).\
-        order_by(func.sum(Transactions.total_price).desc()).\
-        all()
-
-        # Get the favorite item for each customer (By quantity bought)
-        customer_favorite_items = session.query(
-            Transactions.customer_id,
-            Transactions.item_name,
-            func.sum(Transactions.quantity).label('total_quantity')
-        ).group_by(
-            Transactions.customer_id,
-            Transactions.item_name
-        ).\
-        order_by(Transactions.customer_id, func.sum(Transactions.quantity).desc()).\
-        distinct(Transactions.customer_id).\
-        all()
-
-        # Get the favorite store for each customer (By total money spent)
-        customer_favorite_stores = session.query(
-            Transactions.customer_id,
-            Transactions.store,
-            func.sum(Transactions.total_price).label('total_spent')
-        ).group_by(
-            Transactions.customer_id,
-            Transactions.store
-        ).\
-        order_by(Transactions.customer_id, func.sum(Transactions.total_price).desc()).\
-        distinct(Transactions.customer_id, Transactions.store).\
-        all()
-
-        # Combine the results
-        results = []
-        for customer_id, total_spent in customer_spending:
-            favorite_item_row = next((row for row in customer_favorite_items if row.customer_id == customer_id), None)
-            favorite_store_row = next((row for row in customer_favorite_stores if row.customer_id == customer_id), None)
-            if favorite_item_row:
-                favorite_item = favorite_item_row.item_name
-            else:
-                favorite_item = None
-            if favorite_store_row:
-                favorite_store = favorite_store_row.store
-            else:
-                favorite_store = None
-            results.append({
-                'customer_id': customer_id,
-                'total_spent': total_spent,
-                'favorite_item': favorite_item,
-                'favorite_store': favorite_store
-            })
-
-        return jsonify(results), 200
+        return jsonify(query_customer_stats(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_customer_stats: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Endpoint to get store statistics: revenue plus the top ?top_n= customers and products
 @transactions_blueprint.route('/stats/stores', methods=['GET'])
+@cached_response
 def get_store_stats():
     try:
-        # Get the total spending for each store
-        store_total_spending = session.query(
-            Transactions.store,
-            func.sum(Transactions.total_price).label('total_money_made')
-        ).group_by(Transactions.store).\
-        order_by(func.sum(Transactions.total_price).desc()).\
-        all()
-
-        # Get the best customer for each store (by total money spent)
-        store_best_customers = session.query(
-            Transactions.store,
-            Transactions.customer_id,
-            func.sum(Transactions.total_price).label('customer_total_spent')
-        ).group_by(Transactions.store, Transactions.customer_id).\
-        order_by(Transactions.store, func.sum(Transactions.total_price).desc()).\
-        distinct(Transactions.store).\
-        all()
-
-        # Get the best selling product for each store (by total quantity sold)
-        store_best_products = session.query(
-            Transactions.store,
-            Transactions.item_name,
-            func.sum(Transactions.quantity).label('total_quantity')
-        ).group_by(Transactions.store, Transactions.item_name).\
-        order_by(Transactions.store, func.sum(Transactions.quantity).desc()).\
-        distinct(Transactions.store).\
-        all()
-
-        # Combine the results
-        results = []
-        for store_row in store_total_spending:
-            store = store_row.store
-            total_money_made = store_row.total_money_made
-            best_customer_row = next((row for row in store_best_customers if row.store == store), None)
-            if best_customer_row:
-                best_customer = best_customer_row.customer_id
-            else:
-                best_customer = None
-            best_product_row = next((row for row in store_best_products if row.store == store), None)
-            if best_product_row:
-                best_selling_product = best_product_row.item_name
-            else:
-                best_selling_product = None
-            results.append({
-                'store': store,
-                'best_customer': best_customer,
-                'best_selling_product': best_selling_product, 
-                'total_money_made': total_money_made
-            })
+        top_n = request.args.get('top_n', '').strip()
+        try:
+            top_n = int(top_n) if top_n else 1
+            if not 1 <= top_n <= MAX_STORE_TOP_N:
+                raise ValueError
+        except ValueError:
+            return jsonify({"error": f"top_n must be an integer between 1 and {MAX_STORE_TOP_N}"}), 400
 
-        return jsonify(sorted(results, key=lambda x: x['total_money_made'], reverse=True)), 200
+        return jsonify(query_store_stats(analytics_session, top_n)), 200
 
     except Exception as e:
         print(f"Error in get_store_stats: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+# Compute total spending per customer country
+def query_spending_by_country(session):
+    # Get total spending by country
+    spending_stats = session.query(
+        func.coalesce(People.country, 'Unknown').label('country'),
+        func.sum(func.coalesce(Transactions.total_price, 0)).label('total_spent')
+    ).outerjoin(Transactions.customer).group_by(
+        People.country
+    ).order_by(
+        People.country
+    ).all()
+
+    results = [
+        {'country': stat[0], 'total_spent': float(stat[1])}
+        for stat in spending_stats if stat[1] > 0
+    ]
+
+    return results
+
 # Endpoint to get spending statistics by country
 @transactions_blueprint.route('/stats/spending_by_country', methods=['GET'])
+@cached_response
 def get_spending_by_country():
     try:
-        # Get total spending by country
-        spending_stats = session.query(
-            func.coalesce(People.country, 'Unknown').label('country'),
-            func.sum(func.coalesce(Transactions.total_price, 0)).label('total_spent')
-        ).join(People, Transactions.customer_id == People.id, isouter=True).group_by(
-            People.country
-        ).all()
-
-        print(f"Spending stats query results: {spending_stats}")  # Debugging
-
-        results = [
-            {'country': stat[0], 'total_spent': float(stat[1])}
-            for stat in spending_stats if stat[1] > 0
-        ]
-
-        return jsonify(results), 200
+        return jsonify(query_spending_by_country(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_spending_by_country: {str(e)}")
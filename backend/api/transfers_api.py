@@ -1,21 +1,30 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import create_engine, or_, and_, func, case
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import or_, and_, func, case
+from api.database import db_session, analytics_session
+from api.pagination import paginated_response
+from api.cache import cached_response
 from models.transfers import Transfers
 from models.people import People
+from models.summaries import MonthlyTransferTotals
 from datetime import datetime
-import os
-
-# Set up SQLAlchemy
-DATABASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage/venmito.db"))
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
 
 # Define the blueprint
 transfers_blueprint = Blueprint('transfers', __name__)
 
+# Columns returned by /filter (and selectable with ?fields=), in response order
+TRANSFER_FIELDS = {
+    "transfer_id": Transfers.transfer_id,
+    "sender_id": Transfers.sender_id,
+    "recipient_id": Transfers.recipient_id,
+    "amount": Transfers.amount,
+    "date": Transfers.date,
+}
+
+# Per-field conversions applied while serializing /filter rows
+TRANSFER_SERIALIZERS = {
+    "date": lambda value: value.isoformat() if value else None,
+}
+
 # Endpoint to display all transfers and perform filtering
 @transfers_blueprint.route('/filter', methods=['GET'])
 def filter_transfers():
@@ -27,7 +36,7 @@ def filter_transfers():
         date_before = request.args.get('date_before', '').strip()
 
         # Start building the query
-        query = session.query(Transfers)
+        query = db_session.query(Transfers)
 
         # Filter by sender_id if provided
         if sender_id:
@@ -60,74 +69,76 @@ def filter_transfers():
             except ValueError:
                 pass
 
-        # Execute query and serialize results
-        results = query.all()
-        transfers = [
-            {
-                "transfer_id": transfer.transfer_id,
-                "sender_id": transfer.sender_id,
-                "recipient_id": transfer.recipient_id,
-                "amount": transfer.amount,
-                "date": transfer.date.isoformat() if transfer.date else None
-            }
-            for transfer in results
-        ]
-
-        return jsonify(transfers), 200
+        # Execute query one keyset page at a time and serialize results
+        return paginated_response(query, Transfers.transfer_id, TRANSFER_FIELDS, TRANSFER_SERIALIZERS)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Compute money sent and received per country
+def query_country_transfer_stats(session):
+    # Total money sent by each country
+    sent_stats = session.query(
+        People.country.label('country'),
+        func.sum(Transfers.amount).label('total_sent')
+    ).join(
+        People.sent_transfers
+    ).group_by(
+        People.country
+    ).order_by(
+        People.country
+    ).all()
+
+    # Total money received by each country
+    received_stats = session.query(
+        People.country.label('country'),
+        func.sum(Transfers.amount).label('total_received')
+    ).join(
+        People.received_transfers
+    ).group_by(
+        People.country
+    ).order_by(
+        People.country
+    ).all()
+
+    # Format results
+    sent_results = [{'country': stat[0], 'total_sent': float(stat[1])} for stat in sent_stats]
+    received_results = [{'country': stat[0], 'total_received': float(stat[1])} for stat in received_stats]
+
+    return {
+        'sent': sent_results,
+        'received': received_results
+    }
+
 # Endpoint to get transfer distribution by country and total money sent/received distribution
 @transfers_blueprint.route('/stats/country_transfers', methods=['GET'])
+@cached_response
 def get_country_transfer_stats():
     try:
-        # Total money sent by each country
-        sent_stats = session.query(
-            People.country.label('country'),
-            func.sum(Transfers.amount).label('total_sent')
-        ).join(
-            Transfers, People.id == Transfers.sender_id
-        ).group_by(
-            People.country
-        ).all()
-
-        # Total money received by each country
-        received_stats = session.query(
-            People.country.label('country'),
-            func.sum(Transfers.amount).label('total_received')
-        ).join(
-            Transfers, People.id == Transfers.recipient_id
-        ).group_by(
-            People.country
-        ).all()
-
-        # Format results
-        sent_results = [{'country': stat[0], 'total_sent': float(stat[1])} for stat in sent_stats]
-        received_results = [{'country': stat[0], 'total_received': float(stat[1])} for stat in received_stats]
-
-        return jsonify({
-            'sent': sent_results,
-            'received': received_results
-        }), 200
+        return jsonify(query_country_transfer_stats(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_country_transfer_stats: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Compute total money transferred per month
+def query_monthly_totals(session):
+    # Read the monthly totals precomputed at load time (models/summaries.py)
+    monthly_totals = session.query(
+        MonthlyTransferTotals.month,
+        MonthlyTransferTotals.total_sent
+    ).order_by(MonthlyTransferTotals.month).all()
+
+    # Format results
+    results = [{'month': row[0], 'total_sent': float(row[1])} for row in monthly_totals]
+
+    return results
+
 # Endpoint to get monthly total money sent by month
 @transfers_blueprint.route('/stats/monthly_totals', methods=['GET'])
+@cached_response
 def get_monthly_totals():
     try:
-        # Query to calculate total money sent per month
-        monthly_totals = session.query(
-            func.strftime('%Y-%m', Transfers.date).label('month'),
-            func.sum(Transfers.amount).label('total_sent')
-        ).group_by('month').order_by('month').all()
-
-        # Format results
-        results = [{'month': row[0], 'total_sent': float(row[1])} for row in monthly_totals]
-
-        return jsonify(results), 200
+        return jsonify(query_monthly_totals(analytics_session)), 200
 
     except Exception as e:
         print(f"Error in get_monthly_totals: {str(e)}")
@@ -0,0 +1,306 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+from benchmarks.ingestion_benchmark import BACKEND_DIR, current_commit
+from benchmarks.storage_backend_benchmark import generate_tables
+from storage.database_loader import build_database
+from storage.duckdb_store import STORAGE_BACKEND, export_to_duckdb
+
+# Endpoint name -> request path. The filter terms match the generated tables
+# (see benchmarks/storage_backend_benchmark.py); every /filter request fetches one page.
+ENDPOINTS = {
+    "people/filter": "/api/people/filter?limit=100",
+    "people/filter first_name": "/api/people/filter?first_name=first12&limit=100",
+    "people/filter city": "/api/people/filter?city=toronto&limit=100",
+    "people/stats": "/api/people/stats",
+    "promotions/filter": "/api/promotions/filter?promotion=item%201&limit=100",
+    "promotions/stats": "/api/promotions/stats",
+    "promotions/stats/promotions": "/api/promotions/stats/promotions",
+    "transactions/filter": "/api/transactions/filter?limit=100",
+    "transactions/filter store": "/api/transactions/filter?store=store%201&limit=100",
+    "transactions/stats/customers": "/api/transactions/stats/customers",
+    "transactions/stats/stores": "/api/transactions/stats/stores?top_n=3",
+    "transactions/stats/spending_by_country": "/api/transactions/stats/spending_by_country",
+    "transfers/filter": "/api/transfers/filter?limit=100",
+    "transfers/filter dates": "/api/transfers/filter?date_after=2022-03-01&date_before=2022-03-31&limit=100",
+    "transfers/stats/country_transfers": "/api/transfers/stats/country_transfers",
+    "transfers/stats/monthly_totals": "/api/transfers/stats/monthly_totals",
+}
+
+# p95 latency higher than the previous report's by more than this factor counts as a regression
+MAX_REGRESSION = 1.25
+
+# Endpoints wrapped by the /stats response cache (api/cache.py)
+def is_cached_endpoint(name):
+    return "/stats" in ENDPOINTS[name]
+
+# Runs the app with Flask's threaded server, without logging every request
+SERVER_SCRIPT = """
+import logging, sys
+from flask_app import app
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+app.run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True, debug=False, use_reloader=False)
+"""
+
+# Build a database of the given size (and its DuckDB copy when that backend is configured)
+def build_load_test_database(directory, customers, transfers):
+    db_path = Path(directory) / "venmito.db"
+    duckdb_path = Path(directory) / "venmito.duckdb"
+    build_database(generate_tables(customers, transfers), db_path=db_path)
+    if STORAGE_BACKEND == "duckdb":
+        export_to_duckdb(db_path, duckdb_path)
+    return db_path, duckdb_path
+
+# A port nothing is listening on
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Start the Flask app against the given database and wait until it answers
+def start_server(db_path, duckdb_path, port, cache=True, timeout=60):
+    env = dict(os.environ, VENMITO_DB_PATH=str(db_path), VENMITO_DUCKDB_PATH=str(duckdb_path))
+    if not cache:
+        env["VENMITO_RESPONSE_CACHE_TTL"] = "0"
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, str(port)], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The API server exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/api/people/filter?limit=1")
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"The API server did not start within {timeout}s")
+
+# Resident set size of a process, in MB (None where /proc is not available)
+def process_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# Samples a process's RSS in the background and keeps the highest value
+class RssSampler:
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = process_rss_mb(pid)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            rss_mb = process_rss_mb(self.pid)
+            if rss_mb is not None:
+                self.peak_mb = max(self.peak_mb or 0, rss_mb)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+# HTTP client issuing requests over one keep-alive connection per thread
+class LoadClient:
+    def __init__(self, port, timeout=120):
+        self.port = port
+        self.timeout = timeout
+        self.local = threading.local()
+
+    # Send one GET and return (seconds, status, body bytes); status is None on a connection error
+    def get(self, path):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=self.timeout)
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            return time.perf_counter() - start, None, 0
+        return time.perf_counter() - start, response.status, len(body)
+
+# Drive one endpoint with requests at the given concurrency and summarize its latencies
+def load_endpoint(client, path, requests, concurrency, server_pid):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Open the connections and warm the caches first
+        list(executor.map(client.get, [path] * concurrency))
+
+        with RssSampler(server_pid) as sampler:
+            start = time.perf_counter()
+            results = list(executor.map(client.get, [path] * requests))
+            elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array([seconds for seconds, _, _ in results]) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    errors = sum(1 for _, status, _ in results if status != 200)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(latencies_ms.max()), 2),
+        "mean_ms": round(float(latencies_ms.mean()), 2),
+        "requests_per_second": round(requests / elapsed, 1),
+        "response_bytes": round(statistics.mean(size for _, _, size in results)),
+        "server_rss_peak_mb": round(sampler.peak_mb, 1) if sampler.peak_mb is not None else None,
+        "server_rss_after_mb": process_rss_mb(server_pid),
+    }
+
+# Print one endpoint's result as a table row
+def print_result(name, result):
+    print(f"{name:<48} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms {result['p99_ms']:>7.1f}ms "
+          f"{result['requests_per_second']:>8.1f} {result['errors']:>6} "
+          f"{result['server_rss_peak_mb'] or 0:>7.0f} MB")
+
+# Serve the database and load each endpoint in turn, returning {endpoint: result}
+def load_endpoints(db_path, duckdb_path, endpoints, requests, stats_requests, concurrency, cache, label=""):
+    port = free_port()
+    server = start_server(db_path, duckdb_path, port, cache)
+    server_rss_start_mb = process_rss_mb(server.pid)
+    client = LoadClient(port)
+    results = {}
+    try:
+        for name in endpoints:
+            count = stats_requests if is_cached_endpoint(name) else requests
+            results[name] = load_endpoint(client, ENDPOINTS[name], count, concurrency, server.pid)
+            print_result(name + label, results[name])
+    finally:
+        server.terminate()
+        server.wait()
+    return results, server_rss_start_mb
+
+# Build (or take) a database, serve it and load every endpoint in turn
+def run_benchmark(customers, transfers, requests, stats_requests, concurrency, endpoints=None, db_path=None, cached=False):
+    """
+    The endpoints are measured with the /stats response cache off, so the
+    latencies are those of the queries themselves. With cached=True the /stats
+    endpoints are loaded again on a second server with the cache on (filled by
+    the warm-up), and those results are added under "cached".
+    """
+    endpoints = endpoints or list(ENDPOINTS)
+    report = {
+        "commit": current_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "storage_backend": STORAGE_BACKEND,
+        },
+        "config": {"requests": requests, "stats_requests": stats_requests, "concurrency": concurrency,
+                   "response_cache": False, "cached_stats": cached},
+        "endpoints": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        if db_path is None:
+            start = time.perf_counter()
+            db_path, duckdb_path = build_load_test_database(directory, customers, transfers)
+            report["dataset"] = {"customers": customers, "transactions": customers * 10, "transfers": transfers}
+            print(f"Built the load test database in {time.perf_counter() - start:.1f}s")
+        else:
+            db_path = Path(db_path).resolve()
+            duckdb_path = db_path.with_suffix(".duckdb")
+            report["dataset"] = {"db_path": str(db_path)}
+
+        print(f"{'endpoint':<48} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'errors':>6} {'server RSS':>10}")
+        report["endpoints"], report["server_rss_start_mb"] = load_endpoints(
+            db_path, duckdb_path, endpoints, requests, stats_requests, concurrency, cache=False
+        )
+
+        cached_endpoints = [name for name in endpoints if is_cached_endpoint(name)]
+        if cached and cached_endpoints:
+            cached_results, _ = load_endpoints(
+                db_path, duckdb_path, cached_endpoints, requests, requests, concurrency, cache=True, label=" (cached)"
+            )
+            for name, result in cached_results.items():
+                report["endpoints"][name]["cached"] = result
+    return report
+
+# Compare a report with a previous one, returning the endpoints whose p95 latency regressed
+def compare_reports(previous, current, max_regression=MAX_REGRESSION):
+    """
+    Compares the uncached latencies. Reports written with the response cache
+    on (response_cache in their config) timed cache hits on /stats, so their
+    /stats endpoints are skipped.
+    """
+    print(f"\nAgainst {previous.get('commit') or 'previous report'} ({previous.get('created')}):")
+    previous_cached = previous.get("config", {}).get("response_cache", False)
+    regressions = []
+    for name, result in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before or (previous_cached and is_cached_endpoint(name)):
+            continue
+        ratio = result["p95_ms"] / before["p95_ms"] if before["p95_ms"] else float("inf")
+        flag = ""
+        if ratio > max_regression:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<48} p95 {before['p95_ms']:8.1f}ms -> {result['p95_ms']:8.1f}ms ({ratio:.2f}x), "
+              f"{before['requests_per_second']:.1f} -> {result['requests_per_second']:.1f} req/s{flag}")
+    return regressions
+
+# Main function to run the script (from the backend directory: python -m benchmarks.api_load_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the API endpoints against a generated database")
+    parser.add_argument("--customers", type=int, default=100_000, help="People; transactions are 10 line items each")
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--db", type=Path, help="Serve this database instead of generating one")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--stats-requests", type=int, default=16, help="Requests per uncached /stats endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), help="Default: every endpoint")
+    parser.add_argument("--cached", action="store_true", help="Also load the /stats endpoints with the response cache on")
+    parser.add_argument("--report", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION)
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.customers, args.transfers, args.requests, args.stats_requests, args.concurrency,
+        args.endpoints, args.db, args.cached
+    )
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.report}")
+
+    failed = any(result["errors"] or result.get("cached", {}).get("errors") for result in report["endpoints"].values())
+    if args.compare:
+        regressions = compare_reports(json.loads(args.compare.read_text()), report, args.max_regression)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,100 @@
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from benchmarks.customer_stats_benchmark import generate_transactions
+from storage.bulk_loader import load_tables, use_build_pragmas
+from storage.database_loader import create_tables
+
+# Generate synthetic People and Transfers tables to load alongside the transactions
+def generate_people_and_transfers(people, transfers, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, people + 1)
+    people_df = pd.DataFrame({
+        "id": ids,
+        "email": pd.Series(ids).astype(str) + "@example.com",
+        "phone": pd.Series(ids).astype(str),
+        "firstname": "First" + pd.Series(ids % 5000).astype(str),
+        "surname": "Last" + pd.Series(ids % 7000).astype(str),
+        "city": "Toronto",
+        "country": "Canada",
+        "android": ids % 2 == 0,
+        "iphone": ids % 3 == 0,
+        "desktop": ids % 5 == 0,
+    })
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 365, transfers), unit="D")
+    transfers_df = pd.DataFrame({
+        "sender_id": rng.integers(1, people + 1, transfers),
+        "recipient_id": rng.integers(1, people + 1, transfers),
+        "amount": rng.integers(100, 100_000, transfers) / 100,
+        "date": dates.strftime("%Y-%m-%d"),
+    })
+    return people_df, transfers_df
+
+# Load the tables into a fresh database with pandas to_sql (the previous loader)
+def load_with_to_sql(connection, tables):
+    for table_name, df in tables.items():
+        start = time.perf_counter()
+        df.to_sql(table_name, connection, if_exists="append", index=False)
+        elapsed = time.perf_counter() - start
+        print(f"  {table_name}: {len(df):,} rows in {elapsed:.2f}s ({len(df) / elapsed:,.0f} rows/s)")
+
+# Build a fresh database with one loader and return the wall time
+def build(directory, name, tables, workers):
+    db_path = Path(directory) / f"{name}.db"
+    connection = sqlite3.connect(db_path)
+    create_tables(connection)
+    start = time.perf_counter()
+    if workers is None:
+        load_with_to_sql(connection, tables)
+    else:
+        use_build_pragmas(connection)
+        load_tables(connection, db_path, tables, workers=workers)
+    elapsed = time.perf_counter() - start
+    counts = {
+        table_name: connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        for table_name in tables
+    }
+    connection.close()
+    return elapsed, counts
+
+# Compare to_sql with the serial and parallel bulk loaders
+def run_benchmark(customers, transfers, workers):
+    transactions_df = generate_transactions(customers)
+    people_df, transfers_df = generate_people_and_transfers(customers, transfers)
+    tables = {"People": people_df, "Transactions": transactions_df, "Transfers": transfers_df}
+    total_rows = sum(len(df) for df in tables.values())
+    print(f"Loading {total_rows:,} rows ({', '.join(f'{name} {len(df):,}' for name, df in tables.items())})")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for name, loader_workers in [("to_sql", None), ("bulk", 1), (f"bulk x{workers}", workers)]:
+            print(f"{name}:")
+            elapsed, counts = build(directory, name.replace(" ", "_"), tables, loader_workers)
+            results[name] = elapsed
+            print(f"  total {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s)")
+            if counts != {table_name: len(df) for table_name, df in tables.items()}:
+                print(f"FAIL: {name} loaded {counts}")
+                ok = False
+
+    baseline = results["to_sql"]
+    for name, elapsed in results.items():
+        print(f"{name:>10}: {elapsed:.2f}s ({baseline / elapsed:.1f}x to_sql)")
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.bulk_load_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bulk SQLite loader against to_sql")
+    parser.add_argument("--customers", type=int, default=100_000, help="People; transactions are 10 line items each")
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if not run_benchmark(args.customers, args.transfers, args.workers):
+        sys.exit(1)
@@ -0,0 +1,72 @@
+import argparse
+import codecs
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+import pandas as pd
+
+from benchmarks.bulk_load_benchmark import generate_people_and_transfers
+from ingestion.identity_index import IdentityIndex
+from ingestion.transfers_loader import iter_transfer_chunks, find_unknown_ids, validate_transfer_chunks
+
+# Write a transfers.csv like the raw one (UTF-8 byte order mark, CRLF line endings)
+def write_transfers_csv(path, transfers_df):
+    with open(path, "wb") as file:
+        file.write(codecs.BOM_UTF8)
+        file.write(transfers_df.to_csv(index=False, lineterminator="\r\n").encode("utf-8"))
+
+# Load and validate transfers.csv in one piece, as transfers_stage does
+def load_whole(path, identity):
+    transfers_df = pd.read_csv(path)
+    transfers_df["date"] = pd.to_datetime(transfers_df["date"]).dt.date
+    find_unknown_ids(transfers_df, identity)
+    return [transfers_df]
+
+# Load and validate transfers.csv in chunks parsed by a process pool, as transfers_chunked_stage does
+def load_chunked(path, identity, workers):
+    return list(validate_transfer_chunks(iter_transfer_chunks(path, workers=workers), identity))
+
+# Time loading the same generated transfers.csv in one piece and with 1..max_workers processes
+def run_benchmark(people, transfers, max_workers):
+    people_df, transfers_df = generate_people_and_transfers(people, transfers)
+    identity = IdentityIndex(people_df)
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "transfers.csv"
+        write_transfers_csv(path, transfers_df)
+        print(f"Loading {transfers:,} transfers ({path.stat().st_size / 1024 / 1024:.0f} MB) on {os.cpu_count()} CPUs")
+
+        runs = [("pd.read_csv (whole file)", partial(load_whole, path, identity))]
+        runs += [
+            (f"chunked, {workers} worker(s)", partial(load_chunked, path, identity, workers))
+            for workers in range(1, max_workers + 1)
+        ]
+        expected = None
+        baseline = None
+        for name, load in runs:
+            start = time.perf_counter()
+            chunks = load()
+            elapsed = time.perf_counter() - start
+            loaded = pd.concat(chunks, ignore_index=True)
+            baseline = baseline or elapsed
+            print(f"{name:<28} {elapsed:6.2f}s ({transfers / elapsed:,.0f} rows/s, {baseline / elapsed:.1f}x)")
+            if expected is None:
+                expected = loaded
+            elif not loaded.equals(expected):
+                print(f"FAIL: {name} loaded different rows")
+                ok = False
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.csv_ingest_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chunked parallel transfers.csv ingestion")
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--transfers", type=int, default=5_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if not run_benchmark(args.people, args.transfers, args.max_workers):
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.transactions_api import query_customer_stats
+from storage.database_loader import create_tables
+from storage.migrator import apply_migrations
+
+# Generate synthetic transaction line items for a number of customers
+def generate_transactions(customers, items_per_customer=10, stores=50, items=200, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = customers * items_per_customer
+    quantity = rng.integers(1, 6, rows)
+    price_per_item = rng.integers(1, 20, rows).astype(float)
+    return pd.DataFrame({
+        "transaction_id": np.arange(rows) // 3,
+        "customer_id": np.repeat(np.arange(1, customers + 1), items_per_customer),
+        "phone": None,
+        "store": pd.Series(rng.integers(0, stores, rows)).map(lambda i: f"Store {i}"),
+        "item_name": pd.Series(rng.integers(0, items, rows)).map(lambda i: f"Item {i}"),
+        "quantity": quantity,
+        "price_per_item": price_per_item,
+        "total_price": quantity * price_per_item,
+    })
+
+# Expected favorite item/store per customer (ties broken alphabetically), computed with pandas
+def reference_favorites(transactions_df):
+    items = transactions_df.groupby(["customer_id", "item_name"], as_index=False)["quantity"].sum()
+    items = items.sort_values(["customer_id", "quantity", "item_name"], ascending=[True, False, True])
+    stores = transactions_df.groupby(["customer_id", "store"], as_index=False)["total_price"].sum()
+    stores = stores.sort_values(["customer_id", "total_price", "store"], ascending=[True, False, True])
+    return (
+        items.drop_duplicates("customer_id").set_index("customer_id")["item_name"].to_dict(),
+        stores.drop_duplicates("customer_id").set_index("customer_id")["store"].to_dict(),
+    )
+
+# Build a database with the synthetic data and time query_customer_stats on it
+def run_benchmark(customers, items_per_customer, max_seconds=None):
+    transactions_df = generate_transactions(customers, items_per_customer)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "benchmark.db"
+        connection = sqlite3.connect(db_path)
+        create_tables(connection)
+        transactions_df.to_sql("Transactions", connection, if_exists="append", index=False)
+        apply_migrations(connection)
+        connection.close()
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        session = sessionmaker(bind=engine)()
+        start = time.perf_counter()
+        results = query_customer_stats(session)
+        elapsed = time.perf_counter() - start
+        session.close()
+        engine.dispose()
+
+    # Regression check: every customer gets the true argmax item and store
+    favorite_items, favorite_stores = reference_favorites(transactions_df)
+    mismatches = sum(
+        1 for row in results
+        if row["favorite_item"] != favorite_items[row["customer_id"]]
+        or row["favorite_store"] != favorite_stores[row["customer_id"]]
+    )
+
+    print(f"{customers} customers, {len(transactions_df)} line items: "
+          f"query_customer_stats took {elapsed:.2f}s, {mismatches} mismatched favorites")
+
+    if len(results) != customers or mismatches:
+        print("FAIL: results do not match the reference favorites")
+        return False
+    if max_seconds is not None and elapsed > max_seconds:
+        print(f"FAIL: slower than the {max_seconds}s budget")
+        return False
+    return True
+
+# Main function to run the script (from the backend directory: python -m benchmarks.customer_stats_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /api/transactions/stats/customers")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--items-per-customer", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the query takes longer")
+    args = parser.parse_args()
+
+    if not run_benchmark(args.customers, args.items_per_customer, args.max_seconds):
+        sys.exit(1)
@@ -0,0 +1,95 @@
+import argparse
+import hashlib
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from flask import Flask, jsonify
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.json_provider import init_app as init_json
+from api.pagination import paginated_response
+from api.transactions_api import TRANSACTION_FIELDS
+from benchmarks.customer_stats_benchmark import generate_transactions
+from models.transactions import Transactions
+from storage.bulk_loader import load_tables
+from storage.database_loader import create_tables
+
+# Serialize every transaction the way /filter did before: ORM query rows, a dict
+# comprehension per row and Flask's standard library JSON provider
+def previous_filter_response(session):
+    query = session.query(Transactions).order_by(Transactions.id).with_entities(
+        Transactions.id, *TRANSACTION_FIELDS.values()
+    )
+    rows = query.all()
+    results = [
+        {name: value for name, value in zip(TRANSACTION_FIELDS, row[1:])}
+        for row in rows
+    ]
+    return jsonify(results)
+
+# Serialize every transaction through the current /filter code path
+def current_filter_response(session):
+    response, _ = paginated_response(session.query(Transactions), Transactions.id, TRANSACTION_FIELDS)
+    return response
+
+# Peak resident set size of this process, in MB
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Time one /filter implementation with one JSON provider, returning (seconds, body hash, body size)
+def time_path(session, path, provider):
+    app = Flask(__name__)
+    init_json(app, provider)
+    with app.test_request_context("/api/transactions/filter"):
+        start = time.perf_counter()
+        body = path(session).get_data()
+        elapsed = time.perf_counter() - start
+    session.rollback()
+    return elapsed, hashlib.sha1(body).hexdigest(), len(body)
+
+# Compare the previous and current /api/transactions/filter paths on a generated table
+def run_benchmark(customers):
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "venmito.db"
+        connection = sqlite3.connect(db_path)
+        create_tables(connection)
+        load_tables(connection, db_path, {"Transactions": generate_transactions(customers)}, workers=1)
+        connection.close()
+
+        session = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))()
+        rows = session.query(Transactions).count()
+        print(f"Serializing {rows:,} transactions")
+
+        results = {}
+        for name, path, provider in [
+            ("ORM rows + json (previous)", previous_filter_response, "json"),
+            ("Core rows + json", current_filter_response, "json"),
+            ("Core rows + orjson (current)", current_filter_response, "orjson"),
+        ]:
+            elapsed, digest, size = time_path(session, path, provider)
+            results[name] = (elapsed, digest)
+            print(f"{name:<30} {elapsed:6.2f}s ({rows / elapsed:,.0f} rows/s, {size / 1024 / 1024:.0f} MB body, "
+                  f"peak RSS {peak_rss_mb():.0f} MB)")
+        session.close()
+
+    digests = {digest for _, digest in results.values()}
+    if len(digests) != 1:
+        print("FAIL: the paths produced different response bodies")
+        ok = False
+    baseline = results["ORM rows + json (previous)"][0]
+    print(f"Speedup of the current path: {baseline / results['Core rows + orjson (current)'][0]:.1f}x")
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.filter_serialization_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /api/transactions/filter serialization")
+    parser.add_argument("--customers", type=int, default=100_000, help="Customers; 10 line items each (1M rows by default)")
+    args = parser.parse_args()
+
+    if not run_benchmark(args.customers):
+        sys.exit(1)
@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from ingestion import identity_index
+from ingestion.identity_index import IdentityIndex
+
+# People with unique phones and emails in the raw datasets' formats
+def generate_people(people, seed=0):
+    rng = np.random.default_rng(seed)
+    numbers = pd.Series(rng.choice(9_000_000_000, people, replace=False) + 1_000_000_000).astype(str)
+    return pd.DataFrame({
+        "id": np.arange(1, people + 1),
+        "email": "Person" + pd.Series(np.arange(1, people + 1)).astype(str) + "@example.com",
+        "phone": numbers.str[:3] + "-" + numbers.str[3:6] + "-" + numbers.str[6:],
+    })
+
+# Line-item phones: mostly as stored, some reformatted and some unknown
+def generate_lookups(people_df, lookups, seed=0):
+    rng = np.random.default_rng(seed)
+    phones = people_df["phone"].to_numpy()[rng.integers(0, len(people_df), lookups)]
+    reformatted = rng.random(lookups) < 0.05
+    phones[reformatted] = ["+1 (" + phone[:3] + ") " + phone[4:7] + " " + phone[8:] for phone in phones[reformatted]]
+    unknown = rng.random(lookups) < 0.01
+    phones[unknown] = "000-000-0000"
+    return pd.Series(phones), reformatted, unknown
+
+# Time the previous per-loader lookups against the shared index, and check the matches
+def run_benchmark(people, lookups):
+    ok = True
+    people_df = generate_people(people)
+    phones, reformatted, unknown = generate_lookups(people_df, lookups)
+    print(f"{len(people_df):,} people, {lookups:,} phone lookups ({reformatted.mean():.0%} reformatted)")
+
+    start = time.perf_counter()
+    previous = phones.map(people_df.set_index("phone")["id"].to_dict())
+    previous_seconds = time.perf_counter() - start
+    print(f"{'dict per loader (previous)':<32} {previous_seconds:6.2f}s, {previous.notna().sum():,} matched")
+
+    start = time.perf_counter()
+    index = IdentityIndex(people_df)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    matched = index.lookup(phones, "phone", "id")
+    lookup_seconds = time.perf_counter() - start
+    print(f"{'identity index build':<32} {build_seconds:6.2f}s")
+    print(f"{'identity index lookup':<32} {lookup_seconds:6.2f}s, {matched.notna().sum():,} matched")
+
+    # Save and reload through the relative datasets/processed path inside a scratch directory
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            identity_index.INDEX_META_PATH.parent.mkdir(parents=True)
+            sources = {"people.json": "benchmark", "people.yml": "benchmark"}
+            index.save(sources)
+            start = time.perf_counter()
+            loaded = identity_index.load_identity_index(sources)
+            print(f"{'identity index load from disk':<32} {time.perf_counter() - start:6.2f}s")
+        finally:
+            os.chdir(working_directory)
+
+    known = ~unknown & ~reformatted
+    if not (matched[known].to_numpy() == previous[known].to_numpy()).all():
+        print("FAIL: the index matched different people than the dict")
+        ok = False
+    if matched[unknown].notna().any() or matched[reformatted & ~unknown].isna().any():
+        print("FAIL: reformatted phones must match and unknown phones must not")
+        ok = False
+    if loaded is None or not loaded.lookup(phones, "phone", "id").equals(matched):
+        print("FAIL: the index loaded from disk resolves differently")
+        ok = False
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.identity_index_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the phone/email identity index")
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    if not run_benchmark(args.people, args.lookups):
+        sys.exit(1)
@@ -0,0 +1,271 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_raw_datasets
+from ingestion import json_loader, yaml_loader, people_merger
+from ingestion import promotions_loader, transactions_loader, transfers_loader
+from ingestion.identity_index import IdentityIndex
+from ingestion.processed_store import PROCESSED_FORMAT, read_processed, write_processed
+from storage import database_loader
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Stage timed slower than the previous report by more than this factor counts as a regression
+MAX_REGRESSION = 1.25
+
+# Each stage's inputs are prepared outside the timing (from the earlier stages' processed
+# output), then the stage runs and returns the number of rows it processed
+
+# Stages reading a raw file only need its directory
+def prepare_raw(raw_dir):
+    return (raw_dir,)
+
+# The cleaned people sources, for the merge
+def prepare_people_sources(raw_dir):
+    return read_processed("people_cleaned_json"), read_processed("people_cleaned_yml")
+
+# The identity index of the merged people, for the loaders resolving phones, emails and ids
+def prepare_identity(raw_dir):
+    return raw_dir, IdentityIndex(read_processed("people_merged"))
+
+# Every processed table, for the database build
+def prepare_tables(raw_dir):
+    return ({table_name: read_processed(dataset) for table_name, dataset in database_loader.TABLE_DATASETS.items()},)
+
+# Parse and normalize people.json
+def run_json_loader(raw_dir):
+    people_df = json_loader.load_json_people(raw_dir / "people.json")
+    write_processed(people_df, "people_cleaned_json")
+    return len(people_df)
+
+# Parse and clean people.yml
+def run_yaml_loader(raw_dir):
+    people_df = yaml_loader.load_yaml_people(raw_dir / "people.yml")
+    write_processed(people_df, "people_cleaned_yml")
+    return len(people_df)
+
+# Merge the two people sources
+def run_people_merger(json_df, yml_df):
+    json_df, yml_df = people_merger.standardize_people_columns(json_df, yml_df)
+    merged_df, conflicts_df = people_merger.merge_people_data(json_df, yml_df)
+    people_merger.save_merged_people(merged_df, conflicts_df)
+    return len(json_df) + len(yml_df)
+
+# Load and clean promotions.csv
+def run_promotions_loader(raw_dir, identity):
+    promotions_df = promotions_loader.load_promotions(raw_dir / "promotions.csv")
+    promotions_df = promotions_loader.clean_promotions_data(promotions_df, identity)
+    promotions_loader.save_cleaned_promotions(promotions_df)
+    return len(promotions_df)
+
+# Flatten transactions.xml and map phones to customers
+def run_transactions_loader(raw_dir, identity):
+    transactions_df = transactions_loader.load_transactions(raw_dir / "transactions.xml")
+    transactions_df = transactions_loader.map_phone_to_customer_id(transactions_df, identity)
+    transactions_loader.save_cleaned_transactions(transactions_df)
+    return len(transactions_df)
+
+# Load transfers.csv and validate its ids
+def run_transfers_loader(raw_dir, identity):
+    transfers_df = transfers_loader.load_transfers(raw_dir / "transfers.csv")
+    transfers_loader.check_transfers_data(transfers_df, identity)
+    transfers_loader.save_cleaned_transfers(transfers_df)
+    return len(transfers_df)
+
+# Rebuild the database from the processed tables, checking every row made it in
+def run_database_loader(tables):
+    if not database_loader.build_database(tables):
+        raise RuntimeError("The database could not be built")
+    connection = sqlite3.connect(database_loader.DB_PATH)
+    try:
+        mismatches = []
+        for table_name, df in tables.items():
+            loaded = connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            if loaded != len(df):
+                mismatches.append(f"{table_name} has {loaded} rows instead of {len(df)}")
+    finally:
+        connection.close()
+    if mismatches:
+        raise RuntimeError("; ".join(mismatches))
+    return sum(len(df) for df in tables.values())
+
+# Stage name -> (input preparation, timed work), in run order
+BENCHMARK_STAGES = {
+    "json_loader": (prepare_raw, run_json_loader),
+    "yaml_loader": (prepare_raw, run_yaml_loader),
+    "people_merger": (prepare_people_sources, run_people_merger),
+    "promotions_loader": (prepare_identity, run_promotions_loader),
+    "transactions_loader": (prepare_identity, run_transactions_loader),
+    "transfers_loader": (prepare_identity, run_transfers_loader),
+    "database_loader": (prepare_tables, run_database_loader),
+}
+
+# Peak resident set size of this process, in MB
+def peak_rss_mb():
+    """
+    Read from VmHWM on Linux: ru_maxrss carries the parent's peak over into
+    a spawned process, so it would hide the stage's own peak.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Run one stage in the work directory and send back its measurements (runs in a fresh process)
+def _run_stage(name, work_dir, raw_dir, results):
+    os.chdir(work_dir)
+    prepare, run = BENCHMARK_STAGES[name]
+    try:
+        args = prepare(raw_dir)
+        input_mb = peak_rss_mb()
+        start = time.perf_counter()
+        rows = run(*args)
+        seconds = time.perf_counter() - start
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    results.put({
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds) if seconds > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "input_rss_mb": round(input_mb, 1),
+    })
+
+# Measure a stage in its own spawned process, so its peak RSS is its own
+def measure_stage(name, work_dir, raw_dir, poll_seconds=1):
+    """
+    Waits for the result while the process is alive, so a stage that dies
+    without sending one (OOM-killed, segfault) is recorded as a failure with
+    its exit code instead of hanging the benchmark.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_stage, args=(name, work_dir, raw_dir, results), daemon=True)
+    process.start()
+    while True:
+        try:
+            result = results.get(timeout=poll_seconds)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                # The result may have been queued just before the process exited
+                try:
+                    result = results.get(timeout=poll_seconds)
+                except queue.Empty:
+                    result = {"error": f"The stage process exited with code {process.exitcode}"}
+                break
+    process.join()
+    return result
+
+# Lay out a work directory the stages can run in (they use paths relative to backend/)
+def make_work_dir(directory):
+    work_dir = Path(directory) / "work"
+    (work_dir / "datasets" / "processed").mkdir(parents=True)
+    (work_dir / "storage").mkdir()
+    (work_dir / "storage" / "migrations").symlink_to(BACKEND_DIR / "storage" / "migrations")
+    return work_dir
+
+# Current commit of the repository, if it can be read
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Run every stage on generated (or given) raw data and return the report
+def run_benchmark(people=None, raw_dir=None, stages=None, seed=0):
+    stages = stages or list(BENCHMARK_STAGES)
+    report = {
+        "commit": current_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "processed_format": PROCESSED_FORMAT,
+        },
+        "stages": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        if raw_dir is None:
+            raw_dir = Path(directory) / "raw"
+            start = time.perf_counter()
+            report["dataset"] = generate_raw_datasets(raw_dir, people, seed=seed)
+            print(f"Generated {people:,} people's raw files in {time.perf_counter() - start:.1f}s: {report['dataset']}")
+        raw_dir = Path(raw_dir).resolve()
+        report["raw_dir_bytes"] = {path.name: path.stat().st_size for path in sorted(raw_dir.iterdir())}
+        work_dir = make_work_dir(directory)
+
+        for name in stages:
+            result = measure_stage(name, work_dir, raw_dir)
+            report["stages"][name] = result
+            if "error" in result:
+                print(f"{name:<20} FAILED: {result['error']}")
+                break
+            print(f"{name:<20} {result['seconds']:8.2f}s {result['rows']:>12,} rows "
+                  f"{result['rows_per_second'] or 0:>12,} rows/s {result['peak_rss_mb']:>8.0f} MB peak RSS")
+    return report
+
+# Compare a report with a previous one, returning the stages that got slower than max_regression
+def compare_reports(previous, current, max_regression=MAX_REGRESSION):
+    print(f"\nAgainst {previous.get('commit') or 'previous report'} ({previous.get('created')}):")
+    regressions = []
+    for name, result in current["stages"].items():
+        before = previous.get("stages", {}).get(name)
+        if not before or "error" in before or "error" in result:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        memory = result["peak_rss_mb"] / before["peak_rss_mb"] if before["peak_rss_mb"] else float("inf")
+        flag = ""
+        if ratio > max_regression:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<20} {before['seconds']:8.2f}s -> {result['seconds']:8.2f}s ({ratio:.2f}x time, "
+              f"{memory:.2f}x peak RSS){flag}")
+    return regressions
+
+# Main function to run the script (from the backend directory: python -m benchmarks.ingestion_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every ingestion stage on synthetic data and write a JSON report")
+    parser.add_argument("--people", type=int, default=100_000, help="Scale of the generated raw files")
+    parser.add_argument("--raw-dir", type=Path, help="Benchmark these raw files instead of generating them")
+    parser.add_argument("--stages", nargs="+", choices=list(BENCHMARK_STAGES), help="Default: every stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.people, args.raw_dir, args.stages, args.seed)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.report}")
+
+    failed = any("error" in result for result in report["stages"].values())
+    if args.compare:
+        regressions = compare_reports(json.loads(args.compare.read_text()), report, args.max_regression)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
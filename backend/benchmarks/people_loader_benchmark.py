@@ -0,0 +1,78 @@
+import argparse
+import hashlib
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from benchmarks.ingestion_benchmark import peak_rss_mb
+from benchmarks.synthetic_data import write_people_files
+from ingestion import json_loader, yaml_loader
+
+# Load people.json the way json_loader did before: json.load and per-row normalization
+def previous_json_load(path):
+    df = pd.DataFrame(json_loader.load_json_file(path))
+    df[["City", "Country"]] = pd.json_normalize(df["location"])
+    df.drop(columns=["location"], inplace=True)
+    devices_df = pd.json_normalize(df["devices"].apply(lambda x: {device: True for device in x})).fillna(False)
+    df = pd.concat([df, devices_df], axis=1).drop(columns=["devices"])
+    # Device columns used to come in order of first appearance; they are now always Android, Iphone, Desktop
+    devices = [device for device in json_loader.DEVICE_COLUMNS if device in df.columns]
+    return df[[column for column in df.columns if column not in devices] + devices].astype({device: bool for device in devices})
+
+# Load people.yml the way yaml_loader did before: yaml.safe_load on the whole file
+def previous_yaml_load(path):
+    return yaml_loader.yaml_to_dataframe(yaml_loader.load_yaml_file(path))
+
+# Run one loader in a fresh process and send back (seconds, peak RSS in MB, digest of the result)
+def _measure(load, path, results):
+    start = time.perf_counter()
+    df = load(path)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, peak_rss_mb(), hashlib.sha1(df.to_csv(index=False).encode()).hexdigest()))
+
+# Measure one loader in its own spawned process, so each gets its own peak RSS
+def measure(load, path):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(load, path, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+# Compare the previous and streaming people loaders on generated files
+def run_benchmark(people):
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        counts = write_people_files(Path(directory), people, np.random.default_rng(0))
+        json_path = Path(directory) / "people.json"
+        yml_path = Path(directory) / "people.yml"
+
+        for name, path, previous, current in [
+            ("people.json", json_path, previous_json_load, json_loader.load_json_people),
+            ("people.yml", yml_path, previous_yaml_load, yaml_loader.load_yaml_people),
+        ]:
+            size_mb = path.stat().st_size / 1024 / 1024
+            previous_seconds, previous_mb, previous_digest = measure(previous, path)
+            current_seconds, current_mb, current_digest = measure(current, path)
+            print(f"{name} ({counts[name]:,} people, {size_mb:.0f} MB): "
+                  f"previous {previous_seconds:.2f}s / {previous_mb:.0f} MB peak RSS, "
+                  f"streaming {current_seconds:.2f}s / {current_mb:.0f} MB peak RSS "
+                  f"({previous_seconds / current_seconds:.1f}x)")
+            if previous_digest != current_digest:
+                print(f"FAIL: the streaming loader returns a different {name} DataFrame")
+                ok = False
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.people_loader_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming people.json and people.yml loaders")
+    parser.add_argument("--people", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if not run_benchmark(args.people):
+        sys.exit(1)
@@ -0,0 +1,83 @@
+import argparse
+import resource
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from ingestion.people_merger import merge_people_sources, PEOPLE_SCHEMA
+
+COUNTRIES = np.array(["USA", "Canada", "UK", "Germany", "France", "Mexico", "Brazil", "Japan"])
+CITIES = np.array(["Toronto", "Montreal", "London", "Berlin", "Paris", "Tokyo", "Chicago", "Lima"])
+
+# Generate overlapping people sources (each covering ~70% of the ids, ~1% conflicting emails)
+def generate_sources(people, source_count=3, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, people + 1)
+    sources = []
+    for index in range(source_count):
+        source_ids = ids[rng.random(people) < 0.7]
+        count = len(source_ids)
+        emails = pd.Series(source_ids).astype(str) + "@example.com"
+        conflicting = rng.random(count) < 0.01
+        emails[conflicting] = "alt" + emails[conflicting]
+        df = pd.DataFrame({
+            "id": source_ids,
+            "email": emails,
+            "phone": pd.Series(source_ids % 10_000_000).astype(str),
+            "city": CITIES[source_ids % len(CITIES)],
+            "country": COUNTRIES[source_ids % len(COUNTRIES)],
+            "firstname": "First" + pd.Series(source_ids % 5000).astype(str),
+            "surname": "Last" + pd.Series(source_ids % 7000).astype(str),
+            "android": source_ids % 2 == 0,
+            "iphone": source_ids % 3 == 0,
+            "desktop": source_ids % 5 == 0,
+        })
+        # Drop a column from every other source to exercise missing columns
+        if index % 2 == 1:
+            df = df.drop(columns=["city"])
+        sources.append((f"source_{index}", df))
+    return sources
+
+# Peak resident set size of this process, in MB
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Time merge_people_sources at each scale and report time, memory and per-row cost
+def run_benchmark(scales, source_count, max_seconds=None):
+    ok = True
+    for people in scales:
+        sources = generate_sources(people, source_count)
+        input_rows = sum(len(df) for _, df in sources)
+        rss_before = peak_rss_mb()
+
+        start = time.perf_counter()
+        merged_df, conflicts_df = merge_people_sources(sources)
+        elapsed = time.perf_counter() - start
+
+        merged_mb = merged_df.memory_usage(deep=True).sum() / 1024 / 1024
+        print(f"{people:>12,} people ({input_rows:,} source rows): merged in {elapsed:.2f}s "
+              f"({elapsed / input_rows * 1e9:.0f} ns/row), result {merged_mb:.0f} MB, "
+              f"peak RSS {peak_rss_mb():.0f} MB (+{peak_rss_mb() - rss_before:.0f} MB), "
+              f"{conflicts_df['id'].nunique():,} conflicting ids")
+
+        if list(merged_df.columns) != ["id"] + list(PEOPLE_SCHEMA):
+            print("FAIL: unexpected merged columns")
+            ok = False
+        if max_seconds is not None and elapsed > max_seconds:
+            print(f"FAIL: slower than the {max_seconds}s budget")
+            ok = False
+        del sources, merged_df, conflicts_df
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.people_merge_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the people merge engine")
+    parser.add_argument("--people", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000],
+                        help="Scales to run; time per row should stay flat as they grow")
+    parser.add_argument("--sources", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if any merge takes longer")
+    args = parser.parse_args()
+
+    if not run_benchmark(args.people, args.sources, args.max_seconds):
+        sys.exit(1)
@@ -0,0 +1,141 @@
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.json_provider import init_app as init_json
+from api.pagination import paginated_response
+from api.people_api import PEOPLE_FIELDS
+from api.search import contains_filters
+from api.transactions_api import TRANSACTION_FIELDS
+from benchmarks.customer_stats_benchmark import generate_transactions
+from benchmarks.people_merge_benchmark import generate_sources
+from models.people import People
+from models.transactions import Transactions
+from storage.bulk_loader import load_tables
+from storage.database_loader import create_tables
+from storage.migrator import apply_migrations
+
+SYLLABLES = np.array([
+    "an", "bel", "car", "da", "el", "fer", "gi", "ha", "is", "jo", "ka", "li", "mar", "na", "o", "pe",
+    "qui", "ro", "sa", "ta", "u", "vi", "wen", "xa", "ya", "zo", "bri", "cla", "dre", "fla", "gro", "tho",
+])
+
+# Random capitalized names of two to four syllables
+def generate_names(rng, count):
+    parts = [SYLLABLES[rng.integers(0, len(SYLLABLES), count)] for _ in range(4)]
+    lengths = rng.integers(2, 5, count)
+    names = pd.Series(parts[0]).str.cat(parts[1])
+    for index in (2, 3):
+        names = names.where(lengths <= index, names.str.cat(parts[index]))
+    return names.str.capitalize()
+
+# People and Transactions with varied names, cities, stores and items (a few thousand of each)
+def generate_tables(people, customers, seed=0):
+    rng = np.random.default_rng(seed)
+    people_df = generate_sources(people, source_count=1, seed=seed)[0][1]
+    people_df["firstname"] = generate_names(rng, len(people_df)).to_numpy()
+    people_df["surname"] = generate_names(rng, len(people_df)).to_numpy()
+    cities = generate_names(rng, 5000).to_numpy()
+    people_df["city"] = cities[rng.integers(0, len(cities), len(people_df))]
+
+    transactions_df = generate_transactions(customers)
+    stores = (generate_names(rng, 500) + " Market").to_numpy()
+    items = generate_names(rng, 2000).to_numpy()
+    transactions_df["store"] = stores[rng.integers(0, len(stores), len(transactions_df))]
+    transactions_df["item_name"] = items[rng.integers(0, len(items), len(transactions_df))]
+    return {"People": people_df, "Transactions": transactions_df}
+
+# Substring searches on the generated tables: (label, model, column, /filter fields, term)
+def choose_searches(tables):
+    person = tables["People"].iloc[len(tables["People"]) // 2]
+    sale = tables["Transactions"].iloc[len(tables["Transactions"]) // 2]
+    return [
+        (f"people first_name={person['firstname'].lower()}", People, People.firstName, PEOPLE_FIELDS,
+         person["firstname"].lower()),
+        (f"people last_name={person['surname'][:4].lower()}", People, People.surname, PEOPLE_FIELDS,
+         person["surname"][:4].lower()),
+        (f"people city={person['city'].lower()}", People, People.city, PEOPLE_FIELDS, person["city"].lower()),
+        ("people country=ana (1 in 8 rows)", People, People.country, PEOPLE_FIELDS, "ana"),
+        ("people first_name=zzz (no match)", People, People.firstName, PEOPLE_FIELDS, "zzz"),
+        (f"transactions store={sale['store'][:5].lower()}", Transactions, Transactions.store, TRANSACTION_FIELDS,
+         sale["store"][:5].lower()),
+        (f"transactions item_name={sale['item_name'].lower()}", Transactions, Transactions.item_name,
+         TRANSACTION_FIELDS, sale["item_name"].lower()),
+        ("transactions store=mar (broad)", Transactions, Transactions.store, TRANSACTION_FIELDS, "mar"),
+        ("transactions store=market (every row)", Transactions, Transactions.store, TRANSACTION_FIELDS, "market"),
+    ]
+
+# Time the first /filter page (?limit=, with X-Total-Count) for one filter, returning (median seconds, body, count)
+def time_search(session, model, fields, apply_filter, limit, repeats):
+    app = Flask(__name__)
+    init_json(app)
+    timings = []
+    with app.test_request_context(f"/filter?limit={limit}"):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            query, key_column = apply_filter(session.query(model))
+            response, _ = paginated_response(query, key_column, fields)
+            timings.append(time.perf_counter() - start)
+            session.rollback()
+    return statistics.median(timings), response.get_data(), response.headers["X-Total-Count"]
+
+# Build People and Transactions tables with the trigram indexes and compare ilike scans with index lookups
+def run_benchmark(people, customers, limit, repeats, max_ms=None):
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "venmito.db"
+        connection = sqlite3.connect(db_path)
+        create_tables(connection)
+        tables = generate_tables(people, customers)
+        load_tables(connection, db_path, tables, workers=1)
+        start = time.perf_counter()
+        apply_migrations(connection)
+        print(f"Built indexes and trigram search tables in {time.perf_counter() - start:.2f}s")
+        rows = {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("People", "Transactions")}
+        connection.close()
+        print(f"{rows['People']:,} people, {rows['Transactions']:,} transactions, first page of {limit} rows\n")
+
+        session = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))()
+        searches = choose_searches(tables)
+        del tables
+        print(f"{'search':<44} {'matches':>9} {'ilike':>10} {'trigram':>10} {'speedup':>8}")
+        for label, model, column, fields, term in searches:
+            scan_seconds, scan_body, scan_count = time_search(
+                session, model, fields, lambda query: (query.filter(column.ilike(f"%{term}%")), model.id), limit, repeats
+            )
+            index_seconds, index_body, index_count = time_search(
+                session, model, fields, lambda query: contains_filters(query, model, [(column, term)]), limit, repeats
+            )
+            print(f"{label:<44} {index_count:>9} {scan_seconds * 1000:>8.1f}ms {index_seconds * 1000:>8.1f}ms "
+                  f"{scan_seconds / index_seconds:>7.1f}x")
+            if (scan_body, scan_count) != (index_body, index_count):
+                print(f"FAIL: {label} returns different rows through the trigram index")
+                ok = False
+            if max_ms is not None and index_seconds * 1000 > max_ms:
+                print(f"FAIL: {label} took longer than {max_ms}ms")
+                ok = False
+        session.close()
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.search_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the /filter substring searches")
+    parser.add_argument("--people", type=int, default=3_000_000, help="People ids generated (~70%% are kept)")
+    parser.add_argument("--customers", type=int, default=200_000, help="Customers; 10 line items each")
+    parser.add_argument("--limit", type=int, default=100, help="?limit= of the timed first page")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if an indexed search is slower")
+    args = parser.parse_args()
+
+    if not run_benchmark(args.people, args.customers, args.limit, args.repeats, args.max_ms):
+        sys.exit(1)
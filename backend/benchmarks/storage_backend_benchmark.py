@@ -0,0 +1,120 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.database import DUCKDB_CONFIG
+from api.people_api import query_people_stats
+from api.promotions_api import query_promotion_stats, query_promotion_summary
+from api.transactions_api import query_customer_stats, query_store_stats, query_spending_by_country
+from api.transfers_api import query_country_transfer_stats, query_monthly_totals
+from benchmarks.bulk_load_benchmark import generate_people_and_transfers
+from benchmarks.customer_stats_benchmark import generate_transactions
+from benchmarks.people_merge_benchmark import generate_sources
+from storage.database_loader import build_database
+from storage.duckdb_store import export_to_duckdb
+
+# Query functions behind the /stats endpoints
+ENDPOINT_QUERIES = {
+    "/api/people/stats": query_people_stats,
+    "/api/promotions/stats": query_promotion_stats,
+    "/api/promotions/stats/promotions": query_promotion_summary,
+    "/api/transactions/stats/customers": query_customer_stats,
+    "/api/transactions/stats/stores": query_store_stats,
+    "/api/transactions/stats/spending_by_country": query_spending_by_country,
+    "/api/transfers/stats/country_transfers": query_country_transfer_stats,
+    "/api/transfers/stats/monthly_totals": query_monthly_totals,
+}
+
+# Generate every table for a synthetic database of the given size
+def generate_tables(customers, transfers, seed=0):
+    rng = np.random.default_rng(seed)
+    people_df = generate_sources(customers, source_count=1, seed=seed)[0][1]
+    promotion_people = rng.integers(0, len(people_df), customers // 5)
+    promotions_df = pd.DataFrame({
+        "client_email": people_df["email"].to_numpy()[promotion_people],
+        "phone": people_df["phone"].to_numpy()[promotion_people],
+        "promotion": pd.Series(rng.integers(0, 20, len(promotion_people))).map(lambda i: f"Item {i}"),
+        "responded": np.where(rng.random(len(promotion_people)) < 0.4, "Yes", "No"),
+    })
+    transactions_df = generate_transactions(customers)
+    transfers_df = generate_people_and_transfers(customers, transfers, seed)[1]
+    return {
+        "People": people_df,
+        "Promotions": promotions_df,
+        "Transactions": transactions_df,
+        "Transfers": transfers_df,
+    }
+
+# Round floats so results summed in a different order compare equal
+def normalize(value):
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return value
+
+# Time each endpoint query on one engine, returning {endpoint: (median seconds, result)}
+def time_queries(engine, repeats):
+    Session = sessionmaker(bind=engine)
+    results = {}
+    for endpoint, query in ENDPOINT_QUERIES.items():
+        timings = []
+        for _ in range(repeats):
+            session = Session()
+            try:
+                start = time.perf_counter()
+                result = query(session)
+                timings.append(time.perf_counter() - start)
+            finally:
+                session.close()
+        results[endpoint] = (statistics.median(timings), normalize(result))
+    return results
+
+# Build a synthetic database, copy it to DuckDB and compare the /stats queries on both
+def run_benchmark(customers, transfers, repeats):
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = Path(directory) / "venmito.db"
+        duckdb_path = Path(directory) / "venmito.duckdb"
+        build_database(generate_tables(customers, transfers), db_path=sqlite_path)
+        export_to_duckdb(sqlite_path, duckdb_path)
+
+        sqlite_engine = create_engine(f"sqlite:///{sqlite_path}")
+        duckdb_engine = create_engine(
+            f"duckdb:///{duckdb_path}", connect_args={"read_only": True, "config": DUCKDB_CONFIG}
+        )
+        sqlite_results = time_queries(sqlite_engine, repeats)
+        duckdb_results = time_queries(duckdb_engine, repeats)
+        sqlite_engine.dispose()
+        duckdb_engine.dispose()
+
+    print(f"{'endpoint':<45} {'sqlite':>10} {'duckdb':>10} {'speedup':>8}")
+    for endpoint in ENDPOINT_QUERIES:
+        sqlite_seconds, sqlite_result = sqlite_results[endpoint]
+        duckdb_seconds, duckdb_result = duckdb_results[endpoint]
+        print(f"{endpoint:<45} {sqlite_seconds * 1000:>8.1f}ms {duckdb_seconds * 1000:>8.1f}ms "
+              f"{sqlite_seconds / duckdb_seconds:>7.1f}x")
+        if sqlite_result != duckdb_result:
+            print(f"FAIL: {endpoint} returns different results on DuckDB")
+            ok = False
+    return ok
+
+# Main function to run the script (from the backend directory: python -m benchmarks.storage_backend_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the /stats queries on SQLite and DuckDB")
+    parser.add_argument("--customers", type=int, default=100_000, help="People; transactions are 10 line items each")
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if not run_benchmark(args.customers, args.transfers, args.repeats):
+        sys.exit(1)
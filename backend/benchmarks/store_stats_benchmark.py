@@ -0,0 +1,78 @@
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.transactions_api import query_store_stats
+from benchmarks.customer_stats_benchmark import generate_transactions
+from storage.database_loader import create_tables
+from storage.migrator import apply_migrations
+from storage.summary_tables import refresh_summary_tables
+
+# Expected top-N customers and products per store (same tie-breaks as the query), computed with pandas
+def reference_leaderboards(transactions_df, top_n):
+    customers = transactions_df.groupby(["store", "customer_id"], as_index=False)["total_price"].sum()
+    customers = customers.sort_values(["store", "total_price", "customer_id"], ascending=[True, False, True])
+    products = transactions_df.groupby(["store", "item_name"], as_index=False)["quantity"].sum()
+    products = products.sort_values(["store", "quantity", "item_name"], ascending=[True, False, True])
+    return (
+        customers.groupby("store").head(top_n).groupby("store")["customer_id"].apply(list).to_dict(),
+        products.groupby("store").head(top_n).groupby("store")["item_name"].apply(list).to_dict(),
+    )
+
+# Build a database with the synthetic data and time query_store_stats on it
+def run_benchmark(customers, items_per_customer, stores, top_n, max_seconds=None):
+    transactions_df = generate_transactions(customers, items_per_customer, stores=stores)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "benchmark.db"
+        connection = sqlite3.connect(db_path)
+        create_tables(connection)
+        transactions_df.to_sql("Transactions", connection, if_exists="append", index=False)
+        apply_migrations(connection)
+        refresh_summary_tables(connection, ["StoreRevenue"])
+        connection.close()
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        session = sessionmaker(bind=engine)()
+        start = time.perf_counter()
+        results = query_store_stats(session, top_n)
+        elapsed = time.perf_counter() - start
+        session.close()
+        engine.dispose()
+
+    # Regression check: every store gets the true top-N customers and products
+    top_customers, top_products = reference_leaderboards(transactions_df, top_n)
+    mismatches = sum(
+        1 for row in results
+        if [entry["customer_id"] for entry in row["top_customers"]] != top_customers[row["store"]]
+        or [entry["item_name"] for entry in row["top_products"]] != top_products[row["store"]]
+    )
+
+    print(f"{stores} stores, {len(transactions_df)} line items, top_n={top_n}: "
+          f"query_store_stats took {elapsed:.2f}s, {mismatches} mismatched leaderboards")
+
+    if len(results) != transactions_df["store"].nunique() or mismatches:
+        print("FAIL: results do not match the reference leaderboards")
+        return False
+    if max_seconds is not None and elapsed > max_seconds:
+        print(f"FAIL: slower than the {max_seconds}s budget")
+        return False
+    return True
+
+# Main function to run the script (from the backend directory: python -m benchmarks.store_stats_benchmark)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /api/transactions/stats/stores")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--items-per-customer", type=int, default=10)
+    parser.add_argument("--stores", type=int, default=50)
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the query takes longer")
+    args = parser.parse_args()
+
+    if not run_benchmark(args.customers, args.items_per_customer, args.stores, args.top_n, args.max_seconds):
+        sys.exit(1)
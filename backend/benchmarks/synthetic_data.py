@@ -0,0 +1,285 @@
+import argparse
+import codecs
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from benchmarks.search_benchmark import generate_names
+
+# Rows of each raw file per person, and how the people are split between the
+# two people sources, as in the sample data in datasets/raw (1,000 people)
+PROMOTIONS_PER_PERSON = 0.2
+TRANSACTIONS_PER_PERSON = 0.15
+TRANSFERS_PER_PERSON = 0.527
+JSON_SHARE = 0.932          # people listed in people.json
+YAML_SHARE_OF_JSON = 0.245  # of those, also listed in people.yml (everyone else is only in people.yml)
+
+# Rows generated and written at a time, so every scale fits in memory
+GENERATE_CHUNK = 100_000
+
+# (city, country, people living there in the sample data)
+PLACES = [
+    ("San Francisco", "USA", 206),
+    ("Los Angeles", "USA", 138),
+    ("San Diego", "USA", 129),
+    ("New York", "USA", 125),
+    ("Chicago", "USA", 106),
+    ("Toronto", "Canada", 101),
+    ("London", "United Kingdom", 71),
+    ("Montreal", "Canada", 56),
+]
+DEVICES = ["Android", "Iphone", "Desktop"]
+DEVICE_COUNT_SHARES = [0.45, 0.40, 0.15]
+
+# Item -> usual price per item (transactions vary it by up to 1)
+ITEM_PRICES = {
+    "Coca-Splash": 2, "Colgatex": 3, "Dovee": 2, "Flixnet": 11, "GatorBoost": 4,
+    "KittyKat": 3, "Krafty Cheddar": 5, "Oreoz": 4, "Popsi": 4, "RedCow": 4,
+}
+STORES = ["BestChoice Buy", "PetPals Mart", "SparkMart", "Targeted Treasures", "Trader Tales", "Urban Outfitters Loft"]
+ITEMS_PER_TRANSACTION_SHARES = [0.32, 0.39, 0.29]
+QUANTITY_SHARES = [0.58, 0.31, 0.11]
+
+# Promotions missing the email, missing the phone, or with both
+PROMOTION_CONTACT_SHARES = [0.35, 0.36, 0.29]
+PROMOTION_RESPONSE_RATE = 0.44
+
+# Transfer dates are spread evenly over this range, in file order
+TRANSFER_DATE_RANGE = ("2022-01-01", "2024-04-30")
+
+# First names and surnames people are given (by id)
+FIRST_NAMES = generate_names(np.random.default_rng(1), 5000).to_numpy()
+SURNAMES = generate_names(np.random.default_rng(2), 7000).to_numpy()
+
+PERSON_JSON = """    {{
+        "id": "{id:04d}",
+        "first_name": "{first_name}",
+        "last_name": "{surname}",
+        "telephone": "{phone}",
+        "email": "{email}",
+        "devices": [{devices}
+        ],
+        "location": {{
+            "City": "{city}",
+            "Country": "{country}"
+        }}
+    }}"""
+
+PERSON_YAML = """- Android: {android}
+  Desktop: {desktop}
+  Iphone: {iphone}
+  city: {city}, {country}
+  email: {email}
+  id: {id}
+  name: {first_name} {surname}
+  phone: {phone}
+"""
+
+TRANSACTION_XML = """    <transaction id="{id}">
+        <items>
+{items}        </items>
+        <phone>{phone}</phone>
+        <store>{store}</store>
+    </transaction>
+"""
+
+ITEM_XML = """            <item>
+                <item>{item}</item>
+                <price>{price}</price>
+                <price_per_item>{price_per_item}</price_per_item>
+                <quantity>{quantity}</quantity>
+            </item>
+"""
+
+# Names and contact details of people, derived from their ids
+def person_details(ids):
+    """
+    Every file can refer to any person this way without the people being
+    kept in memory. Phones are a bijection of the id (so they are unique) and
+    emails carry the id.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    first_names = FIRST_NAMES[(ids * 7_919) % len(FIRST_NAMES)]
+    surnames = SURNAMES[(ids * 104_729) % len(SURNAMES)]
+    digits = pd.Series((ids * 2_654_435_761 + 1_000_000_007) % 10**10).astype(str).str.zfill(10)
+    phones = digits.str[:3] + "-" + digits.str[3:6] + "-" + digits.str[6:]
+    emails = first_names + "." + surnames + ids.astype(str).astype(object) + "@example.com"
+    return pd.DataFrame({
+        "id": ids,
+        "first_name": first_names,
+        "surname": surnames,
+        "phone": phones.to_numpy(),
+        "email": emails,
+    })
+
+# Generate the people with ids in [start, stop), with their places, devices and sources
+def generate_people_chunk(rng, start, stop):
+    people_df = person_details(np.arange(start, stop))
+    count = len(people_df)
+    weights = np.array([people for _, _, people in PLACES])
+    places = rng.choice(len(PLACES), count, p=weights / weights.sum())
+    people_df["city"] = np.array([city for city, _, _ in PLACES], dtype=object)[places]
+    people_df["country"] = np.array([country for _, country, _ in PLACES], dtype=object)[places]
+
+    # Each person has 1-3 distinct devices
+    device_counts = rng.choice([1, 2, 3], count, p=DEVICE_COUNT_SHARES)
+    ranks = rng.random((count, len(DEVICES))).argsort(axis=1).argsort(axis=1)
+    for index, device in enumerate(DEVICES):
+        people_df[device] = ranks[:, index] < device_counts
+
+    people_df["in_json"] = rng.random(count) < JSON_SHARE
+    people_df["in_yml"] = ~people_df["in_json"] | (rng.random(count) < YAML_SHARE_OF_JSON)
+    return people_df
+
+# Write people.json and people.yml in the layout of the raw files
+def write_people_files(raw_dir, people, rng):
+    counts = {"people.json": 0, "people.yml": 0}
+    with open(raw_dir / "people.json", "w") as json_file, open(raw_dir / "people.yml", "w") as yml_file:
+        json_file.write("[\n")
+        for start in range(1, people + 1, GENERATE_CHUNK):
+            people_df = generate_people_chunk(rng, start, min(start + GENERATE_CHUNK, people + 1))
+            records = people_df.to_dict("records")
+
+            json_people = [
+                PERSON_JSON.format(
+                    devices=",".join(f'\n            "{device}"' for device in DEVICES if record[device]),
+                    **record,
+                )
+                for record in records if record["in_json"]
+            ]
+            if json_people:
+                json_file.write((",\n" if counts["people.json"] else "") + ",\n".join(json_people))
+            counts["people.json"] += len(json_people)
+
+            yml_people = [
+                PERSON_YAML.format(
+                    android=int(record["Android"]), desktop=int(record["Desktop"]), iphone=int(record["Iphone"]),
+                    **record,
+                )
+                for record in records if record["in_yml"]
+            ]
+            yml_file.write("".join(yml_people))
+            counts["people.yml"] += len(yml_people)
+        json_file.write("\n]")
+    return counts
+
+# Write a CSV in the layout of the raw ones (UTF-8 byte order mark, CRLF line endings), chunk by chunk
+def write_raw_csv(path, chunks):
+    with open(path, "wb") as file:
+        file.write(codecs.BOM_UTF8)
+        for index, chunk in enumerate(chunks):
+            file.write(chunk.to_csv(index=False, header=index == 0, lineterminator="\r\n").encode("utf-8"))
+
+# Row ranges [start, stop) of GENERATE_CHUNK rows covering count rows
+def _chunk_ranges(count):
+    return [(start, min(start + GENERATE_CHUNK, count)) for start in range(0, count, GENERATE_CHUNK)]
+
+# Promotions offered to random people, with either contact detail sometimes missing
+def generate_promotions(rng, people, count):
+    items = np.array(list(ITEM_PRICES), dtype=object)
+    for start, stop in _chunk_ranges(count):
+        details = person_details(rng.integers(1, people + 1, stop - start))
+        contact = rng.choice(3, stop - start, p=PROMOTION_CONTACT_SHARES)
+        yield pd.DataFrame({
+            "id": np.arange(start + 1, stop + 1),
+            "client_email": details["email"].where(contact != 0),
+            "telephone": details["phone"].where(contact != 1),
+            "promotion": items[rng.integers(0, len(items), stop - start)],
+            "responded": np.where(rng.random(stop - start) < PROMOTION_RESPONSE_RATE, "Yes", "No"),
+        })
+
+# Transfers between two different random people, in date order
+def generate_transfers(rng, people, count):
+    first_day, last_day = (pd.Timestamp(day) for day in TRANSFER_DATE_RANGE)
+    days = (last_day - first_day).days + 1
+    for start, stop in _chunk_ranges(count):
+        senders = rng.integers(1, people + 1, stop - start)
+        recipients = (senders - 1 + rng.integers(1, people, stop - start)) % people + 1
+        offsets = ((np.arange(start, stop) + rng.random(stop - start)) * days / count).astype(np.int64)
+        yield pd.DataFrame({
+            "sender_id": senders,
+            "recipient_id": recipients,
+            "amount": np.maximum(rng.gamma(1.6, 23.0, stop - start).round(2), 0.01),
+            "date": (first_day + pd.to_timedelta(offsets, unit="D")).strftime("%Y-%m-%d"),
+        })
+
+# Write transactions.xml: random customers buying 1-3 items at a store; returns the number of line items
+def write_transactions_xml(path, rng, people, count):
+    items = np.array(list(ITEM_PRICES), dtype=object)
+    prices = np.array(list(ITEM_PRICES.values()))
+    stores = np.array(STORES, dtype=object)
+    line_items = 0
+    with open(path, "w") as file:
+        file.write("<transactions>\n")
+        for start, stop in _chunk_ranges(count):
+            phones = person_details(rng.integers(1, people + 1, stop - start))["phone"].to_numpy()
+            transaction_stores = stores[rng.integers(0, len(stores), stop - start)]
+            item_counts = rng.choice([1, 2, 3], stop - start, p=ITEMS_PER_TRANSACTION_SHARES)
+
+            total = int(item_counts.sum())
+            item_indexes = rng.integers(0, len(items), total)
+            quantities = rng.choice([1, 2, 3], total, p=QUANTITY_SHARES)
+            prices_per_item = np.maximum(prices[item_indexes] + rng.integers(-1, 2, total), 1)
+            item_xml = [
+                ITEM_XML.format(item=item, price=price_per_item * quantity, price_per_item=price_per_item, quantity=quantity)
+                for item, price_per_item, quantity in zip(
+                    items[item_indexes], prices_per_item.tolist(), quantities.tolist()
+                )
+            ]
+
+            ends = np.cumsum(item_counts).tolist()
+            starts = [0] + ends[:-1]
+            file.write("".join(
+                TRANSACTION_XML.format(
+                    id=1000 + start + index, items="".join(item_xml[first:last]), phone=phone, store=store
+                )
+                for index, (first, last, phone, store) in enumerate(zip(starts, ends, phones, transaction_stores))
+            ))
+            line_items += total
+        file.write("</transactions>")
+    return line_items
+
+# Generate all five raw files for the given number of people
+def generate_raw_datasets(raw_dir, people, promotions=None, transactions=None, transfers=None, seed=0):
+    """
+    The other files are sized from the people by the ratios of the sample
+    data unless given. Every promotion, transaction and transfer refers to an
+    existing person, as in the sample data. Returns {file name: rows}, where
+    a transaction line item counts as a row of transactions.xml.
+    """
+    if people < 2:
+        raise ValueError("At least 2 people are needed (transfers go between two people)")
+    promotions = int(people * PROMOTIONS_PER_PERSON) if promotions is None else promotions
+    transactions = int(people * TRANSACTIONS_PER_PERSON) if transactions is None else transactions
+    transfers = int(people * TRANSFERS_PER_PERSON) if transfers is None else transfers
+
+    raw_dir = Path(raw_dir)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    counts = write_people_files(raw_dir, people, rng)
+    write_raw_csv(raw_dir / "promotions.csv", generate_promotions(rng, people, promotions))
+    counts["promotions.csv"] = promotions
+    counts["transactions.xml"] = write_transactions_xml(raw_dir / "transactions.xml", rng, people, transactions)
+    write_raw_csv(raw_dir / "transfers.csv", generate_transfers(rng, people, transfers))
+    counts["transfers.csv"] = transfers
+    return counts
+
+# Main function to run the script (from the backend directory: python -m benchmarks.synthetic_data --output DIR)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic raw datasets at a chosen scale")
+    parser.add_argument("--output", type=Path, required=True, help="Directory to write the five raw files to")
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--promotions", type=int, help=f"Default: {PROMOTIONS_PER_PERSON} per person")
+    parser.add_argument("--transactions", type=int, help=f"Default: {TRANSACTIONS_PER_PERSON} per person")
+    parser.add_argument("--transfers", type=int, help=f"Default: {TRANSFERS_PER_PERSON} per person")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate_raw_datasets(
+        args.output, args.people, args.promotions, args.transactions, args.transfers, args.seed
+    )
+    print(f"Generated in {time.perf_counter() - start:.1f}s:")
+    for name, rows in counts.items():
+        print(f"  {name}: {rows:,} rows ({(args.output / name).stat().st_size / 1024 / 1024:.1f} MB)")
@@ -4,9 +4,10 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import json
 import os
-import sys
-import subprocess
-from pathlib import Path
+from storage.migrator import report_missing_indexes
+from ingestion.pipeline import run_pipeline, run_incremental_pipeline, INCREMENTAL_LOAD
+from api.database import init_app as init_database
+from api.json_provider import init_app as init_json
 from api.people_api import people_blueprint
 from api.promotions_api import promotions_blueprint
 from api.transactions_api import transactions_blueprint
@@ -25,8 +26,9 @@ CORS(app, resources={
     r"/api/*": {
         "origins": "http://localhost:5173",
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type"],
+        "allow_headers": ["Content-Type", "If-None-Match"],
         "supports_credentials": True,
+        "expose_headers": ["X-Total-Count", "X-Total-Count-Capped", "X-Next-Cursor", "ETag"],
         "max_age": 3600
     },
     r"/static/*": {
@@ -38,46 +40,18 @@ CORS(app, resources={
 })
 
 def run_initialization_scripts():
-    """Run all initialization scripts in the specified order"""
+    """Run the ingestion pipeline and rebuild (or incrementally update) the database in-process"""
     print("Running initialization scripts...")
-    
-    # Get the absolute path to the root directory using pathlib
-    root_dir = Path(__file__).resolve().parent
-    
-    # Define scripts in order
-    ingestion_scripts = [
-        'json_loader.py',
-        'yaml_loader.py',
-        'people_merger.py',
-        'promotions_loader.py',
-        'transactions_loader.py',
-        'transfers_loader.py'
-    ]
-    
-    # Run ingestion scripts
-    ingestion_dir = root_dir / 'ingestion'
-    print(f"Running scripts from: {ingestion_dir}")
-    
-    for script in ingestion_scripts:
-        script_path = ingestion_dir / script
-        try:
-            print(f"Running {script}...")
-            subprocess.run([sys.executable, str(script_path)], check=True)
-            print(f"Completed {script}")
-        except subprocess.CalledProcessError as e:
-            print(f"Error running {script}: {str(e)}")
-            raise
-    
-    # Run database loader
-    try:
-        storage_dir = root_dir / 'storage'
-        db_loader_path = storage_dir / 'database_loader.py'
-        print(f"Running database_loader.py from {db_loader_path}...")
-        subprocess.run([sys.executable, str(db_loader_path)], check=True)
-        print("Completed database_loader.py")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running database_loader.py: {str(e)}")
-        raise
+    if INCREMENTAL_LOAD:
+        run_incremental_pipeline()
+    else:
+        run_pipeline()
+
+# Request-scoped database sessions
+init_database(app)
+
+# Fast JSON encoding (orjson when installed)
+init_json(app)
 
 # Register blueprints
 app.register_blueprint(people_blueprint, url_prefix="/api/people")
@@ -89,4 +63,5 @@ app.register_blueprint(initialize_blueprint, url_prefix="/api/initialize")
 # Main entry point
 if __name__ == "__main__":
     run_initialization_scripts()
+    report_missing_indexes()
     app.run(debug=True)
\ No newline at end of file
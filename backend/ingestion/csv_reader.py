@@ -0,0 +1,113 @@
+import codecs
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import pandas as pd
+
+# Processes parsing CSV chunks at the same time (1 parses them in-process)
+CSV_WORKERS = int(os.getenv("VENMITO_CSV_WORKERS", str(os.cpu_count() or 1)))
+
+# Approximate size of each chunk a CSV is split into; chunks end at a line boundary
+CSV_CHUNK_BYTES = int(os.getenv("VENMITO_CSV_CHUNK_BYTES", str(16 << 20)))
+
+# Format of the date columns in the raw CSVs
+CSV_DATE_FORMAT = "%Y-%m-%d"
+
+# Read the header line of an open CSV, without a UTF-8 byte order mark
+def read_header(file):
+    """
+    Returns (header, end): the header line (always ending in a newline) and
+    the byte offset where the data rows start.
+    """
+    header = file.readline()
+    end = len(header)
+    header = header.removeprefix(codecs.BOM_UTF8)
+    if not header.endswith(b"\n"):
+        header += b"\n"
+    return header, end
+
+# Read only the rows of a CSV that start at a byte offset (e.g. rows appended since the last load)
+def read_csv_from_offset(filepath, offset, **read_csv_kwargs):
+    """
+    Parses the bytes from offset to the end of the file using the file's own
+    header line, so an append-only source can be loaded without re-reading the
+    rows that were already ingested.
+    """
+    with open(filepath, "rb") as file:
+        header, data_start = read_header(file)
+        file.seek(max(offset, data_start))
+        tail = file.read()
+    return pd.read_csv(io.BytesIO(header + tail), **read_csv_kwargs)
+
+# Split a CSV into byte ranges of about chunk_bytes that start and end on line boundaries
+def split_csv(filepath, chunk_bytes=CSV_CHUNK_BYTES, start_offset=None):
+    """
+    Returns (header, ranges). Each range's end is moved forward to the end of
+    the line it falls in, so every range holds whole rows. With start_offset
+    only the rows from that byte on are covered (see read_csv_from_offset).
+    Rows are assumed not to contain quoted newlines, which holds for the
+    raw promotions and transfers files.
+    """
+    size = os.path.getsize(filepath)
+    ranges = []
+    with open(filepath, "rb") as file:
+        header, start = read_header(file)
+        start = max(start, start_offset or 0)
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+# Parse one byte range of a CSV (runs in a worker process)
+def parse_csv_range(filepath, header, start, end, dtype=None, date_columns=(), read_csv_kwargs=None):
+    with open(filepath, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    df = pd.read_csv(io.BytesIO(header + data), dtype=dtype, **(read_csv_kwargs or {}))
+    # Dates are parsed here, once, with a fixed format (datetime64 is cheap to send back from a worker)
+    for column in date_columns:
+        df[column] = pd.to_datetime(df[column], format=CSV_DATE_FORMAT)
+    return df
+
+# Turn the parsed date columns into datetime.date values, as the processed schemas expect
+def to_dates(df, date_columns):
+    for column in date_columns:
+        df[column] = df[column].dt.date
+    return df
+
+# Parse a CSV in line-aligned chunks on a process pool, yielding the DataFrames in file order
+def iter_csv_chunks(filepath, dtype=None, date_columns=(), workers=CSV_WORKERS, chunk_bytes=CSV_CHUNK_BYTES,
+                    start_offset=None, **read_csv_kwargs):
+    """
+    The file is split with split_csv and every chunk is parsed by
+    parse_csv_range with the given column dtypes, so no chunk infers its own
+    types. Date columns come back as datetime.date values. At most two chunks per worker are parsed ahead of the consumer,
+    which keeps memory bounded while the caller (e.g. the database writer)
+    works through the earlier chunks. Small files (a single chunk) and
+    workers=1 are parsed in-process.
+    """
+    header, ranges = split_csv(filepath, chunk_bytes, start_offset)
+    parse_args = (dtype, tuple(date_columns), read_csv_kwargs)
+
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield to_dates(parse_csv_range(filepath, header, start, end, *parse_args), date_columns)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        def submit(byte_range):
+            return executor.submit(parse_csv_range, filepath, header, *byte_range, *parse_args)
+
+        ranges = iter(ranges)
+        pending = deque(submit(byte_range) for byte_range in islice(ranges, 2 * workers))
+        while pending:
+            chunk = pending.popleft().result()
+            following = next(ranges, None)
+            if following is not None:
+                pending.append(submit(following))
+            yield to_dates(chunk, date_columns)
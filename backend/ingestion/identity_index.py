@@ -0,0 +1,206 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+from ingestion.processed_store import PROCESSED_DATA_PATH, read_processed, resolve_format, write_processed
+
+# Processed dataset and metadata file the index is persisted to
+INDEX_DATASET = "identity_index"
+INDEX_META_PATH = PROCESSED_DATA_PATH / "identity_index.json"
+
+# Raw sources the merged people (and so the index) are built from
+PEOPLE_SOURCES = ["people.json", "people.yml"]
+
+# Unmatched keys printed as examples
+UNMATCHED_SAMPLE_SIZE = 5
+
+# str.translate table keeping only the ASCII digits (filled in as characters are seen)
+class _DigitsOnly(dict):
+    def __missing__(self, code):
+        self[code] = chr(code) if 48 <= code <= 57 else None
+        return self[code]
+
+DIGITS_ONLY = _DigitsOnly()
+
+# Normalized key of one phone number
+def phone_key(phone):
+    """
+    "533-849-3913", "(533) 849 3913" and "+1 533.849.3913" all become
+    "5338493913": everything but the digits is dropped, and so is a leading
+    US country code. A value without any digits has no key.
+    """
+    digits = str(phone).translate(DIGITS_ONLY)
+    if len(digits) == 11 and digits[0] == "1":
+        digits = digits[1:]
+    return digits or None
+
+# Normalized key of one email: lower case, without surrounding whitespace
+def email_key(email):
+    return str(email).strip().lower() or None
+
+# Distinct values of a Series and the position of every value among them (-1 if missing)
+def _factorize(values):
+    return pd.factorize(pd.Series(values).to_numpy(dtype=object, na_value=None))
+
+# Hash index of distinct values and the first row holding each
+def _first_rows(values):
+    """
+    Returns (codes, index, first_rows): the position in index of every value
+    (-1 if missing), and the first row holding each index value. The hash
+    table is built here, before the loaders share the index across threads.
+    """
+    values = pd.Series(values).to_numpy(dtype=object, na_value=None)
+    index = pd.Index(values, dtype=object)
+    # Usually every value is distinct, and the uniqueness check builds the hash table
+    if index.is_unique:
+        rows = np.arange(len(values))
+        return np.where(pd.isna(values), -1, rows), index, rows
+
+    codes, uniques = pd.factorize(values)
+    first_rows = np.empty(len(uniques), dtype=np.int64)
+    # Assigning in reverse leaves the first row of each value
+    rows = np.flatnonzero(codes >= 0)[::-1]
+    first_rows[codes[rows]] = rows
+    index = pd.Index(uniques, dtype=object)
+    index.get_indexer(index[:1])
+    return codes, index, first_rows
+
+# Normalize a Series with a key function, once per distinct value
+def _normalize(values, key_function):
+    values = pd.Series(values)
+    codes, uniques = _factorize(values)
+    keys = np.array([key_function(value) for value in uniques] + [None], dtype=object)
+    return pd.Series(keys[codes], index=values.index, dtype="string")
+
+# Normalize a Series of phone numbers (see phone_key)
+def normalize_phones(phones):
+    return _normalize(phones, phone_key)
+
+# Normalize a Series of emails (see email_key)
+def normalize_emails(emails):
+    return _normalize(emails, email_key)
+
+KEY_FUNCTIONS = {
+    "phone": phone_key,
+    "email": email_key,
+}
+
+# Phone/email -> person lookups shared by the promotions, transactions and transfers loaders
+class IdentityIndex:
+    """
+    Built once from the merged people. Each key (phone, email and id) gets
+    pandas Indexes whose hash tables are built up front, and lookups resolve
+    a whole Series with get_indexer probes instead of a set_index/map or a
+    Python dict per loader. When two people share a key,
+    the first one wins. The index only reads its hash tables once built, so
+    the pipeline's loader threads can share it.
+    """
+    def __init__(self, people, phone_keys=None, email_keys=None):
+        start = time.perf_counter()
+        self.people = people[["id", "email", "phone"]].reset_index(drop=True).astype(
+            {"id": "Int64", "email": "string", "phone": "string"}
+        )
+        self.normalized = pd.DataFrame({
+            "phone_key": normalize_phones(self.people["phone"]) if phone_keys is None else phone_keys,
+            "email_key": normalize_emails(self.people["email"]) if email_keys is None else email_keys,
+        }).astype("string").reset_index(drop=True)
+        self.keys = {
+            key: self._build_key_index(self.people[key], self.normalized[f"{key}_key"]) for key in KEY_FUNCTIONS
+        }
+        self.ids = pd.Index(self.people["id"].dropna().unique().astype(np.int64))
+        self.ids.get_indexer(self.ids[:1])
+        print(f"Indexed {len(self.people)} people by phone, email and id in {time.perf_counter() - start:.2f}s")
+
+    # Hash indexes resolving a phone or email to the row of the first person with its normalized key
+    @staticmethod
+    def _build_key_index(stored, keys):
+        """
+        Besides the normalized keys, the values exactly as stored on the people
+        are indexed too (pointing at the same person), so the common case of a
+        lookup written like the people data skips normalization altogether.
+        """
+        key_codes, key_index, key_rows = _first_rows(keys)
+        person_rows = np.append(key_rows, -1)[key_codes]
+        _, stored_index, stored_rows = _first_rows(stored)
+        return stored_index, person_rows[stored_rows], key_index, key_rows
+
+    # Row of the matching person for every value (-1 where nothing matches)
+    def rows(self, values, key):
+        stored_index, stored_rows, key_index, key_rows = self.keys[key]
+        codes, uniques = _factorize(values)
+        positions = stored_index.get_indexer(uniques)
+        distinct_rows = np.where(positions >= 0, stored_rows[positions], -1)
+
+        # Only values not found as stored are normalized, once per distinct value
+        missed = np.flatnonzero(positions < 0)
+        if len(missed):
+            key_function = KEY_FUNCTIONS[key]
+            positions = key_index.get_indexer([key_function(value) for value in uniques[missed]])
+            distinct_rows[missed] = np.where(positions >= 0, key_rows[positions], -1)
+        return np.append(distinct_rows, -1)[codes]
+
+    # Look up a column (id, email or phone) of the person matching each value
+    def lookup(self, values, key, column):
+        """
+        Returns a Series aligned with values, missing where the value is
+        missing or matches nobody. Emails and phones come back as stored on
+        the person, not normalized.
+        """
+        values = pd.Series(values)
+        matches = self.people[column].array.take(self.rows(values, key), allow_fill=True)
+        return pd.Series(matches, index=values.index, name=column)
+
+    # Whether each id belongs to a person
+    def contains_ids(self, ids):
+        return self.ids.get_indexer(pd.Series(ids).to_numpy()) >= 0
+
+    # Distinct non-missing values that match nobody
+    def unmatched(self, values, key):
+        values = pd.Series(values)
+        return values[values.notna().to_numpy() & (self.rows(values, key) < 0)].unique()
+
+    # Print how many values of a lookup matched nobody, with a few examples
+    def report_unmatched(self, label, values, key):
+        unmatched = self.unmatched(values, key)
+        if len(unmatched):
+            sample = ", ".join(str(value) for value in unmatched[:UNMATCHED_SAMPLE_SIZE])
+            print(f"{label}: {len(unmatched)} {key} values match no person (e.g. {sample})")
+        else:
+            print(f"{label}: every {key} matched a person")
+        return unmatched
+
+    # Persist the index with the fingerprints of the people sources it was built from
+    def save(self, sources, name=INDEX_DATASET, meta_path=INDEX_META_PATH):
+        fmt = resolve_format()
+        path = write_processed(pd.concat([self.people, self.normalized], axis=1), name, fmt)
+        with open(meta_path, "w") as file:
+            json.dump({"sources": sources, "rows": len(self.people), "format": fmt}, file, indent=2)
+        return path
+
+# sha256 of each people source, as recorded by storage/source_fingerprints.py
+def people_source_hashes(fingerprints):
+    return {source: fingerprints[source]["sha256"] for source in PEOPLE_SOURCES}
+
+# Load the persisted index if it was built from the given people sources (None otherwise)
+def load_identity_index(sources, name=INDEX_DATASET, meta_path=INDEX_META_PATH):
+    try:
+        with open(meta_path, "r") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get("sources") != sources:
+        return None
+    try:
+        df = read_processed(name, meta["format"])
+    except (OSError, ImportError):
+        return None
+    if len(df) != meta["rows"]:
+        return None
+    print(f"Loaded identity index for {len(df)} people from {meta_path}")
+    return IdentityIndex(df, df["phone_key"], df["email_key"])
+
+# Build the index over the merged people and persist it for the next incremental load
+def build_identity_index(people_df, sources):
+    index = IdentityIndex(people_df)
+    index.save(sources)
+    return index
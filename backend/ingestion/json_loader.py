@@ -1,6 +1,20 @@
 import json
+import time
+from itertools import islice
+from json.decoder import WHITESPACE
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from ingestion.processed_store import write_processed
+
+# People per batch emitted by the streaming parser
+PEOPLE_BATCH_SIZE = 50_000
+
+# Characters read from people.json at a time by the streaming parser
+JSON_READ_SIZE = 1 << 20
+
+# Device columns, in output order; devices outside this list get a column after them
+DEVICE_COLUMNS = ["Android", "Iphone", "Desktop"]
 
 # Loads the Data
 def load_json_file(filepath):
@@ -8,6 +22,95 @@ def load_json_file(filepath):
         data = json.load(file)
     return data
 
+# Stream the elements of the top-level JSON array one at a time
+def iter_json_array(filepath, read_size=JSON_READ_SIZE):
+    """
+    Reads the file read_size characters at a time and decodes each element
+    with JSONDecoder.raw_decode as soon as it is complete, so only the
+    unread part of the buffer and the current element are held in memory.
+    An element that reaches the end of the buffer is decoded again once
+    more of the file has been read, as it may have been cut short.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, "r", encoding="utf-8-sig") as file:
+        buffer = ""
+        pos = 0
+        eof = False
+        state = "start"  # start -> first/value -> separator -> ... -> end
+        while state != "end":
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer) and not eof:
+                chunk = file.read(read_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if pos == len(buffer):
+                raise ValueError(f"{filepath}: unexpected end of the JSON array")
+
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError(f"{filepath}: expected a JSON array")
+                pos += 1
+                state = "first"
+            elif state == "separator" or (state == "first" and char == "]"):
+                if char == "]":
+                    state = "end"
+                elif char != ",":
+                    raise ValueError(f"{filepath}: expected ',' or ']' at character {pos}")
+                else:
+                    state = "value"
+                pos += 1
+            else:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = len(buffer)
+                if end == len(buffer) and not eof:
+                    # Possibly incomplete: read more and decode it again
+                    chunk = file.read(read_size)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                yield element
+                pos = end
+                state = "separator"
+
+# Stream people.json in DataFrames of at most batch_size people
+def iter_json_batches(filepath, batch_size=PEOPLE_BATCH_SIZE):
+    records = iter_json_array(filepath)
+    while batch := list(islice(records, batch_size)):
+        yield json_to_dataframe(batch)
+
+# Load people.json batch by batch, normalizing each batch as it is parsed
+def load_json_people(filepath, batch_size=PEOPLE_BATCH_SIZE):
+    """
+    Returns the same DataFrame as normalizing the whole file at once. A
+    device that only some batches have is False for the rows of the others.
+    """
+    start = time.perf_counter()
+    batches = []
+    devices = set()
+    for batch in iter_json_batches(filepath, batch_size):
+        batch = normalize_location(batch)
+        columns = set(batch.columns)
+        batch = normalize_devices(batch)
+        devices.update(set(batch.columns) - columns)
+        batches.append(batch)
+    if not batches:
+        return pd.DataFrame()
+
+    people_df = pd.concat(batches, ignore_index=True)
+    devices = [column for column in people_df.columns if column in devices]
+    people_df[devices] = people_df[devices].fillna(False).astype(bool)
+
+    elapsed = time.perf_counter() - start
+    rate = len(people_df) / elapsed if elapsed > 0 else float("inf")
+    print(f"Parsed {len(people_df)} people from {filepath} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return people_df
+
 # Converts JSON data to a DataFrame
 def json_to_dataframe(data):
     df = pd.DataFrame(data)
@@ -20,17 +123,27 @@ def check_missing_values(df):
 
 # Normalizes the "location" dictionary to separate "City" and "Country" columns
 def normalize_location(df):
-    # Normalize the "location" dictionary to separate "City" and "Country" columns
-    df[["City", "Country"]] = pd.json_normalize(df["location"])
+    # Pull both keys out of every dictionary at once (missing keys become NaN)
+    locations = df["location"].str
+    df["City"] = locations.get("City")
+    df["Country"] = locations.get("Country")
     df.drop(columns=["location"], inplace=True)
     return df
 
 # Normalizes the "devices" list to one-hot encoding (boolean columns)
 def normalize_devices(df):
-    # Convert devices list to one-hot encoding (boolean columns)
-    devices_df = pd.json_normalize(
-        df["devices"].apply(lambda x: {device: True for device in x})
-    ).fillna(False)
+    # One entry per (person, device), keyed by the person's position
+    devices = pd.Series(df["devices"].to_numpy()).explode()
+    codes, names = pd.factorize(devices.to_numpy())
+    names = list(names)
+    columns = DEVICE_COLUMNS + [device for device in names if device not in DEVICE_COLUMNS]
+
+    # Set each person's device flags in one scatter (people without devices keep all False)
+    flags = np.zeros((len(df), len(columns)), dtype=bool)
+    listed = codes >= 0
+    column_of_code = np.array([columns.index(device) for device in names], dtype=np.intp)
+    flags[devices.index.to_numpy()[listed], column_of_code[codes[listed]]] = True
+    devices_df = pd.DataFrame(flags, index=df.index, columns=columns)
 
     df = pd.concat([df, devices_df], axis=1)
     df.drop(columns=["devices"], inplace=True)
@@ -39,13 +152,9 @@ def normalize_devices(df):
 # Main function to run the script
 if __name__ == "__main__":
     filepath = Path("datasets/raw/people.json")
-    data = load_json_file(filepath)
-    people_df = json_to_dataframe(data)
+    people_df = load_json_people(filepath)
     check_missing_values(people_df)
-    people_df = normalize_location(people_df)
-    people_df = normalize_devices(people_df)
     # Print the updated DataFrame to verify the changes
     print("\nFinal Normalized Dataframe:")
     print(people_df.head())
-    output_path = Path("datasets/processed/people_cleaned_json.csv")
-    people_df.to_csv(output_path, index=False)
+    write_processed(people_df, "people_cleaned_json")
@@ -1,64 +1,153 @@
+import numpy as np
 import pandas as pd
-from pathlib import Path
+from ingestion.processed_store import read_processed, write_processed
 
 # Load the processed JSON and YAML files
 def load_people_files():
 
-    json_path = Path("datasets/processed/people_cleaned_json.csv")
-    yml_path = Path("datasets/processed/people_cleaned_yml.csv")
-
-    json_df = pd.read_csv(json_path)
-    yml_df = pd.read_csv(yml_path)
-    json_df.rename(columns={'telephone': 'phone'}, inplace=True)
-    json_df.rename(columns={'last_name': 'surname'}, inplace=True)
-    yml_df.columns = yml_df.columns.str.lower().str.replace(' ', '').str.replace('_', '')
-    json_df.columns = json_df.columns.str.lower().str.replace(' ', '').str.replace('_', '')
+    json_df = read_processed("people_cleaned_json")
+    yml_df = read_processed("people_cleaned_yml")
 
     #print(json_df.head)
     #print(yml_df.head())
 
 
+    return standardize_people_columns(json_df, yml_df)
+
+# Align the JSON and YAML column names (and id dtype) so they can be merged
+def standardize_people_columns(json_df, yml_df):
+    json_df = json_df.rename(columns={'telephone': 'phone', 'last_name': 'surname'})
+    yml_df = yml_df.copy()
+    yml_df.columns = yml_df.columns.str.lower().str.replace(' ', '').str.replace('_', '')
+    json_df.columns = json_df.columns.str.lower().str.replace(' ', '').str.replace('_', '')
+
+    # Ids are zero-padded strings in people.json ("0001"), integers everywhere else
+    json_df['id'] = json_df['id'].astype(int)
+    yml_df['id'] = yml_df['id'].astype(int)
+
     return json_df, yml_df
 
-# Merge the JSON and YAML data
+# Column every people source is keyed on
+PEOPLE_KEY = "id"
+
+# Merged people columns (in output order) and their dtypes. Nullable dtypes keep
+# missing values without falling back to object/float columns, and low-cardinality
+# text is stored as categories.
+PEOPLE_SCHEMA = {
+    "email": "string",
+    "phone": "string",
+    "city": "category",
+    "country": "category",
+    "firstname": "string",
+    "surname": "string",
+    "android": "boolean",
+    "iphone": "boolean",
+    "desktop": "boolean",
+}
+
+# Values of a column in one source (all missing if the source lacks the column)
+def _source_column(df, column):
+    if column in df.columns:
+        return df[column].to_numpy()
+    return np.full(len(df), None, dtype=object)
+
+# Build the output column from per-id category codes (-1 = missing)
+def _column_from_codes(codes, categories, dtype):
+    column = pd.Series(pd.Categorical.from_codes(codes, categories=pd.Index(categories)))
+    return column if dtype == "category" else column.astype(dtype)
+
+# Coalesce any number of people sources into one row per id
+def merge_people_sources(sources, schema=PEOPLE_SCHEMA, key=PEOPLE_KEY):
+    """
+    sources is a list of (name, DataFrame) in priority order, each already
+    standardized to the schema's column names; columns a source lacks count as
+    missing and columns outside the schema are ignored. For every column the
+    first non-missing value in priority order wins.
+
+    The sources are stacked and sorted by (id, priority) once; each column is
+    then factorized to integer codes and coalesced with a single
+    np.minimum.reduceat over the id groups, so the work is a few vectorized
+    passes per column regardless of how many sources there are.
+
+    Returns (merged_df, conflicts_df), where conflicts_df lists
+    (id, column, source, value) for every id whose sources disagree on a column.
+    """
+    source_names = np.array([name for name, _ in sources], dtype=object)
+    ids = np.concatenate([df[key].to_numpy(dtype="int64") for _, df in sources])
+    priorities = np.concatenate([np.full(len(df), index, dtype="int16") for index, (_, df) in enumerate(sources)])
+
+    # Group the stacked rows by id, highest-priority source first within each group
+    order = np.lexsort((priorities, ids))
+    sorted_ids = ids[order]
+    sorted_priorities = priorities[order]
+    merged_ids, group_starts = np.unique(sorted_ids, return_index=True)
+    group_sizes = np.diff(np.append(group_starts, len(order)))
+    row_groups = np.repeat(np.arange(len(merged_ids)), group_sizes)
+    positions = np.arange(len(order))
+
+    merged_columns = {key: merged_ids}
+    conflicts = []
+    for column, dtype in schema.items():
+        values = np.concatenate([_source_column(df, column) for _, df in sources])
+        codes, categories = pd.factorize(values)
+        codes = codes[order]
+        present = codes >= 0
+
+        # Position of the first present value in every group (len(order) if none)
+        first_present = np.minimum.reduceat(np.where(present, positions, len(order)), group_starts)
+        winners = np.append(codes, -1)[first_present]
+        merged_columns[column] = _column_from_codes(winners, categories, dtype)
+
+        # Rows holding a value other than their id's winning one
+        differs = present & (codes != winners[row_groups])
+        if differs.any():
+            conflicting_groups = np.unique(row_groups[differs])
+            rows = present & np.isin(row_groups, conflicting_groups)
+            print(f"People merge: {len(conflicting_groups)} ids have conflicting {column} values")
+            conflicts.append(pd.DataFrame({
+                key: sorted_ids[rows],
+                "column": column,
+                "source": source_names[sorted_priorities[rows]],
+                "value": pd.Series(np.asarray(categories, dtype=object)[codes[rows]]).astype(str).to_numpy(),
+            }))
+
+    merged_df = pd.DataFrame(merged_columns)
+    if not conflicts:
+        conflicts_df = pd.DataFrame(columns=[key, "column", "source", "value"])
+    else:
+        conflicts_df = pd.concat(conflicts, ignore_index=True).sort_values([key, "column"], kind="stable")
+    return merged_df, conflicts_df
+
+# Number of conflicting ids shown per column in the conflict summary
+CONFLICT_SAMPLE_IDS = 5
+
+# Print how many ids conflict on each column, with a few of them and their values
+def summarize_conflicts(conflicts_df, sample_ids=CONFLICT_SAMPLE_IDS, key=PEOPLE_KEY):
+    for column, rows in conflicts_df.groupby("column", sort=True):
+        ids = rows[key].unique()
+        print(f"People merge conflicts on {column}: {len(ids)} ids, e.g.")
+        for person_id in ids[:sample_ids]:
+            values = rows[rows[key] == person_id]
+            print(f"  {person_id}: " + ", ".join(f"{source}={value!r}" for source, value in zip(values["source"], values["value"])))
+
+# Merge the JSON and YAML data (JSON values win where both are present)
 def merge_people_data(json_df, yml_df):
-    merged_df = pd.merge(json_df, yml_df, on='id', how="outer", suffixes=("_json", "_yml"))
-    # Resolve conflicts for shared columns
-    merged_df['email'] = merged_df['email_json'].combine_first(merged_df['email_yml'])
-    merged_df['phone'] = merged_df['phone_json'].combine_first(merged_df['phone_yml'])
-    merged_df['city'] = merged_df['city_json'].combine_first(merged_df['city_yml'])
-    merged_df['country'] = merged_df['country_json'].combine_first(merged_df['country_yml'])
-    merged_df['firstname'] = merged_df['firstname_json'].combine_first(merged_df['firstname_yml'])
-    merged_df['surname'] = merged_df['surname_json'].combine_first(merged_df['surname_yml'])
-    merged_df['android'] = merged_df['android_json'].combine_first(merged_df['android_yml'])
-    merged_df['iphone'] = merged_df['iphone_json'].combine_first(merged_df['iphone_yml'])
-    merged_df['desktop'] = merged_df['desktop_json'].combine_first(merged_df['desktop_yml'])
-
-    # Drop redundant columns
-    merged_df.drop(columns=[
-        'email_json', 'email_yml',
-        'phone_json', 'phone_yml',
-        'city_json', 'city_yml',
-        'country_json', 'country_yml',
-        'firstname_json', 'firstname_yml',
-        'surname_json', 'surname_yml',
-        'android_json', 'android_yml',
-        'iphone_json', 'iphone_yml',
-        'desktop_json', 'desktop_yml'
-    ], inplace=True)
+    merged_df, conflicts_df = merge_people_sources([("json", json_df), ("yml", yml_df)])
 
     print(merged_df.head())
+    summarize_conflicts(conflicts_df)
 
-    return merged_df
+    return merged_df, conflicts_df
 
-# Save the merged data to a CSV file
-def save_merged_people(merged_df):
-    output_path = Path("datasets/processed/people_merged.csv")
-    merged_df.to_csv(output_path, index=False)
+# Save the merged data and its conflict report in the processed format
+def save_merged_people(merged_df, conflicts_df=None):
+    write_processed(merged_df, "people_merged")
+    if conflicts_df is not None:
+        write_processed(conflicts_df, "people_conflicts")
 
 # Main function to run the script
 if __name__ == "__main__":
     json_df, yml_df = load_people_files()
-    merged_people_df = merge_people_data(json_df, yml_df)
+    merged_people_df, conflicts_df = merge_people_data(json_df, yml_df)
 
-    save_merged_people(merged_people_df)
\ No newline at end of file
+    save_merged_people(merged_people_df, conflicts_df)
\ No newline at end of file
@@ -0,0 +1,350 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from pathlib import Path
+import pandas as pd
+
+from ingestion import json_loader, yaml_loader, people_merger, identity_index
+from ingestion import promotions_loader, transactions_loader, transfers_loader, processed_store
+from storage import database_loader, incremental_loader, source_fingerprints, migrator, summary_tables
+from storage import database_generation, duckdb_store
+
+# Paths
+RAW_DATA_PATH = Path("datasets/raw/")
+
+# Streaming options
+STREAM_TRANSACTIONS = os.getenv("VENMITO_STREAM_TRANSACTIONS", "0") == "1"
+TRANSACTION_BATCH_SIZE = int(os.getenv("VENMITO_TRANSACTION_BATCH_SIZE", transactions_loader.TRANSACTION_BATCH_SIZE))
+
+# Parse transfers.csv and promotions.csv in parallel chunks streamed into the database
+CHUNKED_CSV = os.getenv("VENMITO_CHUNKED_CSV", "0") == "1"
+
+# Apply only the changes in datasets/raw to the existing database on startup
+INCREMENTAL_LOAD = os.getenv("VENMITO_INCREMENTAL_LOAD", "0") == "1"
+
+# Table name -> stage producing its DataFrame
+TABLE_STAGES = {
+    "People": "people",
+    "Promotions": "promotions",
+    "Transactions": "transactions",
+    "Transfers": "transfers",
+}
+
+# Cleans people.json into the normalized people DataFrame
+def people_json_stage(inputs):
+    people_df = json_loader.load_json_people(RAW_DATA_PATH / "people.json")
+    processed_store.write_processed(people_df, "people_cleaned_json")
+    return people_df
+
+# Cleans people.yml into the normalized people DataFrame
+def people_yml_stage(inputs):
+    people_df = yaml_loader.load_yaml_people(RAW_DATA_PATH / "people.yml")
+    processed_store.write_processed(people_df, "people_cleaned_yml")
+    return people_df
+
+# Merges the JSON and YAML people into a single DataFrame
+def people_merge_stage(inputs):
+    json_df, yml_df = people_merger.standardize_people_columns(inputs["people_json"], inputs["people_yml"])
+    merged_df, conflicts_df = people_merger.merge_people_data(json_df, yml_df)
+    people_merger.save_merged_people(merged_df, conflicts_df)
+    return merged_df
+
+# Indexes the merged people by phone, email and id for the loaders, and persists the index
+def identity_stage(inputs):
+    sources = identity_index.people_source_hashes(inputs["fingerprints"])
+    return identity_index.build_identity_index(inputs["people"], sources)
+
+# Fills missing promotion contact details from the merged people
+def promotions_stage(inputs):
+    promotions_df = promotions_loader.load_promotions(RAW_DATA_PATH / "promotions.csv")
+    promotions_df = promotions_loader.clean_promotions_data(promotions_df, inputs["identity"])
+    promotions_loader.save_cleaned_promotions(promotions_df)
+    return promotions_df
+
+# Flattens transactions.xml and maps phones to customer ids
+def transactions_stage(inputs):
+    transactions_df = transactions_loader.load_transactions(RAW_DATA_PATH / "transactions.xml")
+    transactions_df = transactions_loader.map_phone_to_customer_id(transactions_df, inputs["identity"])
+    transactions_loader.save_cleaned_transactions(transactions_df)
+    return transactions_df
+
+# Streams transactions.xml in batches; they are parsed lazily by the database stage
+def transactions_streaming_stage(inputs):
+    batches = transactions_loader.iter_transaction_batches(
+        RAW_DATA_PATH / "transactions.xml", batch_size=TRANSACTION_BATCH_SIZE
+    )
+    return transactions_loader.stream_cleaned_transactions(batches, inputs["identity"])
+
+# Parses promotions.csv in parallel chunks; they are cleaned lazily as the database stage loads them
+def promotions_chunked_stage(inputs):
+    chunks = promotions_loader.iter_promotion_chunks(RAW_DATA_PATH / "promotions.csv")
+    return promotions_loader.stream_cleaned_promotions(chunks, inputs["identity"])
+
+# Validates transfer sender and recipient ids against the merged people
+def transfers_stage(inputs):
+    transfers_df = transfers_loader.load_transfers(RAW_DATA_PATH / "transfers.csv")
+    transfers_loader.check_transfers_data(transfers_df, inputs["identity"])
+    transfers_loader.save_cleaned_transfers(transfers_df)
+    return transfers_df
+
+# Parses transfers.csv in parallel chunks; they are validated lazily as the database stage loads them
+def transfers_chunked_stage(inputs):
+    chunks = transfers_loader.iter_transfer_chunks(RAW_DATA_PATH / "transfers.csv")
+    return transfers_loader.stream_validated_transfers(chunks, inputs["identity"])
+
+# Fingerprints the raw sources so the next incremental load can detect changes
+def fingerprints_stage(inputs):
+    return source_fingerprints.fingerprint_sources(raw_dir=RAW_DATA_PATH)
+
+# Rebuilds venmito.db from the in-memory DataFrames
+def database_stage(inputs):
+    built = database_loader.build_database({
+        table_name: inputs[stage_name] for table_name, stage_name in TABLE_STAGES.items()
+    })
+    # Stops the pipeline, and the fingerprints aren't saved, so the next load starts over
+    if not built:
+        raise RuntimeError(f"Could not build the database at {database_loader.DB_PATH}")
+    connection = database_loader.connect_to_database(database_loader.DB_PATH)
+    incremental_loader.enable_wal(connection)
+    source_fingerprints.save_fingerprints(connection, inputs["fingerprints"])
+    connection.close()
+    # Refresh the columnar copy when the API runs its analytics on DuckDB
+    duckdb_store.sync_duckdb(database_loader.DB_PATH)
+    return built
+
+# Reads the already-loaded people back from the database
+def people_from_database_stage(inputs):
+    connection = database_loader.connect_to_database(database_loader.DB_PATH)
+    try:
+        return pd.read_sql("SELECT * FROM People", connection)
+    finally:
+        connection.close()
+
+# Reuses the persisted identity index while the people sources are unchanged
+def incremental_identity_stage(fingerprints, inputs):
+    """
+    When the people were re-merged (they are in inputs) the index is rebuilt
+    from them. Otherwise the index saved by the last load is read back if it
+    was built from the same people sources, and only rebuilt from the People
+    table if it is missing or stale.
+    """
+    sources = identity_index.people_source_hashes(fingerprints)
+    if "people" in inputs:
+        return identity_index.build_identity_index(inputs["people"], sources)
+    identity = identity_index.load_identity_index(sources)
+    if identity is None:
+        identity = identity_index.build_identity_index(people_from_database_stage(inputs), sources)
+    return identity
+
+# Cleans only the promotions appended to promotions.csv after offset bytes
+def promotions_append_stage(offset, inputs):
+    promotions_df = promotions_loader.load_promotions(RAW_DATA_PATH / "promotions.csv", start_offset=offset)
+    promotions_df = promotions_loader.clean_promotions_data(promotions_df, inputs["identity"])
+    processed_store.append_processed(promotions_df, "promotions_cleaned")
+    return promotions_df
+
+# Validates only the transfers appended to transfers.csv after offset bytes
+def transfers_append_stage(offset, inputs):
+    transfers_df = transfers_loader.load_transfers(RAW_DATA_PATH / "transfers.csv", start_offset=offset)
+    transfers_loader.check_transfers_data(transfers_df, inputs["identity"])
+    processed_store.append_processed(transfers_df, "transfers_cleaned")
+    return transfers_df
+
+# Applies the per-table deltas to the existing database and records the new fingerprints
+def incremental_database_stage(modes, fingerprints, inputs):
+    connection = database_loader.connect_to_database(database_loader.DB_PATH)
+    if connection is None:
+        return False
+    try:
+        incremental_loader.enable_wal(connection)
+        migrator.apply_migrations(connection)
+        for table_name, mode in modes.items():
+            incremental_loader.apply_table_delta(connection, table_name, inputs[TABLE_STAGES[table_name]], mode)
+        # Only the aggregates derived from the changed tables (or not built yet) are recomputed
+        stale_summaries = summary_tables.summaries_for_tables(modes)
+        stale_summaries += [
+            name for name in summary_tables.missing_summary_tables(connection) if name not in stale_summaries
+        ]
+        summary_tables.refresh_summary_tables(connection, stale_summaries)
+        if modes:
+            database_generation.bump_generation(connection)
+        source_fingerprints.save_fingerprints(connection, fingerprints)
+    finally:
+        connection.close()
+    duckdb_store.sync_duckdb(database_loader.DB_PATH)
+    return True
+
+# Stage name -> (function, names of the stages whose output it needs)
+PIPELINE_STAGES = {
+    "fingerprints": (fingerprints_stage, []),
+    "people_json": (people_json_stage, []),
+    "people_yml": (people_yml_stage, []),
+    "people": (people_merge_stage, ["people_json", "people_yml"]),
+    "identity": (identity_stage, ["fingerprints", "people"]),
+    "promotions": (promotions_stage, ["identity"]),
+    "transactions": (transactions_stage, ["identity"]),
+    "transfers": (transfers_stage, ["identity"]),
+    "database": (database_stage, ["fingerprints", "people", "promotions", "transactions", "transfers"]),
+}
+
+# Same DAG, but transactions.xml is streamed into the database in bounded memory
+STREAMING_PIPELINE_STAGES = {
+    **PIPELINE_STAGES,
+    "transactions": (transactions_streaming_stage, ["identity"]),
+}
+
+# Stages replaced when transfers.csv and promotions.csv are parsed in parallel chunks
+CHUNKED_CSV_STAGES = {
+    "promotions": (promotions_chunked_stage, ["identity"]),
+    "transfers": (transfers_chunked_stage, ["identity"]),
+}
+
+# Stages selected by the VENMITO_STREAM_TRANSACTIONS and VENMITO_CHUNKED_CSV options
+def default_pipeline_stages():
+    stages = STREAMING_PIPELINE_STAGES if STREAM_TRANSACTIONS else PIPELINE_STAGES
+    if CHUNKED_CSV:
+        stages = {**stages, **CHUNKED_CSV_STAGES}
+    return stages
+
+# Runs a single stage and records how long it took
+def _run_stage(name, func, inputs, timings):
+    start = time.perf_counter()
+    print(f"Running stage {name}...")
+    result = func(inputs)
+    timings[name] = time.perf_counter() - start
+    print(f"Completed stage {name} in {timings[name]:.2f}s")
+    return result
+
+# Runs the ingestion stages as a DAG, passing DataFrames between them in memory
+def run_pipeline(stages=None, max_workers=4):
+    """
+    Executes every stage once all of its dependencies have finished. Stages
+    whose dependencies are satisfied at the same time (the JSON and YAML people
+    loads, then promotions/transactions/transfers) run in parallel threads.
+    Returns a {stage_name: output} mapping.
+
+    When no stages are given, STREAMING_PIPELINE_STAGES is used if the
+    VENMITO_STREAM_TRANSACTIONS environment variable is set to 1, and the
+    CSVs are parsed in chunks if VENMITO_CHUNKED_CSV is set to 1.
+    """
+    if stages is None:
+        stages = default_pipeline_stages()
+    results = {}
+    timings = {}
+    pending = dict(stages)
+    running = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Submit every stage whose dependencies have all completed
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    inputs = {dep: results[dep] for dep in deps}
+                    running[executor.submit(_run_stage, name, func, inputs, timings)] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                # Re-raises any exception from the stage and stops the pipeline
+                results[running.pop(future)] = future.result()
+
+    print(f"Pipeline completed in {time.perf_counter() - start:.2f}s")
+    for name, seconds in timings.items():
+        print(f"  {name}: {seconds:.2f}s")
+
+    return results
+
+# Builds the stages needed to bring the database in line with the changed sources
+def build_incremental_stages(fingerprints):
+    """
+    Only sources whose fingerprint changed are re-ingested. A change to either
+    people source re-merges the people and re-derives the promotions and
+    transactions that are matched against them. Rows appended to
+    promotions.csv or transfers.csv are parsed from the old end of file only.
+    While the people are unchanged, the loaders match against the persisted
+    identity index instead of re-reading the People table.
+    """
+    status = {source: fingerprint["status"] for source, fingerprint in fingerprints.items()}
+    stages = {}
+    modes = {}
+
+    people_changed = status["people.json"] != "unchanged" or status["people.yml"] != "unchanged"
+    if people_changed:
+        for name in ["people_json", "people_yml", "people"]:
+            stages[name] = PIPELINE_STAGES[name]
+        modes["People"] = "diff"
+        stages["identity"] = (partial(incremental_identity_stage, fingerprints), ["people"])
+    else:
+        stages["identity"] = (partial(incremental_identity_stage, fingerprints), [])
+
+    if people_changed or status["promotions.csv"] == "changed":
+        stages["promotions"] = PIPELINE_STAGES["promotions"]
+        modes["Promotions"] = "diff"
+    elif status["promotions.csv"] == "appended":
+        offset = fingerprints["promotions.csv"]["appended_offset"]
+        stages["promotions"] = (partial(promotions_append_stage, offset), ["identity"])
+        modes["Promotions"] = "append"
+
+    if people_changed or status["transactions.xml"] != "unchanged":
+        stages["transactions"] = PIPELINE_STAGES["transactions"]
+        modes["Transactions"] = "diff"
+
+    if status["transfers.csv"] == "changed":
+        stages["transfers"] = PIPELINE_STAGES["transfers"]
+        modes["Transfers"] = "diff"
+    elif status["transfers.csv"] == "appended":
+        offset = fingerprints["transfers.csv"]["appended_offset"]
+        stages["transfers"] = (partial(transfers_append_stage, offset), ["identity"])
+        modes["Transfers"] = "append"
+
+    stages["database"] = (
+        partial(incremental_database_stage, modes, fingerprints),
+        [TABLE_STAGES[table_name] for table_name in modes],
+    )
+    return stages
+
+# Applies only the raw source changes since the last load to the existing database
+def run_incremental_pipeline():
+    """
+    Falls back to a full rebuild when there is no database yet or a source has
+    never been fingerprinted. The database is never dropped, and each table's
+    delta commits in a single transaction, so the API stays readable throughout.
+    """
+    if not database_loader.DB_PATH.exists():
+        print(f"No database at {database_loader.DB_PATH}, running a full load.")
+        return run_pipeline()
+
+    connection = database_loader.connect_to_database(database_loader.DB_PATH)
+    if connection is None:
+        return run_pipeline()
+    fingerprints = source_fingerprints.fingerprint_sources(connection, raw_dir=RAW_DATA_PATH)
+
+    for source, fingerprint in fingerprints.items():
+        print(f"  {source}: {fingerprint['status']}")
+
+    if any(fingerprint["status"] == "new" for fingerprint in fingerprints.values()):
+        connection.close()
+        print("Some raw sources have never been loaded, running a full load.")
+        return run_pipeline()
+
+    if all(fingerprint["status"] == "unchanged" for fingerprint in fingerprints.values()):
+        # Refresh stored mtimes so touched-but-identical files skip hashing next time
+        source_fingerprints.save_fingerprints(connection, fingerprints)
+        connection.close()
+        print("Raw sources unchanged, database is up to date.")
+        return {}
+
+    connection.close()
+    return run_pipeline(build_incremental_stages(fingerprints))
+
+# Main function to run the script (from the backend directory: python -m ingestion.pipeline)
+if __name__ == "__main__":
+    if INCREMENTAL_LOAD:
+        run_incremental_pipeline()
+    else:
+        run_pipeline()
@@ -0,0 +1,226 @@
+import os
+from pathlib import Path
+import pandas as pd
+
+# Paths
+PROCESSED_DATA_PATH = Path("datasets/processed/")
+
+# Format of the processed datasets: "csv" (default), "parquet" or "arrow" (Arrow IPC, memory-mapped on read).
+# The columnar formats need pyarrow; without it they fall back to CSV.
+PROCESSED_FORMAT = os.getenv("VENMITO_PROCESSED_FORMAT", "csv").strip().lower()
+
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Explicit column types of every processed dataset. "date" columns hold
+# datetime.date values (Arrow date32). Datasets without an entry are written
+# with inferred types.
+PROCESSED_SCHEMAS = {
+    "people_merged": {
+        "id": "int64",
+        "email": "string",
+        "phone": "string",
+        "city": "category",
+        "country": "category",
+        "firstname": "string",
+        "surname": "string",
+        "android": "boolean",
+        "iphone": "boolean",
+        "desktop": "boolean",
+    },
+    "people_conflicts": {
+        "id": "int64",
+        "column": "string",
+        "source": "string",
+        "value": "string",
+    },
+    "promotions_cleaned": {
+        "id": "int64",
+        "client_email": "string",
+        "phone": "string",
+        "promotion": "category",
+        "responded": "category",
+    },
+    "transactions_cleaned": {
+        "transaction_id": "int64",
+        "phone": "string",
+        "store": "category",
+        "item_name": "category",
+        "quantity": "Int64",
+        "price_per_item": "float64",
+        "total_price": "float64",
+        "customer_id": "Int64",
+    },
+    "identity_index": {
+        "id": "Int64",
+        "email": "string",
+        "phone": "string",
+        "phone_key": "string",
+        "email_key": "string",
+    },
+    "transfers_cleaned": {
+        "sender_id": "int64",
+        "recipient_id": "int64",
+        "amount": "float64",
+        "date": "date",
+    },
+}
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Format actually used: columnar formats need pyarrow
+def resolve_format(fmt=None):
+    fmt = fmt or PROCESSED_FORMAT
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown processed format: {fmt}")
+    if fmt != "csv" and pa is None:
+        print(f"pyarrow is not installed; writing processed data as CSV instead of {fmt}")
+        return "csv"
+    return fmt
+
+# Path of a processed dataset in the given format
+def processed_path(name, fmt=None):
+    return PROCESSED_DATA_PATH / f"{name}{FORMAT_EXTENSIONS[fmt or PROCESSED_FORMAT]}"
+
+# Cast a DataFrame to its dataset schema (columns outside the schema are kept as-is)
+def apply_schema(df, name):
+    schema = PROCESSED_SCHEMAS.get(name)
+    if schema is None:
+        return df
+    dtypes = {column: dtype for column, dtype in schema.items() if column in df.columns and dtype != "date"}
+    df = df.astype(dtypes)
+    for column, dtype in schema.items():
+        if dtype == "date" and column in df.columns:
+            df[column] = pd.to_datetime(df[column]).dt.date
+    return df
+
+# Arrow schema matching a dataset's pandas schema
+def arrow_schema(name, df):
+    arrow_types = {
+        "int64": pa.int64(),
+        "Int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "boolean": pa.bool_(),
+        "date": pa.date32(),
+    }
+    schema = PROCESSED_SCHEMAS.get(name)
+    if schema is None:
+        return pa.Schema.from_pandas(df, preserve_index=False)
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([
+        (column, arrow_types[schema[column]] if column in schema else inferred.field(column).type)
+        for column in df.columns
+    ])
+
+# Convert a DataFrame to an Arrow table with the dataset's explicit schema
+def to_arrow_table(df, name):
+    df = apply_schema(df, name)
+    return pa.Table.from_pandas(df, schema=arrow_schema(name, df), preserve_index=False)
+
+# Arrow schema with the dictionary (category) columns stored as plain values
+def decoded_schema(schema):
+    """
+    An Arrow IPC file holds a single dictionary per column, while every batch
+    converted from pandas brings its own categories, so batches written one
+    by one store their values instead. They are read back as categories by
+    the dataset schema.
+    """
+    return pa.schema([
+        pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+        for field in schema
+    ])
+
+# Write a processed dataset, replacing any previous version
+def write_processed(df, name, fmt=None):
+    fmt = resolve_format(fmt)
+    path = processed_path(name, fmt)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        pq.write_table(to_arrow_table(df, name), path)
+    else:
+        with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, arrow_schema(name, apply_schema(df, name))) as writer:
+            writer.write_table(to_arrow_table(df, name))
+    return path
+
+# Write a stream of DataFrame batches to one processed dataset, yielding each batch on
+def write_processed_batches(batches, name, fmt=None):
+    """
+    Wraps an iterator of batches: every batch is written as it passes through,
+    so the whole dataset is never held in memory. The file is complete once
+    the iterator is exhausted.
+    """
+    fmt = resolve_format(fmt)
+    path = processed_path(name, fmt)
+    writer = None
+    sink = None
+    try:
+        first_batch = True
+        for batch in batches:
+            if fmt == "csv":
+                batch.to_csv(path, mode="w" if first_batch else "a", header=first_batch, index=False)
+            else:
+                table = to_arrow_table(batch, name)
+                if fmt == "arrow":
+                    table = table.cast(decoded_schema(table.schema))
+                if writer is None:
+                    if fmt == "parquet":
+                        writer = pq.ParquetWriter(path, table.schema)
+                    else:
+                        sink = pa.OSFile(str(path), "wb")
+                        writer = ipc.new_file(sink, table.schema)
+                writer.write_table(table)
+            first_batch = False
+            yield batch
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+
+# Append rows to a processed dataset (columnar files are rewritten)
+def append_processed(df, name, fmt=None):
+    fmt = resolve_format(fmt)
+    path = processed_path(name, fmt)
+    if fmt == "csv":
+        df.to_csv(path, mode="a", header=not path.exists(), index=False)
+        return path
+    if path.exists():
+        df = pd.concat([read_processed(name, fmt), apply_schema(df, name)], ignore_index=True)
+    return write_processed(df, name, fmt)
+
+# Read a processed dataset back with its schema's types
+def read_processed(name, fmt=None):
+    """
+    Reads the dataset in the given format (by default PROCESSED_FORMAT, or
+    whichever format exists on disk). Arrow IPC files are memory-mapped, so
+    reading them costs no parsing and little copying.
+    """
+    if fmt is None:
+        fmt = PROCESSED_FORMAT if processed_path(name, PROCESSED_FORMAT).exists() else None
+        if fmt is None:
+            fmt = next((candidate for candidate in FORMAT_EXTENSIONS if processed_path(name, candidate).exists()), "csv")
+    path = processed_path(name, fmt)
+
+    if fmt == "csv":
+        schema = PROCESSED_SCHEMAS.get(name, {})
+        dtypes = {column: dtype for column, dtype in schema.items() if dtype != "date"}
+        return apply_schema(pd.read_csv(path, dtype=dtypes), name)
+    if pa is None:
+        raise ImportError(f"pyarrow is required to read {path}")
+    if fmt == "parquet":
+        table = pq.read_table(path)
+    else:
+        with pa.memory_map(str(path), "r") as source:
+            table = ipc.open_file(source).read_all()
+    return apply_schema(table.to_pandas(), name)
@@ -1,12 +1,29 @@
 import pandas as pd
 from pathlib import Path
+from ingestion.csv_reader import CSV_WORKERS, iter_csv_chunks, read_csv_from_offset
+from ingestion.identity_index import IdentityIndex
+from ingestion.processed_store import read_processed, write_processed, write_processed_batches
 
-# Load the promotions data
-def load_promotions(filepath):
-    df = pd.read_csv(filepath, na_values=[""])
+# Column types of promotions.csv for the chunked reader
+PROMOTION_DTYPES = {"id": "int64", "client_email": str, "telephone": str, "promotion": str, "responded": str}
+
+# Load the promotions data (only the rows after start_offset bytes when given)
+def load_promotions(filepath, start_offset=None):
+    if start_offset:
+        df = read_csv_from_offset(filepath, start_offset, na_values=[""])
+    else:
+        df = pd.read_csv(filepath, na_values=[""])
     df.rename(columns={'telephone': 'phone'}, inplace=True)
     return df
 
+# Parse promotions.csv in line-aligned chunks on a process pool (see ingestion/csv_reader.py)
+def iter_promotion_chunks(filepath, start_offset=None, workers=CSV_WORKERS):
+    chunks = iter_csv_chunks(
+        filepath, dtype=PROMOTION_DTYPES, workers=workers, start_offset=start_offset, na_values=[""]
+    )
+    for chunk in chunks:
+        yield chunk.rename(columns={'telephone': 'phone'})
+
 # Check for missing or invalid values
 def check_missing_and_invalid_values(df):
     print("\nMissing or NaN Values by Column:")
@@ -16,10 +33,29 @@ def check_missing_and_invalid_values(df):
     print("\nUnique Values in 'responded':")
     print(df['responded'].unique())
 
+# Fill missing contact details from the people
+def fill_contact_details(promotions_df, identity):
+    """
+    Fills a missing client_email from the person with the same phone, then a
+    missing phone from the person with the same email, using the shared
+    identity index (ingestion/identity_index.py).
+    """
+    missing_email = promotions_df["client_email"].isna()
+    identity.report_unmatched("Promotions without an email", promotions_df.loc[missing_email, "phone"], "phone")
+    promotions_df["client_email"] = promotions_df["client_email"].combine_first(
+        identity.lookup(promotions_df["phone"], "phone", "email")
+    )
+
+    missing_phone = promotions_df["phone"].isna()
+    identity.report_unmatched("Promotions without a phone", promotions_df.loc[missing_phone, "client_email"], "email")
+    promotions_df["phone"] = promotions_df["phone"].combine_first(
+        identity.lookup(promotions_df["client_email"], "email", "phone")
+    )
+    return promotions_df
+
 # Clean the promotions data
-def clean_promotions_data(promotions_df, people_df):
-    promotions_df["client_email"] = promotions_df["client_email"].combine_first(promotions_df["phone"].map(people_df.set_index("phone")["email"]))
-    promotions_df["phone"] = promotions_df["phone"].combine_first(promotions_df["client_email"].map(people_df.set_index("email")["phone"]))
+def clean_promotions_data(promotions_df, identity):
+    promotions_df = fill_contact_details(promotions_df, identity)
 
     # Print cleaned DataFrame
     print("\nCleaned Promotions DataFrame Preview:")
@@ -27,22 +63,29 @@ def clean_promotions_data(promotions_df, people_df):
 
     return promotions_df
 
+# Clean streamed promotion chunks and append them to the cleaned promotions dataset
+def stream_cleaned_promotions(chunks, identity):
+    """
+    Fills the contact details of each chunk as it passes through to the
+    caller (e.g. the database loader), writing it to the cleaned dataset.
+    """
+    cleaned = (fill_contact_details(chunk, identity) for chunk in chunks)
+    yield from write_processed_batches(cleaned, "promotions_cleaned")
+
 # Save the cleaned promotions data
 def save_cleaned_promotions(promotions_df):
-    output_path = Path("datasets/processed/promotions_cleaned.csv")
-    promotions_df.to_csv(output_path, index=False)
+    write_processed(promotions_df, "promotions_cleaned")
 
 # Main function to run the script
 if __name__ == "__main__":
     filepath = Path("datasets/raw/promotions.csv")
     promotions_df = load_promotions(filepath)
     
-    people_path = Path("datasets/processed/people_merged.csv")
-    people_df = pd.read_csv(people_path)
+    identity = IdentityIndex(read_processed("people_merged"))
 
     check_missing_and_invalid_values(promotions_df)
 
-    promotions_df = clean_promotions_data(promotions_df, people_df)
+    promotions_df = clean_promotions_data(promotions_df, identity)
 
     check_missing_and_invalid_values(promotions_df)
     save_cleaned_promotions(promotions_df)
@@ -1,78 +1,136 @@
+import time
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import xml.etree.ElementTree as ET
+from ingestion.identity_index import IdentityIndex
+from ingestion.processed_store import read_processed, write_processed, write_processed_batches
+
+# Line items per batch emitted by the streaming parser
+TRANSACTION_BATCH_SIZE = 50_000
+
+# Column name -> dtype of the flattened transactions
+TRANSACTION_COLUMNS = {
+    "transaction_id": np.int64,
+    "phone": object,
+    "store": object,
+    "item_name": object,
+    "quantity": np.int64,
+    "price_per_item": np.float64,
+    "total_price": np.float64,
+}
 
 # Load transactions data
 def load_transactions(filepath):
     """
     Parses transactions.xml and flattens the data into a row-per-item structure.
     """
-    tree = ET.parse(filepath)
-    root = tree.getroot()
-    
-    rows = []
-    for transaction in root.findall("transaction"):
-        transaction_id = transaction.get("id")
-        phone = transaction.find("phone").text
-        store = transaction.find("store").text
-        
+    batches = list(iter_transaction_batches(filepath))
+    if not batches:
+        return _columns_to_dataframe({name: [] for name in TRANSACTION_COLUMNS})
+    return pd.concat(batches, ignore_index=True)
+
+# Stream transactions data in fixed-size batches
+def iter_transaction_batches(filepath, batch_size=TRANSACTION_BATCH_SIZE):
+    """
+    Incrementally parses transactions.xml with iterparse, yielding row-per-item
+    DataFrames of at most batch_size rows. Each <transaction> element is cleared
+    from the tree once flattened, so memory stays bounded by the batch size
+    rather than the file size.
+    """
+    columns = {name: [] for name in TRANSACTION_COLUMNS}
+    total_rows = 0
+    start = time.perf_counter()
+    root = None
+
+    for event, elem in ET.iterparse(filepath, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag != "transaction":
+            continue
+
+        transaction_id = int(elem.get("id"))
+        phone = elem.find("phone").text
+        store = elem.find("store").text
+
         # Process each item in the transaction
-        for item in transaction.find("items").findall("item"):
-            item_name = item.find("item").text
-            quantity = int(item.find("quantity").text)
-            price_per_item = float(item.find("price_per_item").text)
-            total_price = float(item.find("price").text)
-            
-            rows.append({
-                "transaction_id": transaction_id,
-                "phone": phone,
-                "store": store,
-                "item_name": item_name,
-                "quantity": quantity,
-                "price_per_item": price_per_item,
-                "total_price": total_price,
-            })
-
-    return pd.DataFrame(rows)
+        for item in elem.find("items").findall("item"):
+            columns["transaction_id"].append(transaction_id)
+            columns["phone"].append(phone)
+            columns["store"].append(store)
+            columns["item_name"].append(item.find("item").text)
+            columns["quantity"].append(int(item.find("quantity").text))
+            columns["price_per_item"].append(float(item.find("price_per_item").text))
+            columns["total_price"].append(float(item.find("price").text))
+
+        # Drop the parsed transaction so the tree never grows
+        elem.clear()
+        root.clear()
+
+        if len(columns["transaction_id"]) >= batch_size:
+            total_rows += len(columns["transaction_id"])
+            yield _columns_to_dataframe(columns)
+            columns = {name: [] for name in TRANSACTION_COLUMNS}
+
+    if columns["transaction_id"]:
+        total_rows += len(columns["transaction_id"])
+        yield _columns_to_dataframe(columns)
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Parsed {total_rows} transaction items in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+# Build a typed DataFrame from the column lists of one batch
+def _columns_to_dataframe(columns):
+    return pd.DataFrame({
+        name: np.array(values, dtype=dtype)
+        for (name, dtype), values in zip(TRANSACTION_COLUMNS.items(), columns.values())
+    })
 
 # Map phone numbers to customer IDs
-def map_phone_to_customer_id(transactions_df, people_df):
+def map_phone_to_customer_id(transactions_df, identity):
     """
-    Maps phone numbers from transactions to customer IDs in the people dataset.
+    Maps phone numbers from transactions to customer IDs through the shared
+    identity index (ingestion/identity_index.py), so phones written in another
+    format still match. Unmatched phones are reported and get no customer_id.
     """
-    # Create a lookup dictionary from people_df
-    phone_to_id = people_df.set_index("phone")["id"].to_dict()
-
-    # Map phone to customer_id
-    transactions_df["customer_id"] = transactions_df["phone"].map(phone_to_id)
+    identity.report_unmatched("Transactions", transactions_df["phone"], "phone")
+    transactions_df["customer_id"] = identity.lookup(transactions_df["phone"], "phone", "id")
 
     return transactions_df
 
 # Save cleaned transactions
 def save_cleaned_transactions(transactions_df):
     """
-    Saves the cleaned transactions to a CSV file.
+    Saves the cleaned transactions in the processed format (CSV, Parquet or Arrow).
     """
-    output_path = Path("datasets/processed/transactions_cleaned.csv")
-    transactions_df.to_csv(output_path, index=False)
+    output_path = write_processed(transactions_df, "transactions_cleaned")
     print(f"\nCleaned transactions data saved to: {output_path}")
 
+# Map and save transaction batches as they stream through
+def stream_cleaned_transactions(batches, identity):
+    """
+    Maps customer IDs on each streamed batch and appends it to the cleaned
+    transactions dataset, passing the batch on to the caller (e.g. the database loader).
+    """
+    mapped = (map_phone_to_customer_id(batch, identity) for batch in batches)
+    yield from write_processed_batches(mapped, "transactions_cleaned")
+
 # Main function to run the script
 if __name__ == "__main__":
     # File paths
     transactions_path = Path("datasets/raw/transactions.xml")
-    people_path = Path("datasets/processed/people_merged.csv")
 
     # Load the data
     print("Loading transactions...")
     transactions_df = load_transactions(transactions_path)
     
     print("Loading people data...")
-    people_df = pd.read_csv(people_path)
+    identity = IdentityIndex(read_processed("people_merged"))
 
     # Map phone numbers to customer IDs
     print("Mapping phone numbers to customer IDs...")
-    transactions_df = map_phone_to_customer_id(transactions_df, people_df)
+    transactions_df = map_phone_to_customer_id(transactions_df, identity)
 
     # Preview the cleaned transactions
     print("\nCleaned Transactions DataFrame Preview:")
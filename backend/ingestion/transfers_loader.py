@@ -1,13 +1,34 @@
 import pandas as pd
 from pathlib import Path
+from ingestion.csv_reader import CSV_WORKERS, iter_csv_chunks, read_csv_from_offset
+from ingestion.identity_index import IdentityIndex
+from ingestion.processed_store import read_processed, write_processed, write_processed_batches
 
-# Load the transfers data
-def load_transfers(filepath):
+# Column types of transfers.csv for the chunked reader; dates are parsed once per chunk
+TRANSFER_DTYPES = {"sender_id": "int64", "recipient_id": "int64", "amount": "float64", "date": str}
+TRANSFER_DATE_COLUMNS = ["date"]
+
+# Load the transfers data (only the rows after start_offset bytes when given)
+def load_transfers(filepath, start_offset=None):
+    if start_offset:
+        return read_csv_from_offset(filepath, start_offset)
     df = pd.read_csv(filepath)
     return df
 
+# Parse transfers.csv in line-aligned chunks on a process pool (see ingestion/csv_reader.py)
+def iter_transfer_chunks(filepath, start_offset=None, workers=CSV_WORKERS):
+    return iter_csv_chunks(
+        filepath, dtype=TRANSFER_DTYPES, date_columns=TRANSFER_DATE_COLUMNS, workers=workers, start_offset=start_offset
+    )
+
+# sender_id / recipient_id values that belong to no person
+def find_unknown_ids(transfers_df, identity):
+    sender_valid = identity.contains_ids(transfers_df['sender_id'])
+    recipient_valid = identity.contains_ids(transfers_df['recipient_id'])
+    return pd.concat([transfers_df['sender_id'][~sender_valid], transfers_df['recipient_id'][~recipient_valid]]).unique()
+
 # Check the transfers data
-def check_transfers_data(transfers_df, people_df):
+def check_transfers_data(transfers_df, identity):
     # Check for missing values
     print("\nMissing or NaN Values by Column:")
     print(transfers_df.isnull().sum())
@@ -16,32 +37,50 @@ def check_transfers_data(transfers_df, people_df):
     print("\nData Types:")
     print(transfers_df.dtypes)
 
-    # Confirm all sender_id and recipient_id exist in people DataFrame
-    sender_valid = transfers_df['sender_id'].isin(people_df['id']).all()
-    recipient_valid = transfers_df['recipient_id'].isin(people_df['id']).all()
-
-    if sender_valid and recipient_valid:
+    # Confirm all sender_id and recipient_id exist in the people (shared identity index)
+    unknown = find_unknown_ids(transfers_df, identity)
+    if len(unknown) == 0:
         print("\nAll sender_id and recipient_id values are valid!")
     else:
-        print("\nSome sender_id or recipient_id values are invalid!")
+        print(f"\nSome sender_id or recipient_id values are invalid! {len(unknown)} unknown ids (e.g. {unknown[:5].tolist()})")
+
+# Validate streamed transfer chunks against the people as they pass through
+def validate_transfer_chunks(chunks, identity):
+    """
+    Checks each chunk's sender and recipient ids against the shared identity
+    index and passes the chunk on (e.g. to the database writer), so the
+    whole file is never held in memory. Unknown ids are reported per chunk.
+    """
+    rows = 0
+    unknown_total = 0
+    for chunk in chunks:
+        unknown = find_unknown_ids(chunk, identity)
+        if len(unknown):
+            print(f"Transfers {rows}-{rows + len(chunk)}: {len(unknown)} unknown sender/recipient ids (e.g. {unknown[:5].tolist()})")
+        rows += len(chunk)
+        unknown_total += len(unknown)
+        yield chunk
+    print(f"Validated {rows} transfers, {unknown_total} unknown sender/recipient ids")
+
+# Validate streamed transfer chunks and append them to the cleaned transfers dataset
+def stream_validated_transfers(chunks, identity):
+    yield from write_processed_batches(validate_transfer_chunks(chunks, identity), "transfers_cleaned")
 
 # Save the cleaned transfers data
 def save_cleaned_transfers(transfers_df):
-    output_path = Path("datasets/processed/transfers_cleaned.csv")
-    transfers_df.to_csv(output_path, index=False)
+    write_processed(transfers_df, "transfers_cleaned")
 
 # Main function to run the script
 if __name__ == "__main__":
     transfers_path = Path("datasets/raw/transfers.csv")
-    people_path = Path("datasets/processed/people_merged.csv")
 
     # Load the data
     transfers_df = load_transfers(transfers_path)
-    people_df = pd.read_csv(people_path)
+    identity = IdentityIndex(read_processed("people_merged"))
 
     # Check the transfers data
     print("\nRaw Transfers DataFrame Preview:")
     print(transfers_df.head())
 
-    check_transfers_data(transfers_df, people_df)
+    check_transfers_data(transfers_df, identity)
     save_cleaned_transfers(transfers_df)
\ No newline at end of file
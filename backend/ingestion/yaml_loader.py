@@ -1,6 +1,15 @@
+import time
 import yaml
+from itertools import islice
 from pathlib import Path
 import pandas as pd
+from ingestion.processed_store import write_processed
+
+# People per batch emitted by the streaming parser
+PEOPLE_BATCH_SIZE = 50_000
+
+# libyaml's C parser when PyYAML was built with it, otherwise the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 # Load the YAML file into a list of dictionaries
 def load_yaml_file(filepath):
@@ -10,6 +19,86 @@ def load_yaml_file(filepath):
     # Return the list of dictionaries directly
     return data  
 
+# Build the node of the next value from the parser's events
+def _compose_node(loader, anchors):
+    """
+    Does what PyYAML's Composer does for one value; the C parser only
+    exposes the events (or whole documents), so the nodes of one list item
+    are built here and constructed with the loader's safe constructors.
+    """
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        return anchors[event.anchor]
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose_node(loader, anchors))
+        node.end_mark = loader.get_event().end_mark
+    else:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose_node(loader, anchors)
+            node.value.append((key, _compose_node(loader, anchors)))
+        node.end_mark = loader.get_event().end_mark
+
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+# Stream the items of the top-level YAML list one at a time
+def iter_yaml_records(filepath):
+    """
+    Walks the parser's events and constructs each list item as soon as its
+    events have been read, so only one person is held in memory at a time.
+    """
+    with open(filepath, "rb") as file:
+        loader = YAML_LOADER(file)
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(yaml.StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(yaml.SequenceStartEvent):
+                raise ValueError(f"{filepath}: expected a YAML list")
+            loader.get_event()
+
+            anchors = {}
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield loader.construct_document(_compose_node(loader, anchors))
+        finally:
+            loader.dispose()
+
+# Stream people.yml in DataFrames of at most batch_size people
+def iter_yaml_batches(filepath, batch_size=PEOPLE_BATCH_SIZE):
+    records = iter_yaml_records(filepath)
+    while batch := list(islice(records, batch_size)):
+        yield pd.DataFrame(batch)
+
+# Load people.yml batch by batch, cleaning each batch as it is parsed
+def load_yaml_people(filepath, batch_size=PEOPLE_BATCH_SIZE):
+    start = time.perf_counter()
+    batches = [yaml_to_dataframe(batch) for batch in iter_yaml_batches(filepath, batch_size)]
+    if not batches:
+        return pd.DataFrame()
+    people_df = pd.concat(batches, ignore_index=True)
+
+    elapsed = time.perf_counter() - start
+    rate = len(people_df) / elapsed if elapsed > 0 else float("inf")
+    print(f"Parsed {len(people_df)} people from {filepath} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return people_df
+
 # Convert the list of dictionaries to a DataFrame
 def yaml_to_dataframe(data):
     # Convert the list of dictionaries to a DataFrame
@@ -36,10 +125,8 @@ if __name__ == "__main__":
     filepath = Path("datasets/raw/people.yml")
 
     # Load and process the YAML data
-    people_data = load_yaml_file(filepath)
-    people_df = yaml_to_dataframe(people_data)
+    people_df = load_yaml_people(filepath)
 
-    # Save the processed data to a CSV file
-    output_path = Path("datasets/processed/people_cleaned_yml.csv")
-    people_df.to_csv(output_path, index=False)
+    # Save the processed data
+    output_path = write_processed(people_df, "people_cleaned_yml")
     print(f"\nCleaned data saved to: {output_path}")
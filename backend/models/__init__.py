@@ -0,0 +1,10 @@
+from models.base import Base
+from models.people import People
+from models.promotions import Promotions
+from models.transactions import Transactions
+from models.transfers import Transfers
+from models import summaries
+
+# Tables loaded from the processed datasets, in load order. The summary
+# tables share the metadata but are created by storage/summary_tables.py.
+SOURCE_TABLES = [People.__table__, Promotions.__table__, Transactions.__table__, Transfers.__table__]
@@ -0,0 +1,5 @@
+from sqlalchemy.orm import declarative_base
+
+# Declarative base shared by every model, so foreign keys and relationships
+# resolve across modules and one metadata holds the whole schema
+Base = declarative_base()
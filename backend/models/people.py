@@ -1,18 +1,22 @@
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, String, Boolean
-
-Base = declarative_base()
+from sqlalchemy.orm import relationship
+from models.base import Base
 
 class People(Base):
-    __tablename__ = 'people'
+    __tablename__ = 'People'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    email = Column(String(255))
+    phone = Column(String(20))
+    firstName = Column(String(50))
+    surname = Column(String(50))
+    city = Column(String(50))
+    country = Column(String(50))
+    Android = Column(Boolean)
+    iPhone = Column(Boolean)
+    Desktop = Column(Boolean)
 
-    id = Column(Integer, primary_key=True)
-    email = Column(String, nullable=False)
-    phone = Column(String, nullable=True)
-    firstName = Column(String, nullable=False)
-    surname = Column(String, nullable=False)
-    city = Column(String, nullable=True)
-    country = Column(String, nullable=True)
-    Android = Column(Boolean, nullable=True)
-    iPhone = Column(Boolean, nullable=True)
-    Desktop = Column(Boolean, nullable=True)
+    promotions = relationship('Promotions', back_populates='client')
+    transactions = relationship('Transactions', back_populates='customer')
+    sent_transfers = relationship('Transfers', foreign_keys='Transfers.sender_id', back_populates='sender')
+    received_transfers = relationship('Transfers', foreign_keys='Transfers.recipient_id', back_populates='recipient')
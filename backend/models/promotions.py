@@ -1,13 +1,15 @@
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, String, ForeignKey
-
-Base = declarative_base()
+from sqlalchemy.orm import relationship
+from models.base import Base
 
 class Promotions(Base):
-    __tablename__ = 'promotions'
+    __tablename__ = 'Promotions'
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    client_email = Column(String, ForeignKey('people.email'), nullable=False)
-    phone = Column(String, nullable=True)
-    promotion = Column(String, nullable=False)
-    responded = Column(String, nullable=True)  # Will store 'yes' or 'no'
\ No newline at end of file
+    client_email = Column(String(255), ForeignKey('People.email'))
+    phone = Column(String(20))
+    promotion = Column(String(50))
+    responded = Column(String(10))  # Will store 'Yes' or 'No'
+
+    client = relationship('People', back_populates='promotions')
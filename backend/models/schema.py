@@ -0,0 +1,20 @@
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable
+from models import SOURCE_TABLES
+
+# CREATE TABLE statements for the source tables, generated from the models
+def schema_statements(dialect=None):
+    """
+    Secondary indexes are not part of the models; they stay in
+    storage/migrations/ and are created after the data is loaded.
+    """
+    dialect = dialect or sqlite.dialect()
+    return [str(CreateTable(table).compile(dialect=dialect)).strip() for table in SOURCE_TABLES]
+
+# The whole schema as one SQL script
+def schema_sql(dialect=None):
+    return ";\n\n".join(schema_statements(dialect)) + ";\n"
+
+# Print the schema (from the backend directory: python -m models.schema)
+if __name__ == "__main__":
+    print(schema_sql())
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Float
+from models.base import Base
+
+# Summary tables are rebuilt by storage/summary_tables.py after every load.
+# The grouping column is mapped as the primary key; these are only queried column-wise.
+
+class CountryDeviceCounts(Base):
+    __tablename__ = 'CountryDeviceCounts'
+
+    country = Column(String, primary_key=True)
+    people_count = Column(Integer)
+    android_count = Column(Integer)
+    iphone_count = Column(Integer)
+    desktop_count = Column(Integer)
+
+class PromotionResponseByCountry(Base):
+    __tablename__ = 'PromotionResponseByCountry'
+
+    country = Column(String, primary_key=True)
+    total_promotions = Column(Integer)
+    accepted_promotions = Column(Integer)
+
+class PromotionResponseByItem(Base):
+    __tablename__ = 'PromotionResponseByItem'
+
+    promotion = Column(String, primary_key=True)
+    total_responses = Column(Integer)
+    responded_yes = Column(Integer)
+
+class MonthlyTransferTotals(Base):
+    __tablename__ = 'MonthlyTransferTotals'
+
+    month = Column(String, primary_key=True)
+    total_sent = Column(Float)
+    transfer_count = Column(Integer)
+
+class StoreRevenue(Base):
+    __tablename__ = 'StoreRevenue'
+
+    store = Column(String, primary_key=True)
+    total_money_made = Column(Float)
+    line_items = Column(Integer)
@@ -1,17 +1,19 @@
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, String, Float, ForeignKey
-
-Base = declarative_base()
+from sqlalchemy.orm import relationship
+from models.base import Base
 
 class Transactions(Base):
-    __tablename__ = 'transactions'
+    __tablename__ = 'Transactions'
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     transaction_id = Column(Integer, nullable=False)
-    customer_id = Column(Integer, ForeignKey('people.id'))
-    phone = Column(String, nullable=True)
-    store = Column(String, nullable=False)
-    item_name = Column(String, nullable=False)
-    quantity = Column(Integer, nullable=False)
-    price_per_item = Column(Float, nullable=False)
-    total_price = Column(Float, nullable=False)
\ No newline at end of file
+    customer_id = Column(Integer, ForeignKey('People.id'))
+    phone = Column(String(20))
+    store = Column(String(100))
+    item_name = Column(String(50))
+    quantity = Column(Integer)
+    price_per_item = Column(Float)
+    total_price = Column(Float)
+
+    customer = relationship('People', back_populates='transactions')
@@ -1,13 +1,16 @@
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, Float, Date, ForeignKey
-
-Base = declarative_base()
+from sqlalchemy.orm import relationship
+from models.base import Base
 
 class Transfers(Base):
-    __tablename__ = 'transfers'
+    __tablename__ = 'Transfers'
+    __table_args__ = {'sqlite_autoincrement': True}
 
     transfer_id = Column(Integer, primary_key=True, autoincrement=True)
-    sender_id = Column(Integer, ForeignKey('people.id'))
-    recipient_id = Column(Integer, ForeignKey('people.id'))
+    sender_id = Column(Integer, ForeignKey('People.id'))
+    recipient_id = Column(Integer, ForeignKey('People.id'))
     amount = Column(Float)
-    date = Column(Date)
\ No newline at end of file
+    date = Column(Date)
+
+    sender = relationship('People', foreign_keys=[sender_id], back_populates='sent_transfers')
+    recipient = relationship('People', foreign_keys=[recipient_id], back_populates='received_transfers')
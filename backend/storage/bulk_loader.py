@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Rows converted to tuples and handed to executemany at a time
+BULK_CHUNK_SIZE = int(os.getenv("VENMITO_BULK_CHUNK_SIZE", "50000"))
+
+# Processes loading tables at the same time, each into its own database file (1 loads them one by one)
+BULK_LOAD_WORKERS = int(os.getenv("VENMITO_BULK_LOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Turn off the rollback journal and fsyncs while a database is built from scratch
+def use_build_pragmas(connection):
+    """
+    A half-built database is deleted and rebuilt anyway, so crash safety buys
+    nothing during the initial load. Both settings only last as long as the
+    connection.
+    """
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+
+# Convert a column to a list of plain Python values, with None for missing values
+def _column_values(series):
+    kind = series.dtype.kind
+    if not isinstance(series.dtype, np.dtype):
+        # Nullable extension dtypes (Int64, boolean, string, ...) hold pd.NA, which sqlite3 can't bind
+        return series.astype(object).where(series.notna(), None).tolist()
+    if kind in "biu":
+        # NumPy bools and integers can't hold missing values; tolist() gives Python ints/bools
+        return series.tolist()
+    if kind == "f" and not series.isna().any():
+        return series.tolist()
+    if kind == "M":
+        series = pd.Series(series.dt.to_pydatetime(), index=series.index, dtype=object)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+# Yield a DataFrame as lists of row tuples, chunk_size rows at a time
+def typed_row_chunks(df, chunk_size=BULK_CHUNK_SIZE):
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        yield list(zip(*(_column_values(chunk[column]) for column in chunk.columns)))
+
+# Insert a DataFrame's rows with executemany (the caller owns the transaction)
+def insert_rows(connection, table_name, df, chunk_size=BULK_CHUNK_SIZE):
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    statement = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+    for rows in typed_row_chunks(df, chunk_size):
+        connection.executemany(statement, rows)
+    return len(df)
+
+# Load a DataFrame, or an iterable of DataFrame batches, into a table in one transaction
+def bulk_load_table(connection, table_name, data, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Returns (rows, seconds). Streamed batches are inserted as they arrive,
+    so only one batch is held in memory, but they are still committed once.
+    """
+    batches = [data] if isinstance(data, pd.DataFrame) else data
+    total_rows = 0
+    start = time.perf_counter()
+    with connection:
+        for batch in batches:
+            total_rows += insert_rows(connection, table_name, batch, chunk_size)
+    return total_rows, time.perf_counter() - start
+
+# Print a table's load throughput
+def report_load(table_name, rows, elapsed, source="DataFrame"):
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Data from {source} loaded into {table_name} table successfully "
+          f"({rows} rows in {elapsed:.2f}s, {rate:,.0f} rows/s).")
+
+# Path of the scratch database a table is loaded into before the merge
+def part_path(db_path, table_name):
+    return db_path.with_name(f"{db_path.stem}.{table_name}.part")
+
+# Load one table into its own scratch database, created with the main table's definition
+def _load_part(path, table_sql, table_name, data, chunk_size):
+    if path.exists():
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        use_build_pragmas(connection)
+        connection.execute(table_sql)
+        return bulk_load_table(connection, table_name, data, chunk_size)
+    finally:
+        connection.close()
+
+# Copy a loaded scratch table into the main database and delete the scratch file
+def _merge_part(connection, path, table_name):
+    connection.execute("ATTACH DATABASE ? AS part", (str(path),))
+    try:
+        with connection:
+            connection.execute(f"INSERT INTO main.{table_name} SELECT * FROM part.{table_name}")
+    finally:
+        connection.execute("DETACH DATABASE part")
+        os.remove(path)
+
+# Load every table in parallel into separate databases, then merge them into the main one
+def load_tables(connection, db_path, table_data, workers=BULK_LOAD_WORKERS, chunk_size=BULK_CHUNK_SIZE):
+    """
+    table_data maps table names to a DataFrame or an iterable of DataFrame
+    batches; the tables must already exist in the main database. With more
+    than one worker each DataFrame is loaded by a worker process into a
+    scratch file next to db_path (the row conversion and executemany are
+    CPU-bound Python, so threads would just take turns on the GIL), and the
+    scratch tables are then copied over with INSERT ... SELECT, which SQLite
+    runs as a straight row transfer. Streamed batches can't be sent to a
+    process and are loaded straight into the main database meanwhile.
+    Returns {table_name: (rows, seconds)}. A table that fails to load is
+    reported and the others are still loaded and merged, then a RuntimeError
+    names every failed table.
+    """
+    stats = {}
+    failed = []
+    frames = {
+        table_name: data for table_name, data in table_data.items() if isinstance(data, pd.DataFrame)
+    }
+    if workers <= 1 or len(frames) <= 1:
+        frames = {}
+
+    table_sql = dict(connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table'"
+    ).fetchall())
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(frames)))) as executor:
+        futures = {
+            table_name: executor.submit(
+                _load_part, part_path(db_path, table_name), table_sql[table_name], table_name, data, chunk_size
+            )
+            for table_name, data in frames.items()
+        }
+
+        for table_name, data in table_data.items():
+            if table_name in futures:
+                continue
+            try:
+                stats[table_name] = bulk_load_table(connection, table_name, data, chunk_size)
+                report_load(table_name, *stats[table_name])
+            except Exception as e:
+                print(f"Error loading data into {table_name}: {e}")
+                failed.append(table_name)
+
+        # Merge in the given order as the parts finish
+        for table_name, future in futures.items():
+            path = part_path(db_path, table_name)
+            try:
+                rows, elapsed = future.result()
+            except Exception as e:
+                print(f"Error loading data into {table_name}: {e}")
+                if path.exists():
+                    os.remove(path)
+                failed.append(table_name)
+                continue
+            merge_start = time.perf_counter()
+            try:
+                _merge_part(connection, path, table_name)
+            except Exception as e:
+                print(f"Error merging {table_name} into the database: {e}")
+                failed.append(table_name)
+                continue
+            stats[table_name] = (rows, elapsed)
+            report_load(table_name, rows, elapsed)
+            print(f"Merged {table_name} into the database in {time.perf_counter() - merge_start:.2f}s.")
+
+    if failed:
+        raise RuntimeError(f"Could not load {', '.join(failed)}")
+    return stats
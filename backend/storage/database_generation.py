@@ -0,0 +1,45 @@
+import sqlite3
+from pathlib import Path
+
+# Single-row table counting how many times the database contents were (re)loaded
+GENERATION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS DatabaseGeneration (
+    generation INTEGER NOT NULL
+)
+"""
+
+# Read the current generation (0 if the database was never stamped)
+def read_generation(connection):
+    connection.execute(GENERATION_TABLE_SQL)
+    row = connection.execute("SELECT generation FROM DatabaseGeneration").fetchone()
+    return row[0] if row else 0
+
+# Read the generation of a database file before it is deleted and rebuilt
+def read_generation_from_file(db_path):
+    if not Path(db_path).exists():
+        return 0
+    try:
+        connection = sqlite3.connect(db_path)
+        try:
+            return read_generation(connection)
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return 0
+
+# Bump the generation after a load so API response caches drop their entries
+def bump_generation(connection, previous=None):
+    """
+    Sets the generation to previous + 1 (previous defaults to the value stored
+    in the database). A full rebuild passes the generation read before the old
+    file was deleted, so the counter never goes backwards.
+    """
+    if previous is None:
+        previous = read_generation(connection)
+    generation = previous + 1
+    with connection:
+        connection.execute(GENERATION_TABLE_SQL)
+        connection.execute("DELETE FROM DatabaseGeneration")
+        connection.execute("INSERT INTO DatabaseGeneration (generation) VALUES (?)", (generation,))
+    print(f"Database generation is now {generation}")
+    return generation
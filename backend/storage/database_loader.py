@@ -2,10 +2,23 @@ import sqlite3
 import pandas as pd
 from pathlib import Path
 import os
+from storage.migrator import apply_migrations
+from storage.bulk_loader import bulk_load_table, load_tables, report_load, use_build_pragmas
+from storage.summary_tables import refresh_summary_tables
+from storage.database_generation import read_generation_from_file, bump_generation
+from ingestion.processed_store import read_processed
+from models.schema import schema_sql
 
 # Paths
 DB_PATH = Path("storage/venmito.db")
-CLEANED_DATA_PATH = Path("datasets/processed/")
+
+# Table name -> processed dataset it is loaded from
+TABLE_DATASETS = {
+    "People": "people_merged",
+    "Promotions": "promotions_cleaned",
+    "Transactions": "transactions_cleaned",
+    "Transfers": "transfers_cleaned",
+}
 
 # Deletes existing database if it exists
 def delete_existing_database(db_path):
@@ -29,13 +42,11 @@ def connect_to_database(db_path):
         print(f"Error connecting to database: {e}")
         return None
 
-# Create tables in the database
-def create_tables(connection, schema_path):
+# Create tables in the database from the schema generated by the models
+def create_tables(connection):
     try:
-        with open(schema_path, "r") as file:
-            schema = file.read()
         cursor = connection.cursor()
-        cursor.executescript(schema)
+        cursor.executescript(schema_sql())
         connection.commit()
         print("Database schema created successfully.")
     except Exception as e:
@@ -45,37 +56,74 @@ def create_tables(connection, schema_path):
 def load_data_to_table(connection, table_name, csv_file):
     try:
         df = pd.read_csv(csv_file)
-        df.to_sql(table_name, connection, if_exists="append", index=False)
-        print(f"Data from {csv_file} loaded into {table_name} table successfully.")
     except Exception as e:
         print(f"Error loading data into {table_name}: {e}")
+        return
+    load_dataframe_to_table(connection, table_name, df, source=csv_file)
 
-# Main function to setup the database and load data
-if __name__ == "__main__":
-    # Delete existing database first
-    delete_existing_database(DB_PATH)
+# Load an in-memory DataFrame into a table in a single transaction (errors are re-raised)
+def load_dataframe_to_table(connection, table_name, df, source="DataFrame"):
+    try:
+        report_load(table_name, *bulk_load_table(connection, table_name, df), source=source)
+    except Exception as e:
+        print(f"Error loading data into {table_name}: {e}")
+        raise
+
+# Load a stream of DataFrame batches into a table in a single transaction (errors are re-raised)
+def load_batches_to_table(connection, table_name, batches, source="batches"):
+    try:
+        report_load(table_name, *bulk_load_table(connection, table_name, batches), source=source)
+    except Exception as e:
+        print(f"Error loading data into {table_name}: {e}")
+        raise
+
+# Rebuild the database from scratch and load every table
+def build_database(table_dataframes, db_path=DB_PATH):
+    """
+    Deletes the existing database, recreates the schema and bulk loads the
+    given {table_name: DataFrame} mapping (in parallel, see
+    storage/bulk_loader.py) with journaling and fsyncs off, then applies the
+    schema migrations (secondary indexes) on the loaded tables, builds the
+    summary tables and bumps the database generation. A table may also be
+    given as an iterable of DataFrame batches, which is streamed in without
+    being materialized. Returns False if the database could not be opened or
+    a table failed to load.
+    """
+    previous_generation = read_generation_from_file(db_path)
+    delete_existing_database(db_path)
 
-    # Connect to (or create) the database
-    connection = connect_to_database(DB_PATH)
+    connection = connect_to_database(db_path)
     if connection is None:
-        exit()
+        return False
+
+    use_build_pragmas(connection)
+    create_tables(connection)
 
-    # Create tables
-    schema_path = Path("storage/database_schema.sql")
-    create_tables(connection, schema_path)
+    try:
+        load_tables(connection, db_path, table_dataframes)
+    except Exception as e:
+        print(f"Error building the database: {e}")
+        connection.close()
+        return False
 
-    # Define table and CSV mappings
-    table_csv_mapping = {
-        "People": CLEANED_DATA_PATH / "people_merged.csv",
-        "Promotions": CLEANED_DATA_PATH / "promotions_cleaned.csv",
-        "Transactions": CLEANED_DATA_PATH / "transactions_cleaned.csv",
-        "Transfers": CLEANED_DATA_PATH / "transfers_cleaned.csv",
-    }
+    # Indexes are created by the migrations after the data is in
+    apply_migrations(connection)
 
-    # Load data into tables
-    for table_name, csv_file in table_csv_mapping.items():
-        load_data_to_table(connection, table_name, csv_file)
+    # Precompute the aggregates the /stats endpoints read
+    refresh_summary_tables(connection)
+
+    # Invalidate cached API responses built from the previous contents
+    bump_generation(connection, previous_generation)
 
-    # Close the connection
     connection.close()
-    print("Database setup and data loading completed!")
\ No newline at end of file
+    print("Database setup and data loading completed!")
+    return True
+
+# Main function to setup the database and load data
+if __name__ == "__main__":
+    # Load the processed datasets (CSV, Parquet or Arrow, with their explicit types) and rebuild the database from them
+    if not build_database({
+        table_name: read_processed(dataset)
+        for table_name, dataset in TABLE_DATASETS.items()
+    }):
+        exit()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import time
+from pathlib import Path
+import pandas as pd
+from storage.database_generation import read_generation_from_file
+
+# Storage backend the API runs its analytics (/stats and insight) queries on:
+# "sqlite" (default) or "duckdb", a columnar copy of venmito.db
+STORAGE_BACKEND = os.getenv("VENMITO_STORAGE_BACKEND", "sqlite").strip().lower()
+
+# Paths
+SQLITE_PATH = Path("storage/venmito.db")
+DUCKDB_PATH = Path("storage/venmito.duckdb")
+
+# Rows copied from SQLite to DuckDB at a time
+EXPORT_CHUNK_SIZE = 200_000
+
+# duckdb is optional; it is only needed with VENMITO_STORAGE_BACKEND=duckdb
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Map a SQLite declared column type to a DuckDB type (SQLite affinity rules, plus BOOLEAN and DATE)
+def duckdb_type(declared_type):
+    declared = (declared_type or "").upper()
+    if "BOOL" in declared:
+        return "BOOLEAN"
+    if declared == "DATE":
+        return "DATE"
+    if "INT" in declared:
+        return "BIGINT"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared or not declared:
+        return "VARCHAR"
+    # REAL, FLOAT, DOUBLE and NUMERIC affinity
+    return "DOUBLE"
+
+# Read the generation a DuckDB copy was exported from (0 if missing or unreadable)
+def read_duckdb_generation(duckdb_path=DUCKDB_PATH):
+    if duckdb is None or not Path(duckdb_path).exists():
+        return 0
+    try:
+        connection = duckdb.connect(str(duckdb_path), read_only=True)
+        try:
+            row = connection.execute("SELECT generation FROM DatabaseGeneration").fetchone()
+            return row[0] if row else 0
+        finally:
+            connection.close()
+    except duckdb.Error:
+        return 0
+
+# Copy every table of the SQLite database into a fresh DuckDB file
+def export_to_duckdb(sqlite_path=SQLITE_PATH, duckdb_path=DUCKDB_PATH, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Regular tables are recreated with DuckDB types derived from the SQLite column
+    declarations (so booleans, dates and numbers keep their types) and
+    copied in chunks through pandas. The copy is written to a temporary file
+    and moved into place, so readers never see a half-written database.
+    """
+    if duckdb is None:
+        raise ImportError("duckdb is required for VENMITO_STORAGE_BACKEND=duckdb")
+
+    start = time.perf_counter()
+    temp_path = Path(f"{duckdb_path}.tmp")
+    if temp_path.exists():
+        os.remove(temp_path)
+
+    source = sqlite3.connect(sqlite_path)
+    target = duckdb.connect(str(temp_path))
+    try:
+        tables = [
+            name for (name,) in source.execute(
+                # Virtual (FTS5 search) tables and their shadow tables are SQLite-only
+                "SELECT name FROM pragma_table_list WHERE schema = 'main' AND type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        for table_name in tables:
+            columns = [(row[1], duckdb_type(row[2])) for row in source.execute(f'PRAGMA table_info("{table_name}")')]
+            target.execute(
+                f'CREATE TABLE "{table_name}" (' + ", ".join(f'"{name}" {dtype}' for name, dtype in columns) + ")"
+            )
+            for chunk in pd.read_sql(f'SELECT * FROM "{table_name}"', source, chunksize=chunk_size):
+                target.register("export_chunk", chunk)
+                target.execute(f'INSERT INTO "{table_name}" SELECT * FROM export_chunk')
+                target.unregister("export_chunk")
+    finally:
+        target.close()
+        source.close()
+
+    os.replace(temp_path, duckdb_path)
+    print(f"Exported {len(tables)} tables to {duckdb_path} in {time.perf_counter() - start:.2f}s")
+
+# Re-export the DuckDB copy if the configured backend uses it and it is behind venmito.db
+def sync_duckdb(sqlite_path=SQLITE_PATH, duckdb_path=DUCKDB_PATH, backend=STORAGE_BACKEND):
+    if backend != "duckdb":
+        return False
+    if Path(duckdb_path).exists() and read_duckdb_generation(duckdb_path) == read_generation_from_file(sqlite_path):
+        return False
+    export_to_duckdb(sqlite_path, duckdb_path)
+    return True
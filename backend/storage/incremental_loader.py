@@ -0,0 +1,120 @@
+import time
+import pandas as pd
+
+# Natural key of the tables whose rows carry their own id
+TABLE_KEYS = {
+    "People": "id",
+    "Promotions": "id",
+}
+
+# Surrogate (autoincrement) key of the tables whose rows have no natural id
+SURROGATE_KEYS = {
+    "Transactions": "id",
+    "Transfers": "transfer_id",
+}
+
+# Enable WAL so API readers are never blocked while a delta is applied
+def enable_wal(connection):
+    connection.execute("PRAGMA journal_mode=WAL")
+
+# Get the column names of a table in the database
+def get_table_columns(connection, table_name):
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")]
+
+# Load a DataFrame into a temporary table with the same column affinities as table_name
+def _create_staging_table(connection, table_name, df):
+    staging = f"staging_{table_name}"
+    connection.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+    connection.execute(f"CREATE TEMP TABLE {staging} AS SELECT * FROM main.{table_name} WHERE 0")
+    columns = ", ".join(df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    with connection:
+        connection.executemany(f"INSERT INTO temp.{staging} ({columns}) VALUES ({placeholders})", rows)
+    return staging
+
+# Upsert keyed rows that are new or differ from the stored ones
+def _apply_keyed_delta(connection, table_name, staging, key, delete_missing):
+    columns = [column for column in get_table_columns(connection, table_name) if column != key]
+    column_list = ", ".join(columns)
+    differs = " OR ".join(f"s.{column} IS NOT {table_name}.{column}" for column in columns)
+    connection.execute(f"CREATE INDEX temp.{staging}_key ON {staging} ({key})")
+
+    with connection:
+        inserted = connection.execute(
+            f"INSERT INTO {table_name} ({key}, {column_list}) "
+            f"SELECT {key}, {column_list} FROM temp.{staging} "
+            f"WHERE {key} NOT IN (SELECT {key} FROM {table_name})"
+        ).rowcount
+        updated = connection.execute(
+            f"UPDATE {table_name} SET ({column_list}) = "
+            f"(SELECT {column_list} FROM temp.{staging} s WHERE s.{key} = {table_name}.{key}) "
+            f"WHERE EXISTS (SELECT 1 FROM temp.{staging} s WHERE s.{key} = {table_name}.{key} AND ({differs}))"
+        ).rowcount
+        deleted = 0
+        if delete_missing:
+            deleted = connection.execute(
+                f"DELETE FROM {table_name} WHERE {key} NOT IN (SELECT {key} FROM temp.{staging})"
+            ).rowcount
+    return inserted, updated, deleted
+
+# Diff rows without a natural key as multisets and apply only the difference
+def _apply_unkeyed_delta(connection, table_name, staging, surrogate_key):
+    columns = [column for column in get_table_columns(connection, table_name) if column != surrogate_key]
+    column_list = ", ".join(columns)
+
+    existing = pd.read_sql(f"SELECT {surrogate_key}, {column_list} FROM {table_name}", connection)
+    incoming = pd.read_sql(f"SELECT rowid AS staging_rowid, {column_list} FROM temp.{staging}", connection)
+
+    # Number duplicate rows so identical records are matched one-to-one
+    existing["occurrence"] = existing.groupby(columns, dropna=False).cumcount()
+    incoming["occurrence"] = incoming.groupby(columns, dropna=False).cumcount()
+    merged = existing.merge(incoming, on=columns + ["occurrence"], how="outer", indicator=True)
+
+    to_delete = merged.loc[merged["_merge"] == "left_only", surrogate_key].astype(int).tolist()
+    to_insert = sorted(merged.loc[merged["_merge"] == "right_only", "staging_rowid"].astype(int).tolist())
+
+    with connection:
+        connection.executemany(
+            f"DELETE FROM {table_name} WHERE {surrogate_key} = ?",
+            [(row_id,) for row_id in to_delete],
+        )
+        connection.executemany(
+            f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM temp.{staging} WHERE rowid = ?",
+            [(row_id,) for row_id in to_insert],
+        )
+    return len(to_insert), 0, len(to_delete)
+
+# Apply the new/changed records of one table without rebuilding it
+def apply_table_delta(connection, table_name, df, mode="diff"):
+    """
+    Brings table_name in line with df inside a single write transaction, so
+    readers keep seeing the previous contents until it commits.
+
+    mode="diff": df is the full, current contents of the table. New and changed
+    rows are written and rows that disappeared are deleted.
+    mode="append": df only holds records appended to the source, so nothing is
+    deleted; keyed tables upsert them and unkeyed tables insert them as-is.
+    """
+    start = time.perf_counter()
+
+    if mode == "append" and table_name not in TABLE_KEYS:
+        df.to_sql(table_name, connection, if_exists="append", index=False)
+        inserted, updated, deleted = len(df), 0, 0
+    else:
+        staging = _create_staging_table(connection, table_name, df)
+        try:
+            if table_name in TABLE_KEYS:
+                inserted, updated, deleted = _apply_keyed_delta(
+                    connection, table_name, staging, TABLE_KEYS[table_name], delete_missing=(mode == "diff")
+                )
+            else:
+                inserted, updated, deleted = _apply_unkeyed_delta(
+                    connection, table_name, staging, SURROGATE_KEYS[table_name]
+                )
+        finally:
+            connection.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{table_name}: {inserted} inserted, {updated} updated, {deleted} deleted ({mode}, {elapsed:.2f}s)")
+    return {"inserted": inserted, "updated": updated, "deleted": deleted}
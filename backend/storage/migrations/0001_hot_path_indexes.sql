@@ -0,0 +1,22 @@
+-- Secondary indexes for the /filter and /stats access paths.
+-- Trailing columns make the stats groupings covering (no table lookups).
+
+-- /api/transactions/filter?transaction_id=
+CREATE INDEX IF NOT EXISTS idx_transactions_transaction_id ON Transactions (transaction_id);
+
+-- /api/transactions/filter?customer_id= and per-customer favorite item grouping
+CREATE INDEX IF NOT EXISTS idx_transactions_customer_item ON Transactions (customer_id, item_name, quantity, total_price);
+
+-- Per-store revenue and best customer grouping
+CREATE INDEX IF NOT EXISTS idx_transactions_store_customer ON Transactions (store, customer_id, total_price);
+
+-- /api/transfers/filter?sender_id= / recipient_id= and the country transfer joins
+CREATE INDEX IF NOT EXISTS idx_transfers_sender ON Transfers (sender_id, amount);
+CREATE INDEX IF NOT EXISTS idx_transfers_recipient ON Transfers (recipient_id, amount);
+
+-- /api/transfers/filter?date_after=&date_before= and monthly totals
+CREATE INDEX IF NOT EXISTS idx_transfers_date ON Transfers (date, amount);
+
+-- /api/promotions/stats join on People.email = Promotions.client_email
+CREATE INDEX IF NOT EXISTS idx_people_email ON People (email, country);
+CREATE INDEX IF NOT EXISTS idx_promotions_client_email ON Promotions (client_email, responded);
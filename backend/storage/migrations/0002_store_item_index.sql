@@ -0,0 +1,3 @@
+-- Covering index for the per-store product leaderboard (/api/transactions/stats/stores)
+
+CREATE INDEX IF NOT EXISTS idx_transactions_store_item ON Transactions (store, item_name, quantity);
@@ -0,0 +1,76 @@
+-- FTS5 trigram indexes behind the /filter substring filters (ilike '%term%').
+-- The search tables are external-content: they index the base table's text
+-- columns by rowid without storing a copy, and triggers keep them in sync with
+-- incremental loads. 'rebuild' indexes the rows already loaded and 'optimize'
+-- merges the index into a single segment, which makes lookups cheaper. A
+-- phrase MATCH on a search column finds the rows containing a term of 3 or more
+-- characters from the index instead of a full scan (see api/search.py).
+
+-- /api/people/filter?first_name=&last_name=&city=&country=
+CREATE VIRTUAL TABLE IF NOT EXISTS PeopleSearch USING fts5(
+    firstName, surname, city, country,
+    content='People', content_rowid='id', tokenize='trigram'
+);
+INSERT INTO PeopleSearch(PeopleSearch) VALUES ('rebuild');
+INSERT INTO PeopleSearch(PeopleSearch) VALUES ('optimize');
+
+CREATE TRIGGER IF NOT EXISTS people_search_insert AFTER INSERT ON People BEGIN
+    INSERT INTO PeopleSearch (rowid, firstName, surname, city, country)
+    VALUES (new.id, new.firstName, new.surname, new.city, new.country);
+END;
+CREATE TRIGGER IF NOT EXISTS people_search_delete AFTER DELETE ON People BEGIN
+    INSERT INTO PeopleSearch (PeopleSearch, rowid, firstName, surname, city, country)
+    VALUES ('delete', old.id, old.firstName, old.surname, old.city, old.country);
+END;
+CREATE TRIGGER IF NOT EXISTS people_search_update AFTER UPDATE ON People BEGIN
+    INSERT INTO PeopleSearch (PeopleSearch, rowid, firstName, surname, city, country)
+    VALUES ('delete', old.id, old.firstName, old.surname, old.city, old.country);
+    INSERT INTO PeopleSearch (rowid, firstName, surname, city, country)
+    VALUES (new.id, new.firstName, new.surname, new.city, new.country);
+END;
+
+-- /api/promotions/filter?promotion=&email=
+CREATE VIRTUAL TABLE IF NOT EXISTS PromotionsSearch USING fts5(
+    promotion, client_email,
+    content='Promotions', content_rowid='id', tokenize='trigram'
+);
+INSERT INTO PromotionsSearch(PromotionsSearch) VALUES ('rebuild');
+INSERT INTO PromotionsSearch(PromotionsSearch) VALUES ('optimize');
+
+CREATE TRIGGER IF NOT EXISTS promotions_search_insert AFTER INSERT ON Promotions BEGIN
+    INSERT INTO PromotionsSearch (rowid, promotion, client_email)
+    VALUES (new.id, new.promotion, new.client_email);
+END;
+CREATE TRIGGER IF NOT EXISTS promotions_search_delete AFTER DELETE ON Promotions BEGIN
+    INSERT INTO PromotionsSearch (PromotionsSearch, rowid, promotion, client_email)
+    VALUES ('delete', old.id, old.promotion, old.client_email);
+END;
+CREATE TRIGGER IF NOT EXISTS promotions_search_update AFTER UPDATE ON Promotions BEGIN
+    INSERT INTO PromotionsSearch (PromotionsSearch, rowid, promotion, client_email)
+    VALUES ('delete', old.id, old.promotion, old.client_email);
+    INSERT INTO PromotionsSearch (rowid, promotion, client_email)
+    VALUES (new.id, new.promotion, new.client_email);
+END;
+
+-- /api/transactions/filter?store=&item_name=
+CREATE VIRTUAL TABLE IF NOT EXISTS TransactionsSearch USING fts5(
+    store, item_name,
+    content='Transactions', content_rowid='id', tokenize='trigram'
+);
+INSERT INTO TransactionsSearch(TransactionsSearch) VALUES ('rebuild');
+INSERT INTO TransactionsSearch(TransactionsSearch) VALUES ('optimize');
+
+CREATE TRIGGER IF NOT EXISTS transactions_search_insert AFTER INSERT ON Transactions BEGIN
+    INSERT INTO TransactionsSearch (rowid, store, item_name)
+    VALUES (new.id, new.store, new.item_name);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_search_delete AFTER DELETE ON Transactions BEGIN
+    INSERT INTO TransactionsSearch (TransactionsSearch, rowid, store, item_name)
+    VALUES ('delete', old.id, old.store, old.item_name);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_search_update AFTER UPDATE ON Transactions BEGIN
+    INSERT INTO TransactionsSearch (TransactionsSearch, rowid, store, item_name)
+    VALUES ('delete', old.id, old.store, old.item_name);
+    INSERT INTO TransactionsSearch (rowid, store, item_name)
+    VALUES (new.id, new.store, new.item_name);
+END;
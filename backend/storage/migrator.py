@@ -0,0 +1,87 @@
+import re
+import sqlite3
+from pathlib import Path
+
+# Paths
+DB_PATH = Path("storage/venmito.db")
+MIGRATIONS_PATH = Path("storage/migrations/")
+
+# Migration files are named <version>_<description>.sql, e.g. 0001_hot_path_indexes.sql
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_\w+\.sql$")
+INDEX_NAME_PATTERN = re.compile(r"CREATE\s+(?:INDEX|VIRTUAL\s+TABLE)\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+# List the migration files as (version, path), oldest first
+def list_migrations(migrations_path=MIGRATIONS_PATH):
+    migrations = []
+    for path in Path(migrations_path).glob("*.sql"):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), path))
+    return sorted(migrations)
+
+# The schema version is tracked in SQLite's user_version header field
+def get_schema_version(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+# Apply every migration newer than the database's schema version
+def apply_migrations(connection, migrations_path=MIGRATIONS_PATH):
+    """
+    Runs each pending migration in its own transaction and bumps user_version
+    with it, so a failed migration leaves the database at the previous version.
+    Returns the list of versions that were applied.
+    """
+    current_version = get_schema_version(connection)
+    applied = []
+    for version, path in list_migrations(migrations_path):
+        if version <= current_version:
+            continue
+        with open(path, "r") as file:
+            sql = file.read()
+        try:
+            connection.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error as e:
+            connection.rollback()
+            print(f"Error applying migration {path.name}: {e}")
+            raise
+        print(f"Applied migration {path.name}")
+        applied.append(version)
+    return applied
+
+# Index names (including the FTS5 search tables) the migrations are expected to have created
+def expected_indexes(migrations_path=MIGRATIONS_PATH):
+    indexes = []
+    for _, path in list_migrations(migrations_path):
+        with open(path, "r") as file:
+            indexes.extend(INDEX_NAME_PATTERN.findall(file.read()))
+    return indexes
+
+# Find expected indexes that are missing from the database
+def find_missing_indexes(connection, migrations_path=MIGRATIONS_PATH):
+    existing = {
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'table')")
+    }
+    return [name for name in expected_indexes(migrations_path) if name not in existing]
+
+# Startup check: print any missing indexes
+def report_missing_indexes(db_path=DB_PATH, migrations_path=MIGRATIONS_PATH):
+    if not Path(db_path).exists():
+        print(f"No database found at {db_path}, skipping index check.")
+        return []
+    connection = sqlite3.connect(db_path)
+    try:
+        missing = find_missing_indexes(connection, migrations_path)
+        version = get_schema_version(connection)
+    finally:
+        connection.close()
+    if missing:
+        print(f"Warning: database (schema version {version}) is missing indexes: {', '.join(missing)}")
+    else:
+        print(f"All expected indexes present (schema version {version}).")
+    return missing
+
+# Main function to run the script (from the backend directory)
+if __name__ == "__main__":
+    connection = sqlite3.connect(DB_PATH)
+    apply_migrations(connection)
+    connection.close()
+    report_missing_indexes()
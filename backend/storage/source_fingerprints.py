@@ -0,0 +1,97 @@
+import hashlib
+from pathlib import Path
+
+# Paths
+RAW_DATA_PATH = Path("datasets/raw/")
+
+# Raw sources tracked for incremental loads
+RAW_SOURCES = ["people.json", "people.yml", "promotions.csv", "transactions.xml", "transfers.csv"]
+
+# Bytes read per hashing step
+HASH_CHUNK_SIZE = 1 << 20
+
+# Table holding the fingerprint of every raw source as of the last load
+FINGERPRINT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS SourceFingerprints (
+    source VARCHAR(255) PRIMARY KEY,
+    size INTEGER,
+    mtime FLOAT,
+    sha256 VARCHAR(64)
+)
+"""
+
+# Fingerprint a raw file and classify it against its previous fingerprint
+def fingerprint_file(path, previous=None):
+    """
+    Returns {"size", "mtime", "sha256", "status"} for the file, where status is
+    one of "new", "unchanged", "appended" or "changed". Files whose size and
+    mtime match the previous fingerprint are not re-read. A file only counts as
+    "appended" if its first previous["size"] bytes hash to the previous sha256;
+    "appended_offset" then holds the byte offset where the new data starts.
+    """
+    stat = Path(path).stat()
+    fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime:
+        fingerprint["sha256"] = previous["sha256"]
+        fingerprint["status"] = "unchanged"
+        return fingerprint
+
+    # Hash the file in one pass, snapshotting the digest at the old file size
+    prefix_sha256 = None
+    prefix_size = previous["size"] if previous and previous["size"] < stat.st_size else None
+    hasher = hashlib.sha256()
+    read = 0
+    with open(path, "rb") as file:
+        while True:
+            if prefix_size is not None and read < prefix_size:
+                chunk = file.read(min(HASH_CHUNK_SIZE, prefix_size - read))
+            else:
+                chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            read += len(chunk)
+            if read == prefix_size:
+                prefix_sha256 = hasher.hexdigest()
+    fingerprint["sha256"] = hasher.hexdigest()
+
+    if previous is None:
+        fingerprint["status"] = "new"
+    elif fingerprint["sha256"] == previous["sha256"]:
+        fingerprint["status"] = "unchanged"
+    elif prefix_sha256 is not None and prefix_sha256 == previous["sha256"]:
+        fingerprint["status"] = "appended"
+        fingerprint["appended_offset"] = previous["size"]
+    else:
+        fingerprint["status"] = "changed"
+    return fingerprint
+
+# Fingerprint every raw source against the fingerprints stored in the database
+def fingerprint_sources(connection=None, raw_dir=RAW_DATA_PATH, sources=RAW_SOURCES):
+    previous = load_fingerprints(connection) if connection is not None else {}
+    return {
+        source: fingerprint_file(Path(raw_dir) / source, previous.get(source))
+        for source in sources
+    }
+
+# Load the stored fingerprints as {source: {"size", "mtime", "sha256"}}
+def load_fingerprints(connection):
+    connection.execute(FINGERPRINT_TABLE_SQL)
+    rows = connection.execute("SELECT source, size, mtime, sha256 FROM SourceFingerprints").fetchall()
+    return {
+        source: {"size": size, "mtime": mtime, "sha256": sha256}
+        for source, size, mtime, sha256 in rows
+    }
+
+# Store the fingerprints of the sources that were just loaded
+def save_fingerprints(connection, fingerprints):
+    with connection:
+        connection.execute(FINGERPRINT_TABLE_SQL)
+        connection.executemany(
+            "INSERT OR REPLACE INTO SourceFingerprints (source, size, mtime, sha256) VALUES (?, ?, ?, ?)",
+            [
+                (source, fingerprint["size"], fingerprint["mtime"], fingerprint["sha256"])
+                for source, fingerprint in fingerprints.items()
+            ],
+        )
@@ -0,0 +1,134 @@
+import time
+
+# Materialized aggregates read by the /stats endpoints. Each entry holds the
+# tables it is derived from, its schema and the query that recomputes it.
+SUMMARY_TABLES = {
+    # People per country, with device ownership counts (/api/people/stats)
+    "CountryDeviceCounts": {
+        "sources": ["People"],
+        "schema": """
+            CREATE TABLE IF NOT EXISTS CountryDeviceCounts (
+                country VARCHAR(50),
+                people_count INTEGER,
+                android_count INTEGER,
+                iphone_count INTEGER,
+                desktop_count INTEGER
+            )
+        """,
+        "query": """
+            SELECT country,
+                   COUNT(id),
+                   SUM(CASE WHEN Android = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN iPhone = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN Desktop = 1 THEN 1 ELSE 0 END)
+            FROM People
+            GROUP BY country
+        """,
+    },
+    # Promotions sent / accepted per client country (/api/promotions/stats)
+    "PromotionResponseByCountry": {
+        "sources": ["People", "Promotions"],
+        "schema": """
+            CREATE TABLE IF NOT EXISTS PromotionResponseByCountry (
+                country VARCHAR(50),
+                total_promotions INTEGER,
+                accepted_promotions INTEGER
+            )
+        """,
+        "query": """
+            SELECT People.country,
+                   COUNT(Promotions.id),
+                   SUM(CASE WHEN Promotions.responded = 'Yes' THEN 1 ELSE 0 END)
+            FROM People
+            JOIN Promotions ON People.email = Promotions.client_email
+            GROUP BY People.country
+        """,
+    },
+    # Promotions sent / accepted per promotion item (/api/promotions/stats/promotions and overall stats)
+    "PromotionResponseByItem": {
+        "sources": ["Promotions"],
+        "schema": """
+            CREATE TABLE IF NOT EXISTS PromotionResponseByItem (
+                promotion VARCHAR(50),
+                total_responses INTEGER,
+                responded_yes INTEGER
+            )
+        """,
+        "query": """
+            SELECT promotion,
+                   COUNT(id),
+                   SUM(CASE WHEN responded = 'Yes' THEN 1 ELSE 0 END)
+            FROM Promotions
+            GROUP BY promotion
+        """,
+    },
+    # Money transferred per month (/api/transfers/stats/monthly_totals)
+    "MonthlyTransferTotals": {
+        "sources": ["Transfers"],
+        "schema": """
+            CREATE TABLE IF NOT EXISTS MonthlyTransferTotals (
+                month VARCHAR(7),
+                total_sent FLOAT,
+                transfer_count INTEGER
+            )
+        """,
+        "query": """
+            SELECT strftime('%Y-%m', date) AS month, SUM(amount), COUNT(transfer_id)
+            FROM Transfers
+            GROUP BY month
+        """,
+    },
+    # Revenue per store (/api/transactions/stats/stores)
+    "StoreRevenue": {
+        "sources": ["Transactions"],
+        "schema": """
+            CREATE TABLE IF NOT EXISTS StoreRevenue (
+                store VARCHAR(100),
+                total_money_made FLOAT,
+                line_items INTEGER
+            )
+        """,
+        "query": """
+            SELECT store, SUM(total_price), COUNT(id)
+            FROM Transactions
+            GROUP BY store
+        """,
+    },
+}
+
+# Names of the summary tables derived from any of the given tables
+def summaries_for_tables(table_names):
+    table_names = set(table_names)
+    return [
+        name for name, summary in SUMMARY_TABLES.items()
+        if table_names.intersection(summary["sources"])
+    ]
+
+# Names of the summary tables that don't exist in the database yet
+def missing_summary_tables(connection):
+    existing = {
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    return [name for name in SUMMARY_TABLES if name not in existing]
+
+# Recompute summary tables from the base tables
+def refresh_summary_tables(connection, summary_names=None):
+    """
+    Rebuilds the given summary tables (all of them by default), each inside
+    its own transaction so API readers see either the old or the new
+    aggregates. The GROUP BY queries are served by the migration indexes, and
+    only summaries whose source tables changed need to be passed in after an
+    incremental load (see summaries_for_tables).
+    """
+    if summary_names is None:
+        summary_names = list(SUMMARY_TABLES)
+
+    for name in summary_names:
+        summary = SUMMARY_TABLES[name]
+        start = time.perf_counter()
+        with connection:
+            connection.execute(summary["schema"])
+            connection.execute(f"DELETE FROM {name}")
+            rows = connection.execute(f"INSERT INTO {name} {summary['query']}").rowcount
+        elapsed = time.perf_counter() - start
+        print(f"Refreshed summary table {name} ({rows} rows in {elapsed:.2f}s)")
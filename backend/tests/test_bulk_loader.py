@@ -0,0 +1,77 @@
+import sqlite3
+import pandas as pd
+import pytest
+from ingestion.identity_index import IdentityIndex
+from ingestion.transactions_loader import map_phone_to_customer_id
+from storage.bulk_loader import bulk_load_table, load_tables
+from storage.database_loader import build_database
+
+PEOPLE = pd.DataFrame({
+    "id": [1, 2],
+    "email": ["jamie.bright@example.com", "arabella.knox@example.com"],
+    "phone": ["533-849-3913", "652-272-9539"],
+})
+
+# Transactions keep a row with no customer_id when their phone matches nobody
+def test_unmatched_phone_loads_as_null_customer_id(tmp_path):
+    transactions = pd.DataFrame({
+        "transaction_id": [1000, 1001, 1002],
+        "phone": ["533-849-3913", "000-000-0000", "(652) 272 9539"],
+        "total_price": [5.0, 4.0, 3.5],
+    })
+    transactions = map_phone_to_customer_id(transactions, IdentityIndex(PEOPLE))
+
+    db_path = tmp_path / "venmito.db"
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute(
+            "CREATE TABLE Transactions (transaction_id INTEGER, phone TEXT, total_price REAL, customer_id INTEGER)"
+        )
+        stats = load_tables(connection, db_path, {"Transactions": transactions}, workers=1)
+        rows = connection.execute(
+            "SELECT transaction_id, customer_id FROM Transactions ORDER BY transaction_id"
+        ).fetchall()
+    finally:
+        connection.close()
+
+    assert stats["Transactions"][0] == 3
+    assert rows == [(1000, 1), (1001, None), (1002, 2)]
+
+# Nullable extension columns (Int64, boolean, string) bind their missing values as NULL
+def test_nullable_extension_columns_load_as_null():
+    frame = pd.DataFrame({
+        "id": pd.array([1, None], dtype="Int64"),
+        "android": pd.array([True, None], dtype="boolean"),
+        "city": pd.array(["Montreal", None], dtype="string"),
+    })
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE TABLE People (id INTEGER, android BOOLEAN, city TEXT)")
+        rows, _ = bulk_load_table(connection, "People", frame)
+        stored = connection.execute("SELECT id, android, city FROM People ORDER BY rowid").fetchall()
+    finally:
+        connection.close()
+
+    assert rows == 2
+    assert stored == [(1, 1, "Montreal"), (None, None, None)]
+
+# A table that fails to load fails the whole build instead of leaving it empty
+def test_failed_table_fails_the_build(tmp_path):
+    transfers = pd.DataFrame({"no_such_column": [1, 2]})
+    assert build_database({"Transfers": transfers}, db_path=tmp_path / "venmito.db") is False
+
+# The other tables are still loaded before the failure is raised
+def test_load_tables_raises_after_loading_the_rest(tmp_path):
+    db_path = tmp_path / "venmito.db"
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("CREATE TABLE Ok (id INTEGER)")
+        connection.execute("CREATE TABLE Broken (id INTEGER)")
+        with pytest.raises(RuntimeError, match="Broken"):
+            load_tables(connection, db_path, {
+                "Broken": pd.DataFrame({"missing": [1]}),
+                "Ok": pd.DataFrame({"id": [1, 2]}),
+            }, workers=1)
+        assert connection.execute("SELECT COUNT(*) FROM Ok").fetchone() == (2,)
+    finally:
+        connection.close()
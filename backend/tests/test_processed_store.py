@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+from ingestion import processed_store
+
+# Two transaction batches with different stores and items, as streamed from transactions.xml
+BATCHES = [
+    pd.DataFrame({
+        "transaction_id": [1000, 1000], "phone": ["233-159-4158", "233-159-4158"],
+        "store": ["Trader Tales", "Trader Tales"], "item_name": ["Krafty Cheddar", "Popsi"],
+        "quantity": [1, 2], "price_per_item": [5.0, 4.0], "total_price": [5.0, 8.0], "customer_id": [854, 854],
+    }),
+    pd.DataFrame({
+        "transaction_id": [1001], "phone": ["000-000-0000"],
+        "store": ["PetPals Mart"], "item_name": ["Dovee"],
+        "quantity": [3], "price_per_item": [2.5], "total_price": [7.5], "customer_id": [None],
+    }),
+]
+
+# Every batch streamed through the writer ends up in the dataset, in every format
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_write_processed_batches_keeps_every_batch(tmp_path, monkeypatch, fmt):
+    if fmt != "csv":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(processed_store, "PROCESSED_DATA_PATH", tmp_path)
+
+    batches = [processed_store.apply_schema(batch, "transactions_cleaned") for batch in BATCHES]
+    passed = list(processed_store.write_processed_batches(iter(batches), "transactions_cleaned", fmt))
+    df = processed_store.read_processed("transactions_cleaned", fmt)
+
+    assert len(passed) == 2
+    assert df["store"].tolist() == ["Trader Tales", "Trader Tales", "PetPals Mart"]
+    assert df["item_name"].tolist() == ["Krafty Cheddar", "Popsi", "Dovee"]
+    assert df["customer_id"].tolist()[:2] == [854, 854] and pd.isna(df["customer_id"].iloc[2])
+    assert isinstance(df["store"].dtype, pd.CategoricalDtype)
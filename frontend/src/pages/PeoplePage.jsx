@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
 import Table from "../components/Table";
+import { fetchFilterPage } from "../utils/fetchFilterPage";
 import PieChart from "../components/PieChart";
 
 // PeoplePage component to display people data
@@ -13,6 +14,10 @@ export default function PeoplePage() {
    device: [],
  });
  const [results, setResults] = useState([]);
+ const [totalResults, setTotalResults] = useState(0);
+ const [nextCursor, setNextCursor] = useState(null);
+ const [totalCapped, setTotalCapped] = useState(false);
+ const [appliedFilters, setAppliedFilters] = useState({});
  const [currentPage, setCurrentPage] = useState(1);
  const [resultsPerPage] = useState(10);
  const [stats, setStats] = useState(null);
@@ -22,7 +27,11 @@ export default function PeoplePage() {
  const indexOfLastResult = currentPage * resultsPerPage;
  const indexOfFirstResult = indexOfLastResult - resultsPerPage;
  const currentResults = results.slice(indexOfFirstResult, indexOfLastResult);
- const totalPages = Math.ceil(results.length / resultsPerPage);
+ const totalPages = Math.ceil(totalResults / resultsPerPage);
+ // A capped total (X-Total-Count-Capped) is only a lower bound, so Next follows the cursor instead
+ const totalLabel = totalCapped ? `${totalResults}+` : totalResults;
+ const totalPagesLabel = totalCapped ? `${Math.max(totalPages, currentPage)}+` : totalPages;
+ const hasNextPage = indexOfLastResult < results.length || nextCursor !== null;
 
  // Fetch data with retries
  const fetchWithRetry = async (url, maxRetries = 5, delay = 1000) => {
@@ -43,11 +52,14 @@ export default function PeoplePage() {
      setIsLoading(true);
      try {
        const [resultsResponse, statsResponse] = await Promise.all([
-         fetchWithRetry("http://127.0.0.1:5000/api/people/filter"),
+         fetchFilterPage("http://127.0.0.1:5000/api/people/filter", {}, null, 5),
          fetchWithRetry("http://127.0.0.1:5000/api/people/stats")
        ]);
        
-       setResults(resultsResponse);
+       setResults(resultsResponse.rows);
+       setTotalResults(resultsResponse.total);
+       setTotalCapped(resultsResponse.totalCapped);
+       setNextCursor(resultsResponse.nextCursor);
        setStats(statsResponse);
      } catch (error) {
        console.error("Error fetching data:", error);
@@ -76,23 +88,30 @@ export default function PeoplePage() {
 // Fetch filtered results
  const fetchResults = async () => {
    try {
-     const response = await axios.get(
-       "http://127.0.0.1:5000/api/people/filter",
-       {
-         params: { ...filters },
-         paramsSerializer: {
-           indexes: null,
-         },
-       }
-     );
-     setResults(response.data);
+     const page = await fetchFilterPage("http://127.0.0.1:5000/api/people/filter", { ...filters });
+     setResults(page.rows);
+     setTotalResults(page.total);
+     setTotalCapped(page.totalCapped);
+     setNextCursor(page.nextCursor);
+     setAppliedFilters({ ...filters });
      setCurrentPage(1);
    } catch (error) {
      console.error("Error fetching results:", error);
    }
  };
 
- const paginate = (pageNumber) => {
+ const paginate = async (pageNumber) => {
+   // Load the next keyset page from the server once the loaded rows run out
+   if (pageNumber * resultsPerPage > results.length && nextCursor !== null) {
+     try {
+       const page = await fetchFilterPage("http://127.0.0.1:5000/api/people/filter", appliedFilters, nextCursor);
+       setResults((prev) => [...prev, ...page.rows]);
+       setNextCursor(page.nextCursor);
+     } catch (error) {
+       console.error("Error fetching data:", error);
+       return;
+     }
+   }
    setCurrentPage(pageNumber);
  };
 
@@ -195,12 +214,12 @@ export default function PeoplePage() {
        </button>
 
        <span className="px-4 py-1">
-         Page {currentPage} of {totalPages}
+         Page {currentPage} of {totalPagesLabel}
        </span>
 
        <button
          onClick={() => paginate(currentPage + 1)}
-         disabled={currentPage === totalPages}
+         disabled={!hasNextPage}
          className="px-3 py-1 bg-gray-200 rounded disabled:opacity-50"
        >
          Next
@@ -209,7 +228,7 @@ export default function PeoplePage() {
 
      <div className="mt-2 text-center text-sm text-gray-600">
        Showing {indexOfFirstResult + 1} to{" "}
-       {Math.min(indexOfLastResult, results.length)} of {results.length} results
+       {Math.min(indexOfLastResult, results.length)} of {totalLabel} results
      </div>
 
      {/* Charts section */}
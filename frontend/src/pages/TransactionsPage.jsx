@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
 import Table from "../components/Table";
+import { fetchFilterPage } from "../utils/fetchFilterPage";
 import StatTable from "../components/StatTable";
 import PieChart from "../components/PieChart";
 
@@ -12,6 +13,10 @@ export default function TransactionsPage() {
     item_name: "",
   });
   const [results, setResults] = useState([]);
+  const [totalResults, setTotalResults] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCapped, setTotalCapped] = useState(false);
+  const [appliedFilters, setAppliedFilters] = useState({});
   const [currentPage, setCurrentPage] = useState(1);
   const [resultsPerPage] = useState(10);
   const [customerStats, setCustomerStats] = useState([]);
@@ -23,7 +28,11 @@ export default function TransactionsPage() {
   const indexOfLastResult = currentPage * resultsPerPage;
   const indexOfFirstResult = indexOfLastResult - resultsPerPage;
   const currentResults = results.slice(indexOfFirstResult, indexOfLastResult);
-  const totalPages = Math.ceil(results.length / resultsPerPage);
+  const totalPages = Math.ceil(totalResults / resultsPerPage);
+  // A capped total (X-Total-Count-Capped) is only a lower bound, so Next follows the cursor instead
+  const totalLabel = totalCapped ? `${totalResults}+` : totalResults;
+  const totalPagesLabel = totalCapped ? `${Math.max(totalPages, currentPage)}+` : totalPages;
+  const hasNextPage = indexOfLastResult < results.length || nextCursor !== null;
 
   const fetchWithRetry = async (url, maxRetries = 5, delay = 1000) => {
     for (let i = 0; i < maxRetries; i++) {
@@ -42,13 +51,16 @@ export default function TransactionsPage() {
       setIsLoading(true);
       try {
         const [resultsResponse, customerResponse, storeResponse, countryResponse] = await Promise.all([
-          fetchWithRetry("http://127.0.0.1:5000/api/transactions/filter"),
+          fetchFilterPage("http://127.0.0.1:5000/api/transactions/filter", {}, null, 5),
           fetchWithRetry("http://127.0.0.1:5000/api/transactions/stats/customers"),
           fetchWithRetry("http://127.0.0.1:5000/api/transactions/stats/stores"),
           fetchWithRetry("http://127.0.0.1:5000/api/transactions/stats/spending_by_country")
         ]);
         
-        setResults(resultsResponse);
+        setResults(resultsResponse.rows);
+        setTotalResults(resultsResponse.total);
+        setTotalCapped(resultsResponse.totalCapped);
+        setNextCursor(resultsResponse.nextCursor);
         setCustomerStats(customerResponse);
         setStoreStats(storeResponse);
         setSpendingByCountry(countryResponse);
@@ -69,20 +81,30 @@ export default function TransactionsPage() {
 
   const fetchResults = async () => {
     try {
-      const response = await axios.get(
-        "http://127.0.0.1:5000/api/transactions/filter",
-        {
-          params: filters,
-        }
-      );
-      setResults(response.data);
+      const page = await fetchFilterPage("http://127.0.0.1:5000/api/transactions/filter", filters);
+      setResults(page.rows);
+      setTotalResults(page.total);
+      setTotalCapped(page.totalCapped);
+      setNextCursor(page.nextCursor);
+      setAppliedFilters(filters);
       setCurrentPage(1);
     } catch (error) {
       console.error("Error fetching data:", error);
     }
   };
 
-  const paginate = (pageNumber) => {
+  const paginate = async (pageNumber) => {
+    // Load the next keyset page from the server once the loaded rows run out
+    if (pageNumber * resultsPerPage > results.length && nextCursor !== null) {
+      try {
+        const page = await fetchFilterPage("http://127.0.0.1:5000/api/transactions/filter", appliedFilters, nextCursor);
+        setResults((prev) => [...prev, ...page.rows]);
+        setNextCursor(page.nextCursor);
+      } catch (error) {
+        console.error("Error fetching data:", error);
+        return;
+      }
+    }
     setCurrentPage(pageNumber);
   };
 
@@ -143,12 +165,12 @@ export default function TransactionsPage() {
         </button>
 
         <span className="px-4 py-1">
-          Page {currentPage} of {totalPages}
+          Page {currentPage} of {totalPagesLabel}
         </span>
 
         <button
           onClick={() => paginate(currentPage + 1)}
-          disabled={currentPage === totalPages}
+          disabled={!hasNextPage}
           className="px-3 py-1 bg-gray-200 rounded disabled:opacity-50"
         >
           Next
@@ -157,7 +179,7 @@ export default function TransactionsPage() {
 
       <div className="mt-2 text-center text-sm text-gray-600">
         Showing {indexOfFirstResult + 1} to{" "}
-        {Math.min(indexOfLastResult, results.length)} of {results.length}{" "}
+        {Math.min(indexOfLastResult, results.length)} of {totalLabel}{" "}
         results
       </div>
 
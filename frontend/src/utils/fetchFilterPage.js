@@ -0,0 +1,35 @@
+import axios from "axios";
+
+// Rows requested per call to a keyset-paginated /filter endpoint
+export const FILTER_PAGE_SIZE = 100;
+
+// Fetch one page of a /filter endpoint, starting after the given cursor
+export const fetchFilterPage = async (url, params = {}, after = null, maxRetries = 1, delay = 1000) => {
+  const query = { ...params, limit: FILTER_PAGE_SIZE };
+  if (after !== null) {
+    query.after = after;
+  }
+
+  for (let i = 0; i < maxRetries; i++) {
+    try {
+      const response = await axios.get(url, {
+        params: query,
+        paramsSerializer: {
+          indexes: null,
+        },
+      });
+      const total = response.headers["x-total-count"];
+      const nextCursor = response.headers["x-next-cursor"];
+      return {
+        rows: response.data,
+        total: total !== undefined ? Number(total) : response.data.length,
+        // The server stops counting at its cap (10000 by default) and flags the total
+        totalCapped: response.headers["x-total-count-capped"] === "true",
+        nextCursor: nextCursor !== undefined ? nextCursor : null,
+      };
+    } catch (error) {
+      if (i === maxRetries - 1) throw error;
+      await new Promise(resolve => setTimeout(resolve, delay));
+    }
+  }
+};